@@ -0,0 +1,284 @@
+"""
+Headless translation API
+Serves TranslationEngine over HTTP for SMS gateways, kiosks and other systems
+
+Run with:
+    python api_server.py
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import threading
+import logging
+import asyncio
+import time
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+
+from backend import metrics
+from backend.admission import Overloaded
+from backend.translation_engine import TranslationEngine
+from config.languages import SUPPORTED_LANGUAGES
+from config.decoding import DECODING_PROFILES, AUTO_PROFILE
+from config import settings
+
+logger = logging.getLogger("api_server")
+
+
+class TranslateRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+    source: str
+    target: str
+    profile: Optional[str] = None
+
+
+class BatchTranslateRequest(BaseModel):
+    items: List[TranslateRequest] = Field(..., min_length=1, max_length=256)
+
+
+class TranslationService:
+    """Owns the engine and a bounded executor that runs inference off the event loop"""
+
+    def __init__(self, max_workers, max_queue, timeout_seconds):
+        self.max_workers = max_workers
+        # Requests allowed in the system at once (running + waiting)
+        self.capacity = max_workers + max_queue
+        self.timeout_seconds = timeout_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate")
+
+        self.engine = None
+        self.load_error = None
+        self.started_at = time.time()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def start_loading(self):
+        """Load the model in the background so health checks answer immediately"""
+        threading.Thread(target=self._load, name="engine-loader", daemon=True).start()
+
+    def _load(self):
+        try:
+            self.engine = TranslationEngine()
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error("Translation engine failed to load: %s", e)
+
+    @property
+    def ready(self):
+        # The engine exists as soon as it is built; the model may still be loading
+        return self.engine is not None and self.engine.is_model_ready()
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def _acquire(self, slots):
+        with self._lock:
+            if self._in_flight + slots > self.capacity:
+                return False
+            self._in_flight += slots
+            return True
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _admit(self):
+        """
+        One admission ticket for the whole request (a batch counts once; its
+        size is already bounded by capacity), taken before the items queue so
+        that queueing time counts towards the latency SLO; raises Overloaded
+        """
+        admission = self.engine.admission
+        return admission.admit() if admission is not None else None
+
+    def _release_ticket(self, ticket, futures):
+        """Release ticket once every item's inference has finished"""
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def item_done(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.engine.admission.release(ticket)
+
+        for future in futures:
+            future.add_done_callback(item_done)
+
+    def _overloaded(self):
+        return HTTPException(
+            status_code=503,
+            detail="Translator is overloaded, retry shortly",
+            headers={"Retry-After": str(max(1, round(settings.ADMISSION_RECOVERY_SECONDS)))}
+        )
+
+    async def translate(self, items):
+        """Translate items concurrently; raises HTTPException on overload or timeout"""
+        if self.engine is None:
+            raise HTTPException(status_code=503, detail="Service is still starting")
+        if len(items) > self.capacity:
+            # Would be refused with 429 however long the client waited
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch of {len(items)} items exceeds the {self.capacity} the service can hold; split it"
+            )
+        if not self._acquire(len(items)):
+            metrics.inc("api_rejected")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests in flight, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        try:
+            ticket = self._admit()
+        except Overloaded:
+            with self._lock:
+                self._in_flight -= len(items)
+            raise self._overloaded()
+
+        futures = []
+        try:
+            for item in items:
+                future = self.executor.submit(
+                    self.engine.translate_detailed, item.text, item.source, item.target, item.profile, ticket
+                )
+                # The slot is freed when inference actually finishes, even if the
+                # caller has already timed out, so backpressure stays accurate
+                future.add_done_callback(self._release)
+                futures.append(future)
+        except RuntimeError:
+            # The executor is shutting down: give back what never got submitted
+            with self._lock:
+                self._in_flight -= len(items) - len(futures)
+            if ticket is not None:
+                if futures:
+                    self._release_ticket(ticket, futures)
+                else:
+                    # Never ran, so it must not count as a latency sample
+                    self.engine.admission.cancel(ticket)
+            raise HTTPException(status_code=503, detail="Service is shutting down")
+        if ticket is not None:
+            self._release_ticket(ticket, futures)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(future, loop=loop) for future in futures)),
+                self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            metrics.inc("api_timeouts")
+            raise HTTPException(status_code=504, detail="Translation timed out")
+        except Overloaded:
+            # Approximate tier and neither the phrases nor the cache knew the text
+            raise self._overloaded()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+service = TranslationService(
+    max_workers=settings.API_WORKERS,
+    max_queue=settings.API_MAX_QUEUE,
+    timeout_seconds=settings.API_TIMEOUT_SECONDS
+)
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    service.start_loading()
+    yield
+    service.shutdown()
+
+
+app = FastAPI(title="Kenyan Local Dialect Translator", lifespan=lifespan)
+
+
+def _validate(item):
+    if not item.text.strip():
+        raise HTTPException(status_code=400, detail="Text is empty")
+    for language in (item.source, item.target):
+        if language not in SUPPORTED_LANGUAGES:
+            raise HTTPException(status_code=400, detail=f"Unsupported language '{language}'")
+    if item.profile and item.profile != AUTO_PROFILE and item.profile not in DECODING_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown decoding profile '{item.profile}'")
+
+
+@app.post("/translate")
+async def translate(request: TranslateRequest):
+    _validate(request)
+    result = (await service.translate([request]))[0]
+    return {
+        "translation": result["translation"],
+        # The detected language when it overrode the requested one
+        "source": result["source"],
+        "source_corrected": result["corrected"],
+        "target": request.target,
+        # Set under load: a stored translation made with another decoding profile
+        "approximate": result["approximate"],
+        "tier": result["tier"]
+    }
+
+
+@app.post("/translate/batch")
+async def translate_batch(request: BatchTranslateRequest):
+    for item in request.items:
+        _validate(item)
+    results = await service.translate(request.items)
+    return {
+        "translations": [
+            {
+                "translation": result["translation"],
+                "source": result["source"],
+                "source_corrected": result["corrected"],
+                "target": item.target,
+                "approximate": result["approximate"],
+                "tier": result["tier"]
+            }
+            for item, result in zip(request.items, results)
+        ]
+    }
+
+
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and the event loop is responsive"""
+    return {"status": "ok", "uptime_s": time.time() - service.started_at}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: the model has finished loading"""
+    if service.ready:
+        return {"ready": True, "in_flight": service.in_flight, "capacity": service.capacity}
+    status = {"ready": False, "error": service.load_error}
+    if service.engine is not None:
+        model = service.engine.nllb.registry.stats()
+        status["loading"] = model["loading"]
+        status["error"] = status["error"] or model["load_error"]
+    return JSONResponse(status_code=503, content=status)
+
+
+@app.get("/stats")
+async def stats():
+    if service.engine is None:
+        raise HTTPException(status_code=503, detail="Service is still starting")
+    return service.engine.get_stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Counters and per-stage latency histograms in the Prometheus text format"""
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    import uvicorn
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), format="[%(levelname)s] %(name)s: %(message)s")
+    uvicorn.run(app, host=settings.API_HOST, port=settings.API_PORT)
@@ -1,12 +1,23 @@
 import streamlit as st
+import logging
 from frontend.ui_main import render_main_ui
 from backend.translation_engine import TranslationEngine
 from backend.voice_service import VoiceService
 import config.languages as lang_config
+from config import settings
+
+logging.basicConfig(level=settings.LOG_LEVEL.upper(), format="[%(levelname)s] %(name)s: %(message)s")
+
+
+@st.cache_resource(show_spinner=False)
+def get_translation_engine():
+    """One engine per process, shared by every session and rerun"""
+    return TranslationEngine()
+
 
 def main():
     # Initialize services
-    translator = TranslationEngine()
+    translator = get_translation_engine()
     voice = VoiceService()
     
     # Setup page
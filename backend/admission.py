@@ -0,0 +1,185 @@
+"""
+Latency-SLO admission control
+Tracks the requests inside the engine and the latency of recent ones
+against ADMISSION_SLO_MS, and steps down through degradation tiers while
+the SLO is at risk:
+
+    normal       the requested decoding profile
+    reduced      ADMISSION_REDUCED_PROFILE (greedy) for texts the model translates
+    approximate  phrase database and cache only, answers flagged approximate
+    reject       refused at once (Overloaded)
+
+Escalation happens as soon as pressure crosses a tier's threshold;
+recovery goes back one tier at a time, each after pressure has stayed
+below the current tier for ADMISSION_RECOVERY_SECONDS.
+"""
+
+from collections import deque
+import threading
+import logging
+import time
+
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+NORMAL, REDUCED, APPROXIMATE, REJECT = range(4)
+TIER_NAMES = ("normal", "reduced", "approximate", "reject")
+
+
+class Overloaded(Exception):
+    """A request refused (or unanswerable without the model) to protect the latency SLO"""
+
+
+class Ticket:
+    """An admitted request: the tier it runs in and when it entered"""
+
+    __slots__ = ("tier", "started")
+
+    def __init__(self, tier, started):
+        self.tier = tier
+        self.started = started
+
+    @property
+    def tier_name(self):
+        return TIER_NAMES[self.tier]
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        slo_ms,
+        max_in_flight,
+        window_seconds=10.0,
+        recovery_seconds=5.0,
+        min_samples=10,
+        thresholds=(0.8, 1.0, 1.5),
+        clock=time.monotonic
+    ):
+        """
+        Pressure is the larger of p95 latency / slo_ms (over requests that
+        finished in the last window_seconds, once there are min_samples of
+        them) and requests in flight / max_in_flight, the latter capped
+        below the reject threshold. thresholds are the pressures at which
+        the reduced, approximate and reject tiers start.
+        """
+        self.slo_ms = slo_ms
+        self.max_in_flight = max_in_flight
+        self.window_seconds = window_seconds
+        self.recovery_seconds = recovery_seconds
+        self.min_samples = min_samples
+        self.thresholds = thresholds
+        self.clock = clock
+
+        self.tier = NORMAL
+        self.in_flight = 0
+        self._samples = deque(maxlen=1024)  # (finished at, latency ms)
+        self._p95 = None
+        self._calm_since = None
+        self._lock = threading.Lock()
+        self.escalations = 0
+        self.recoveries = 0
+        self.admitted = [0] * len(TIER_NAMES)  # requests per tier (reject = refused)
+        metrics.set_gauge("admission_tier", NORMAL)
+
+    def admit(self):
+        """Ticket for a new request in the current tier; raises Overloaded in the reject tier"""
+        with self._lock:
+            now = self.clock()
+            tier = self._update(now)
+            self.admitted[tier] += 1
+            if tier == REJECT:
+                metrics.inc("admission_rejected")
+                raise Overloaded("Translator is overloaded, retry shortly")
+            self.in_flight += 1
+            metrics.set_gauge("admission_in_flight", self.in_flight)
+        if tier != NORMAL:
+            metrics.inc(f"admission_{TIER_NAMES[tier]}")
+        return Ticket(tier, now)
+
+    def release(self, ticket):
+        """Record that an admitted request finished"""
+        with self._lock:
+            now = self.clock()
+            self.in_flight -= 1
+            self._samples.append((now, (now - ticket.started) * 1000))
+            self._p95 = None
+            self._update(now)
+            metrics.set_gauge("admission_in_flight", self.in_flight)
+
+    def cancel(self, ticket):
+        """Give back a ticket whose request never ran (no latency sample)"""
+        with self._lock:
+            self.in_flight -= 1
+            metrics.set_gauge("admission_in_flight", self.in_flight)
+
+    def _latency_p95(self, now):
+        samples = self._samples
+        expired = False
+        while samples and now - samples[0][0] > self.window_seconds:
+            samples.popleft()
+            expired = True
+        if expired or self._p95 is None:
+            if len(samples) < self.min_samples:
+                # Too few requests to judge latency by (e.g. one user's long text)
+                self._p95 = 0.0
+            else:
+                latencies = sorted(latency for _, latency in samples)
+                self._p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+        return self._p95
+
+    def _pressure(self, now):
+        # A crowd of requests alone only degrades them; rejecting takes
+        # latency that actually breaks the SLO
+        crowding = min(self.in_flight / self.max_in_flight, self.thresholds[-2])
+        return max(self._latency_p95(now) / self.slo_ms, crowding)
+
+    def _update(self, now):
+        """Move to the tier the current pressure calls for; returns the tier"""
+        pressure = self._pressure(now)
+        target = sum(pressure >= threshold for threshold in self.thresholds)
+        if target > self.tier:
+            self._set_tier(target, pressure)
+            self._calm_since = None
+        elif target < self.tier:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recovery_seconds:
+                self._set_tier(self.tier - 1, pressure)
+                # The next step down needs its own calm period
+                self._calm_since = now if target < self.tier else None
+        else:
+            self._calm_since = None
+        return self.tier
+
+    def _set_tier(self, tier, pressure):
+        if tier > self.tier:
+            self.escalations += 1
+            metrics.inc("admission_escalations")
+            logger.warning(
+                "Admission tier %s -> %s (pressure %.2f)", TIER_NAMES[self.tier], TIER_NAMES[tier], pressure
+            )
+        else:
+            self.recoveries += 1
+            metrics.inc("admission_recoveries")
+            logger.info(
+                "Admission tier %s -> %s (pressure %.2f)", TIER_NAMES[self.tier], TIER_NAMES[tier], pressure
+            )
+        self.tier = tier
+        metrics.set_gauge("admission_tier", tier)
+
+    def stats(self):
+        with self._lock:
+            now = self.clock()
+            tier = self._update(now)
+            return {
+                "tier": TIER_NAMES[tier],
+                "in_flight": self.in_flight,
+                "latency_p95_ms": self._latency_p95(now),
+                "pressure": self._pressure(now),
+                "slo_ms": self.slo_ms,
+                "max_in_flight": self.max_in_flight,
+                "escalations": self.escalations,
+                "recoveries": self.recoveries,
+                "requests": dict(zip(TIER_NAMES, self.admitted)),
+            }
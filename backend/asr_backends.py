@@ -0,0 +1,169 @@
+"""
+Speech recognition backends
+Every backend decodes straight from in-memory WAV bytes (no temp files)
+"""
+
+from io import BytesIO
+import threading
+import logging
+import time
+import wave
+
+logger = logging.getLogger(__name__)
+
+# After a failed Whisper model load, wait this long before trying again
+# (doubling on each further failure, up to the maximum)
+WHISPER_RETRY_SECONDS = 30.0
+WHISPER_RETRY_MAX_SECONDS = 600.0
+
+
+class AudioUnintelligible(Exception):
+    """The backend ran but could not make out any speech"""
+
+
+class ASRUnavailable(Exception):
+    """The backend could not run (no network, missing model, ...)"""
+
+
+def decode_wav(audio_bytes, target_rate=16000):
+    """Decode PCM WAV bytes to mono float32 samples at target_rate"""
+    import numpy as np
+
+    with wave.open(BytesIO(audio_bytes), "rb") as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.readframes(wav.getnframes())
+
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    if sample_width not in dtypes:
+        raise ValueError(f"Unsupported WAV sample width: {sample_width} bytes")
+    samples = np.frombuffer(frames, dtype=dtypes[sample_width]).astype(np.float32)
+    if sample_width == 1:
+        samples = (samples - 128) / 128
+    else:
+        samples /= float(2 ** (8 * sample_width - 1))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+
+    if rate != target_rate and len(samples):
+        duration = len(samples) / rate
+        target_length = int(duration * target_rate)
+        samples = np.interp(
+            np.linspace(0, len(samples) - 1, target_length),
+            np.arange(len(samples)),
+            samples
+        ).astype(np.float32)
+    return samples, target_rate
+
+
+def wav_duration(audio_bytes):
+    """Length of a WAV clip in seconds"""
+    with wave.open(BytesIO(audio_bytes), "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate() or 1)
+
+
+class GoogleASRBackend:
+    """Google Web Speech API through speech_recognition (needs network)"""
+
+    name = "google"
+
+    def __init__(self):
+        import speech_recognition as sr
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+
+    def is_available(self):
+        return True
+
+    def transcribe(self, audio_bytes, language_code):
+        sr = self._sr
+        # sr.AudioFile accepts file-like objects, so no temp file is needed
+        with sr.AudioFile(BytesIO(audio_bytes)) as source:
+            audio_data = self.recognizer.record(source)
+        try:
+            return self.recognizer.recognize_google(audio_data, language=language_code)
+        except sr.UnknownValueError:
+            raise AudioUnintelligible()
+        except sr.RequestError as e:
+            raise ASRUnavailable(f"Speech recognition API error: {e}")
+
+
+class WhisperASRBackend:
+    """
+    Local Whisper model through faster-whisper
+    A model size ("small") is downloaded from the Hugging Face Hub on first
+    use; a local model directory (scripts/fetch_whisper_model.py) keeps it
+    fully offline
+    """
+
+    name = "whisper"
+
+    def __init__(self, model_name="small", compute_type="int8"):
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self._model = None
+        self._lock = threading.Lock()
+        # Last load failure, when it happened and how long to wait before retrying
+        self._load_error = None
+        self._failed_at = 0.0
+        self._retry_seconds = 0.0
+
+    def is_available(self):
+        try:
+            import faster_whisper  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _get_model(self):
+        # Loaded once per process on first use
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self):
+        # A failed load (e.g. no network for the download) isn't retried on
+        # every utterance: the error is reused until the backoff runs out
+        if self._load_error is not None and time.monotonic() - self._failed_at < self._retry_seconds:
+            raise self._load_error
+        from faster_whisper import WhisperModel
+        logger.info("Loading Whisper model '%s'...", self.model_name)
+        try:
+            model = WhisperModel(self.model_name, device="cpu", compute_type=self.compute_type)
+        except Exception as e:
+            self._retry_seconds = min(
+                WHISPER_RETRY_MAX_SECONDS,
+                self._retry_seconds * 2 if self._load_error is not None else WHISPER_RETRY_SECONDS
+            )
+            self._load_error = e
+            self._failed_at = time.monotonic()
+            logger.warning(
+                "Whisper model '%s' failed to load: %s; retrying in %.0fs", self.model_name, e, self._retry_seconds
+            )
+            raise
+        self._load_error = None
+        return model
+
+    def transcribe(self, audio_bytes, language_code):
+        try:
+            model = self._get_model()
+        except Exception as e:
+            raise ASRUnavailable(f"Whisper model unavailable: {e}")
+
+        samples, _ = decode_wav(audio_bytes)
+        # Whisper takes ISO 639-1 codes: "sw-KE" -> "sw"
+        language = language_code.split("-")[0]
+        segments, _ = model.transcribe(samples, language=language, beam_size=1, vad_filter=True)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise AudioUnintelligible()
+        return text
+
+
+ASR_BACKENDS = {
+    GoogleASRBackend.name: GoogleASRBackend,
+    WhisperASRBackend.name: WhisperASRBackend,
+}
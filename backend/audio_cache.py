@@ -0,0 +1,176 @@
+"""
+Synthesized audio cache
+An in-memory LRU (bounded by bytes) in front of a content-addressed store on
+disk. The disk store is bounded too: past max_disk_bytes the least recently
+used clips are deleted (a disk hit refreshes the file's mtime)
+"""
+
+from collections import OrderedDict
+import threading
+import logging
+import hashlib
+import os
+
+logger = logging.getLogger(__name__)
+
+# Trimming goes this far below the disk limit, so it doesn't run on every write
+DISK_TRIM_RATIO = 0.9
+
+
+def audio_key(text, language, voice):
+    raw = "\x1f".join([voice, language, " ".join(text.split())])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, cache_dir, max_memory_bytes=32 * 1024 * 1024, max_disk_bytes=0):
+        """max_disk_bytes 0 leaves the disk store unbounded"""
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (audio bytes, format)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # Measured from the directory on the first write
+        self._disk_bytes = None
+        self._disk_lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+    def get(self, text, language, voice):
+        """Return (audio bytes, format) or None"""
+        key = audio_key(text, language, voice)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, text, language, voice, audio, audio_format):
+        key = audio_key(text, language, voice)
+        self._write_disk(key, audio, audio_format)
+        with self._lock:
+            self._remember(key, (audio, audio_format))
+
+    def contains(self, text, language, voice):
+        key = audio_key(text, language, voice)
+        return key in self._memory or self._disk_path(key) is not None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+        stats["disk_bytes"] = self._disk_bytes
+        stats["max_disk_bytes"] = self.max_disk_bytes
+        return stats
+
+    def _remember(self, key, entry):
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = entry
+        self._memory_bytes += len(entry[0])
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, (audio, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(audio)
+            self.counters["evictions"] += 1
+
+    def _shard_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2])
+
+    def _disk_path(self, key):
+        if not self.cache_dir:
+            return None
+        shard = self._shard_dir(key)
+        for audio_format in ("mp3", "wav"):
+            path = os.path.join(shard, f"{key}.{audio_format}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _read_disk(self, key):
+        path = self._disk_path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError:
+            return None
+        try:
+            # Recently used clips are the last to be trimmed
+            os.utime(path)
+        except OSError:
+            pass
+        return audio, path.rsplit(".", 1)[1]
+
+    def _write_disk(self, key, audio, audio_format):
+        if not self.cache_dir:
+            return
+        shard = self._shard_dir(key)
+        os.makedirs(shard, exist_ok=True)
+        path = os.path.join(shard, f"{key}.{audio_format}")
+        # Write then rename so readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        if not self.max_disk_bytes:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += len(audio) - replaced
+            if self._disk_bytes > self.max_disk_bytes:
+                self._trim_disk()
+
+    def _disk_files(self):
+        """(mtime, size, path) of every clip on disk"""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                files.append((info.st_mtime, info.st_size, path))
+        return files
+
+    def _trim_disk(self):
+        """Delete least recently used clips until the store is below DISK_TRIM_RATIO of its limit"""
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * DISK_TRIM_RATIO
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        self._disk_bytes = total
+        with self._lock:
+            self.counters["disk_evictions"] += evicted
+        logger.info("Audio cache trimmed: %d clips removed, %.1f MB left", evicted, total / (1024 * 1024))
@@ -0,0 +1,141 @@
+"""
+Dynamic micro-batching for model calls
+Concurrent requests for the same language pair are grouped into one batched generate call
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict
+import threading
+import time
+
+from backend.metrics import Histogram
+
+
+class _PendingRequest:
+    def __init__(self, text):
+        self.text = text
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchScheduler:
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=5, max_concurrent_batches=1):
+        # run_batch(texts, *key) must return one result per text, in order
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms / 1000)
+
+        # More than one batch in flight only helps when run_batch hands work
+        # to something parallel, such as the multi-process worker pool
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._slots = threading.Semaphore(self.max_concurrent_batches)
+        self._executor = None
+        if self.max_concurrent_batches > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_batches,
+                thread_name_prefix="nllb-batch"
+            )
+
+        self._pending = OrderedDict()  # key -> [_PendingRequest]
+        self._cond = threading.Condition()
+        self._worker = None
+
+        self.batch_size_hist = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_wait_hist = Histogram([1, 2, 5, 10, 20, 50, 100, 250, 1000])
+
+    def submit(self, text, key):
+        """Queue text for translation and return a Future with its result"""
+        request = _PendingRequest(text)
+        with self._cond:
+            self._ensure_worker()
+            self._pending.setdefault(key, []).append(request)
+            self._cond.notify()
+        return request.future
+
+    def stats(self):
+        """Batch-size and queue-wait (ms) histograms"""
+        with self._cond:
+            queued = sum(len(requests) for requests in self._pending.values())
+        return {
+            "queued": queued,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "batch_size": self.batch_size_hist.snapshot(),
+            "queue_wait_ms": self.queue_wait_hist.snapshot(),
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run, name="nllb-batch-scheduler", daemon=True
+            )
+            self._worker.start()
+
+    def _next_batch(self):
+        """Block until a batch is ready; the oldest group is served first"""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+
+            key, requests = next(iter(self._pending.items()))
+            deadline = requests[0].enqueued_at + self.max_wait
+            while len(requests) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = requests[:self.max_batch_size]
+            rest = requests[self.max_batch_size:]
+            if rest:
+                self._pending[key] = rest
+                self._pending.move_to_end(key, last=False)
+            else:
+                del self._pending[key]
+            return key, batch
+
+    def _run(self):
+        while True:
+            self._slots.acquire()
+            key, batch = self._next_batch()
+            if self._executor is None:
+                self._execute(key, batch)
+            else:
+                self._executor.submit(self._execute, key, batch)
+
+    def _execute(self, key, batch):
+        try:
+            # Drop requests whose callers already gave up
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            for request in batch:
+                self.queue_wait_hist.observe((started - request.enqueued_at) * 1000)
+            self.batch_size_hist.observe(len(batch))
+
+            try:
+                results = self.run_batch([r.text for r in batch], *key)
+                for request, result in zip(batch, results):
+                    request.future.set_result(result)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_batch_scheduler(name, run_batch, max_batch_size=8, max_wait_ms=5, max_concurrent_batches=1):
+    """Return the process-wide scheduler registered under name"""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(name)
+        if scheduler is None:
+            scheduler = BatchScheduler(run_batch, max_batch_size, max_wait_ms, max_concurrent_batches)
+            _schedulers[name] = scheduler
+        return scheduler
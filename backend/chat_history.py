@@ -0,0 +1,142 @@
+"""
+Bounded chat history
+Keeps the most recent messages in memory and pages older ones out to
+compressed fixed-size chunks (on disk, or in memory without an archive
+directory), so a long-running session's memory and rerun cost stay flat.
+A message's ID is its position in the conversation and never changes,
+so widget keys derived from it stay stable whichever page shows it.
+"""
+
+from collections import deque
+import itertools
+import threading
+import weakref
+import shutil
+import json
+import uuid
+import zlib
+import os
+
+
+class ChatMessage:
+    """One chat turn"""
+
+    __slots__ = ("id", "role", "content", "translation", "translations", "target")
+
+    def __init__(self, id, role, content, translation=None, translations=None, target=None):
+        self.id = id
+        self.role = role
+        self.content = content
+        self.translation = translation
+        # {language: translation} for "translate to all" turns
+        self.translations = translations
+        # Language of the translation, for the Listen button
+        self.target = target
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class ChatHistory:
+    def __init__(self, max_retained=200, chunk_size=50, archive_dir=None):
+        # At least one chunk stays in memory so pages can be cut from the recent window
+        self.chunk_size = max(1, chunk_size)
+        self.max_retained = max(max_retained, self.chunk_size)
+        self.archive_dir = None
+        if archive_dir:
+            self.archive_dir = os.path.join(archive_dir, uuid.uuid4().hex)
+            # The archive belongs to this session only; drop it with the history
+            weakref.finalize(self, shutil.rmtree, self.archive_dir, True)
+        self._recent = deque()
+        self._chunks = []  # compressed bytes, or chunk file paths with an archive_dir
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._next_id
+
+    @property
+    def archived(self):
+        """Number of messages paged out of memory"""
+        return len(self._chunks) * self.chunk_size
+
+    def append(self, role, content, **fields):
+        """Add a message and return its ID"""
+        with self._lock:
+            message = ChatMessage(self._next_id, role, content, **fields)
+            self._next_id += 1
+            self._recent.append(message)
+            while len(self._recent) > self.max_retained:
+                self._archive_chunk()
+            return message.id
+
+    def _archive_chunk(self):
+        chunk = [self._recent.popleft().to_dict() for _ in range(self.chunk_size)]
+        data = zlib.compress(json.dumps(chunk, ensure_ascii=False).encode("utf-8"))
+        if self.archive_dir is None:
+            self._chunks.append(data)
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{len(self._chunks):06d}.json.z")
+        with open(path, "wb") as f:
+            f.write(data)
+        self._chunks.append(path)
+
+    def _read_chunk(self, index):
+        data = self._chunks[index]
+        if self.archive_dir is not None:
+            with open(data, "rb") as f:
+                data = f.read()
+        return [ChatMessage.from_dict(item) for item in json.loads(zlib.decompress(data))]
+
+    def slice(self, start, end):
+        """Messages with positions start..end-1 (position == ID)"""
+        with self._lock:
+            start = max(0, start)
+            end = min(end, self._next_id)
+            archived = self.archived
+            messages = []
+            # Only the archived chunks overlapping the range are read back
+            archived_end = min(end, archived)
+            for index in range(start // self.chunk_size, -(-archived_end // self.chunk_size)):
+                first = index * self.chunk_size
+                messages.extend(
+                    message for offset, message in enumerate(self._read_chunk(index))
+                    if start <= first + offset < end
+                )
+            recent_start = max(start, archived) - archived
+            recent_end = end - archived
+            if recent_end > recent_start:
+                messages.extend(itertools.islice(self._recent, recent_start, recent_end))
+            return messages
+
+    def page_count(self, page_size):
+        return max(1, -(-self._next_id // page_size))
+
+    def page(self, number, page_size):
+        """Page 0 is the newest page_size messages, page 1 the ones before, ..."""
+        end = self._next_id - number * page_size
+        return self.slice(end - page_size, end)
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._chunks = []
+            self._next_id = 0
+            if self.archive_dir is not None:
+                shutil.rmtree(self.archive_dir, ignore_errors=True)
+
+    def stats(self):
+        return {
+            "messages": self._next_id,
+            "in_memory": len(self._recent),
+            "archived": self.archived,
+            "archive_bytes": sum(
+                os.path.getsize(chunk) if self.archive_dir is not None else len(chunk)
+                for chunk in self._chunks
+            ),
+        }
@@ -0,0 +1,193 @@
+"""
+Approximate phrase matching
+Catches near misses like "how r you" or "helo" before they reach the
+neural model. Candidates are found by character similarity, then checked
+word by word: only spelling slips and inflections of longer words are
+forgiven, so "who are you" never borrows the answer for "how are you".
+"""
+
+from collections import Counter
+import threading
+import time
+
+from backend.metrics import Histogram
+from backend.text_normalization import normalize_text, fold_diacritics
+
+
+# Chat shorthand expanded before matching ("how r u" -> "how are you")
+SHORTHAND = {
+    "r": "are",
+    "u": "you",
+    "ur": "your",
+    "pls": "please",
+    "plz": "please",
+    "thx": "thanks",
+    "tnx": "thanks",
+}
+
+# Shorter words differ by meaning, not spelling ("who"/"how", "our"/"your")
+TYPO_MIN_LENGTH = 4
+
+
+def _expand_shorthand(key):
+    return " ".join(SHORTHAND.get(word, word) for word in key.split())
+
+
+def _trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """Edit distance between a and b, or max_distance + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def word_distance(a, b):
+    """Edit distance with adjacent transpositions counted once ("teh" -> "the")"""
+    rows = [list(range(len(b) + 1))]
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            row[j] = min(
+                rows[i - 1][j] + 1,
+                row[j - 1] + 1,
+                rows[i - 1][j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], rows[i - 2][j - 2] + 1)
+        rows.append(row)
+    return rows[-1][-1]
+
+
+def same_words(key, candidate_key, vocabulary=()):
+    """
+    Whether key could be a misspelling of candidate_key: the same words in
+    the same order (or only the spacing differs), where each differing
+    word is a small slip in a word of TYPO_MIN_LENGTH+ letters that starts
+    with the same letter and isn't itself a word in vocabulary
+    """
+    words = key.split()
+    candidate_words = candidate_key.split()
+    if "".join(words) == "".join(candidate_words):
+        return True
+    if len(words) != len(candidate_words):
+        return False
+    for word, candidate_word in zip(words, candidate_words):
+        if word == candidate_word:
+            continue
+        if word in vocabulary:
+            # A real, different word: a substitution, not a typo
+            return False
+        if min(len(word), len(candidate_word)) < TYPO_MIN_LENGTH or word[0] != candidate_word[0]:
+            return False
+        allowed = 1 if len(candidate_word) < 8 else 2
+        if word_distance(word, candidate_word) > allowed:
+            return False
+    return True
+
+
+class FuzzyPhraseMatcher:
+    def __init__(self, phrases, threshold=0.8, min_length=4, max_candidates=10):
+        # phrases: {category: [phrase records]} as stored in common_phrases.json
+        self.threshold = threshold
+        self.min_length = min_length
+        self.max_candidates = max_candidates
+
+        self._entries = {}  # language -> [(key, trigrams, phrase)]
+        self._postings = {}  # language -> {trigram: [entry index]}
+        self._vocabulary = {}  # language -> every word in the corpus
+        self._build(phrases)
+
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+        self.latency_hist = Histogram([0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10])
+
+    def _build(self, phrases):
+        for category in phrases.values():
+            for phrase in category:
+                for language, text in phrase.items():
+                    if not isinstance(text, str):
+                        continue
+                    key = fold_diacritics(normalize_text(text))
+                    if not key:
+                        continue
+                    entries = self._entries.setdefault(language, [])
+                    self._vocabulary.setdefault(language, set()).update(key.split())
+                    postings = self._postings.setdefault(language, {})
+                    grams = _trigrams(key)
+                    for gram in grams:
+                        postings.setdefault(gram, []).append(len(entries))
+                    entries.append((key, grams, phrase))
+
+    def match(self, text, source_lang, target_lang):
+        """Return (translation, score) for the closest phrase above the threshold, else None"""
+        start = time.perf_counter()
+        result = self._match(text, source_lang, target_lang)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.latency_hist.observe(elapsed_ms)
+        with self._lock:
+            self.lookups += 1
+            if result is not None:
+                self.matches += 1
+        return result
+
+    def _match(self, text, source_lang, target_lang):
+        key = _expand_shorthand(fold_diacritics(normalize_text(text)))
+        entries = self._entries.get(source_lang)
+        if len(key) < self.min_length or not entries:
+            return None
+
+        postings = self._postings[source_lang]
+        grams = _trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            for index in postings.get(gram, ()):
+                shared[index] += 1
+
+        best = None
+        for index, common in shared.most_common(self.max_candidates):
+            candidate_key, candidate_grams, phrase = entries[index]
+            # Cheap Dice pre-filter before the edit distance check
+            if 2 * common / (len(grams) + len(candidate_grams)) < self.threshold / 2:
+                continue
+            longest = max(len(key), len(candidate_key))
+            max_distance = int(longest * (1 - self.threshold))
+            distance = bounded_levenshtein(key, candidate_key, max_distance)
+            if distance > max_distance:
+                continue
+            if not same_words(key, candidate_key, self._vocabulary[source_lang]):
+                continue
+            score = 1 - distance / longest
+            if phrase.get(target_lang) and (best is None or score > best[1]):
+                best = (phrase[target_lang], score)
+        return best
+
+    def stats(self):
+        with self._lock:
+            lookups, matches = self.lookups, self.matches
+        return {
+            "lookups": lookups,
+            "matches": matches,
+            "match_rate": matches / lookups if lookups else None,
+            "latency_ms": self.latency_hist.snapshot(),
+        }
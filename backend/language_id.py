@@ -0,0 +1,114 @@
+"""
+Source-language identification
+A character n-gram (1-3) naive Bayes model over the supported languages,
+trained from the phrase corpus. Detection is a few dozen dictionary
+lookups, well under a millisecond for chat-sized input.
+
+Overlapping n-grams are far from independent, so the raw naive Bayes
+posterior saturates (0.999 for a sentence it gets wrong). Confidence is
+instead a softmax over the log-likelihood per n-gram, sharpened by
+CALIBRATION_TEMPERATURE, and the margin over the selected language is
+reported in the same unit (see scripts/language_id_eval.py).
+"""
+
+from collections import Counter
+import math
+
+from backend.text_normalization import normalize_text
+
+ORDERS = (1, 2, 3)
+# Minimises log loss on the phrase corpus by leave-one-out
+# (python -m scripts.language_id_eval --calibrate); the evaluation's other
+# sets are not fitted on
+CALIBRATION_TEMPERATURE = 7.5
+
+
+def char_ngrams(text, orders=ORDERS):
+    """Character n-grams of normalized text, padded with spaces at word edges"""
+    padded = f" {normalize_text(text)} "
+    for n in orders:
+        for i in range(len(padded) - n + 1):
+            yield padded[i:i + n]
+
+
+class LanguageIdentifier:
+    def __init__(self, samples, smoothing=0.5):
+        """samples: {language: [texts]}"""
+        self.languages = sorted(language for language, texts in samples.items() if texts)
+        self._log_probs = {}
+        self._unseen = {}
+        vocabulary = set()
+        counts = {}
+        for language in self.languages:
+            counts[language] = Counter(
+                gram for text in samples[language] for gram in char_ngrams(text)
+            )
+            vocabulary.update(counts[language])
+
+        # Additive smoothing over the shared vocabulary (+1 for unseen n-grams)
+        size = len(vocabulary) + 1
+        for language, grams in counts.items():
+            total = sum(grams.values()) + smoothing * size
+            self._log_probs[language] = {
+                gram: math.log((count + smoothing) / total) for gram, count in grams.items()
+            }
+            self._unseen[language] = math.log(smoothing / total)
+
+    def scores(self, text):
+        """Log-likelihood of text under each language and the n-gram count"""
+        grams = list(char_ngrams(text))
+        scores = {}
+        for language in self.languages:
+            table = self._log_probs[language]
+            unseen = self._unseen[language]
+            scores[language] = sum(table.get(gram, unseen) for gram in grams)
+        return scores, len(grams)
+
+    def detect(self, text):
+        """
+        (language, confidence) for text, or (None, 0.0) when it has no letters
+        confidence is the calibrated probability of the best language
+        """
+        language, confidence, _ = self.assess(text)
+        return language, confidence
+
+    def per_gram_scores(self, text):
+        """Log-likelihood per n-gram under each language ({} when text has no letters)"""
+        if not self.languages or not normalize_text(text):
+            return {}
+        scores, count = self.scores(text)
+        return {language: score / count for language, score in scores.items()}
+
+    def assess(self, text, selected=None, temperature=CALIBRATION_TEMPERATURE):
+        """
+        (language, confidence, margin) for text, or (None, 0.0, 0.0) when it
+        has no letters; margin is how much better the best language explains
+        the text than selected, in log-likelihood per n-gram (0.0 when
+        selected is the best language or not one of the languages)
+        """
+        return assess_scores(self.per_gram_scores(text), selected, temperature)
+
+
+def assess_scores(per_gram, selected=None, temperature=CALIBRATION_TEMPERATURE):
+    """LanguageIdentifier.assess from precomputed per_gram_scores"""
+    if not per_gram:
+        return None, 0.0, 0.0
+    best = max(per_gram, key=per_gram.get)
+    top = per_gram[best]
+    total = sum(math.exp(temperature * (score - top)) for score in per_gram.values())
+    margin = top - per_gram[selected] if selected in per_gram else 0.0
+    return best, 1.0 / total, margin
+
+
+def samples_from_phrases(phrases, exclude=None):
+    """{language: [texts]} from a phrase corpus, optionally leaving one record out"""
+    samples = {}
+    for records in phrases.values():
+        for phrase in records:
+            if phrase is exclude:
+                continue
+            for language, text in phrase.items():
+                if isinstance(text, str) and text.strip():
+                    samples.setdefault(language, []).append(text)
+    return samples
+
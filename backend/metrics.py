@@ -0,0 +1,316 @@
+"""
+Lightweight in-process metrics
+Counters, gauges and per-stage latency spans, exported in the Prometheus text
+format (GET /metrics on the API, or a file rewritten periodically).
+When settings.METRICS_ENABLED is off, span(), inc() and set_gauge()
+return at once.
+"""
+
+from collections import deque
+import threading
+import resource
+import time
+import os
+
+from config import settings
+
+PREFIX = "translator"
+# Latency buckets (ms) shared by every stage span
+STAGE_BUCKETS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Histogram:
+    """Bucketed histogram that also keeps a window of recent samples for percentiles"""
+
+    def __init__(self, buckets, window=2048):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            self._recent.append(value)
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self._counts[i] += 1
+                    break
+            else:
+                self._counts[-1] += 1
+
+    def totals(self):
+        """(cumulative count per bucket incl. +Inf, count, sum) as Prometheus expects"""
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.sum
+        cumulative = []
+        running = 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, count, total
+
+    def percentile(self, pct):
+        """Percentile (0-100) over the recent window, or None when empty"""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self.count, self.sum
+        buckets = {f"<={upper}": counts[i] for i, upper in enumerate(self.buckets)}
+        buckets["+Inf"] = counts[-1]
+        return {
+            "count": count,
+            "mean": total / count if count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class Counter:
+    """Monotonic counter"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down (last set wins)"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+
+# Counters incremented across the pipeline; names are exported as translator_<name>_total
+COUNTERS = {
+    "phrase_hits": "Requests answered by the phrase database",
+    "cache_hits": "Requests answered by the translation cache",
+    "fuzzy_hits": "Requests answered by a close phrase match",
+    "model_translations": "Texts translated by the model",
+    "model_calls": "generate calls run by the model",
+    "failures": "Translations that failed",
+    "language_corrections": "Requests whose source language was corrected by language identification",
+    "coalesced": "Requests that shared an identical in-progress model call",
+    "input_tokens": "Source tokens sent to the model",
+    "output_tokens": "Tokens generated by the model",
+    "long_texts": "Long texts translated sentence by sentence",
+    "long_text_chunks": "Sentence chunks translated for long texts",
+    "tts_requests": "Speech synthesis requests",
+    "asr_requests": "Speech recognition requests",
+    "worker_restarts": "Inference worker processes that died and were restarted",
+    "api_rejected": "API requests rejected because the server was full",
+    "api_timeouts": "API requests that timed out",
+    "admission_reduced": "Requests decoded with reduced beams by admission control",
+    "admission_approximate": "Requests limited to phrase and cache answers by admission control",
+    "admission_rejected": "Requests rejected by admission control",
+    "admission_escalations": "Admission tier changes towards more degradation",
+    "admission_recoveries": "Admission tier changes back towards normal",
+}
+
+# Gauges set across the pipeline; names are exported as translator_<name>
+GAUGES = {
+    "admission_tier": "Admission tier (0 normal, 1 reduced beams, 2 approximate, 3 rejecting)",
+    "admission_in_flight": "Requests admitted and not yet finished",
+}
+
+_counters = {}
+_gauges = {}
+_stages = {}
+_registry_lock = threading.Lock()
+
+
+def enabled():
+    return settings.METRICS_ENABLED
+
+
+def get_counter(name):
+    counter = _counters.get(name)
+    if counter is None:
+        with _registry_lock:
+            counter = _counters.setdefault(
+                name, Counter(f"{PREFIX}_{name}_total", COUNTERS.get(name, ""))
+            )
+    return counter
+
+
+def inc(name, amount=1):
+    """Add amount to a pipeline counter (no-op while metrics are disabled)"""
+    if settings.METRICS_ENABLED:
+        get_counter(name).inc(amount)
+
+
+def set_gauge(name, value):
+    """Set a pipeline gauge (no-op while metrics are disabled)"""
+    if not settings.METRICS_ENABLED:
+        return
+    gauge = _gauges.get(name)
+    if gauge is None:
+        with _registry_lock:
+            gauge = _gauges.setdefault(name, Gauge(f"{PREFIX}_{name}", GAUGES.get(name, "")))
+    gauge.set(value)
+
+
+def stage_histogram(stage):
+    histogram = _stages.get(stage)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _stages.setdefault(stage, Histogram(STAGE_BUCKETS))
+    return histogram
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stage_histogram(self.stage).observe((time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage):
+    """
+    Time a pipeline stage into translator_stage_latency_ms{stage=...}
+        with metrics.span("generate"):
+            ...
+    """
+    if not settings.METRICS_ENABLED:
+        return _NOOP_SPAN
+    return _Span(stage)
+
+
+def snapshot():
+    """Counters, gauges and stage latency summaries as a dict (for /stats)"""
+    return {
+        "counters": {name: counter.value for name, counter in sorted(_counters.items())},
+        "gauges": {name: gauge.value for name, gauge in sorted(_gauges.items())},
+        "stages_ms": {stage: histogram.snapshot() for stage, histogram in sorted(_stages.items())},
+    }
+
+
+def prometheus_text():
+    """Every counter, gauge and stage histogram in the Prometheus text exposition format"""
+    lines = []
+    for name, counter in sorted(_counters.items()):
+        lines.append(f"# HELP {counter.name} {counter.help}")
+        lines.append(f"# TYPE {counter.name} counter")
+        lines.append(f"{counter.name} {counter.value}")
+    for name, gauge in sorted(_gauges.items()):
+        lines.append(f"# HELP {gauge.name} {gauge.help}")
+        lines.append(f"# TYPE {gauge.name} gauge")
+        lines.append(f"{gauge.name} {gauge.value}")
+
+    if _stages:
+        family = f"{PREFIX}_stage_latency_ms"
+        lines.append(f"# HELP {family} Latency of each pipeline stage in milliseconds")
+        lines.append(f"# TYPE {family} histogram")
+        for stage, histogram in sorted(_stages.items()):
+            cumulative, count, total = histogram.totals()
+            for upper, value in zip(histogram.buckets + ["+Inf"], cumulative):
+                lines.append(f'{family}_bucket{{stage="{stage}",le="{upper}"}} {value}')
+            lines.append(f'{family}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{family}_count{{stage="{stage}"}} {count}')
+
+    lines.append(f"# HELP {PREFIX}_rss_bytes Resident memory of this process")
+    lines.append(f"# TYPE {PREFIX}_rss_bytes gauge")
+    lines.append(f"{PREFIX}_rss_bytes {int(current_rss_mb() * 1024 * 1024)}")
+    return "\n".join(lines) + "\n"
+
+
+_sink = None
+
+
+def start_file_sink(path=None, interval_seconds=None):
+    """
+    Rewrite path with prometheus_text() every interval_seconds (e.g. for the
+    node_exporter textfile collector); does nothing unless a path is configured
+    """
+    global _sink
+    path = path or settings.METRICS_FILE
+    if not path or not settings.METRICS_ENABLED:
+        return None
+    interval_seconds = interval_seconds or settings.METRICS_FILE_INTERVAL_SECONDS
+    with _registry_lock:
+        if _sink is None:
+            _sink = threading.Thread(
+                target=_write_file_sink,
+                args=(path, interval_seconds),
+                name="metrics-file-sink",
+                daemon=True
+            )
+            _sink.start()
+    return _sink
+
+
+def _write_file_sink(path, interval_seconds):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    while True:
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(prometheus_text())
+            # Readers never see a half-written file
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        time.sleep(interval_seconds)
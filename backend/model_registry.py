@@ -0,0 +1,343 @@
+"""
+Process-wide NLLB model registry
+Loads the tokenizer and weights once per process and shares them
+across every Streamlit session and rerun
+"""
+
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+import torch
+import threading
+import logging
+import shutil
+import time
+import gc
+import os
+
+from backend.metrics import current_rss_mb, peak_rss_mb
+from backend.tokenization import TokenizationLayer
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "int8", "bf16")
+
+
+def cpu_supports_bf16():
+    """True when the CPU has native bf16 instructions (AVX512-BF16 or AMX)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def ensure_safetensors(model_dir):
+    """
+    Convert pytorch_model.bin to model.safetensors once, so later loads can
+    memory-map the weights instead of unpickling a full copy
+    Returns True if a conversion happened
+    """
+    safetensors_path = os.path.join(model_dir, "model.safetensors")
+    bin_path = os.path.join(model_dir, "pytorch_model.bin")
+    if os.path.exists(safetensors_path) or not os.path.exists(bin_path):
+        return False
+
+    logger.info("Converting pytorch_model.bin to model.safetensors (one-off)...")
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_dir,
+        local_files_only=True,
+        low_cpu_mem_usage=False
+    )
+    staging_dir = os.path.join(model_dir, ".safetensors-tmp")
+    try:
+        model.save_pretrained(staging_dir, safe_serialization=True)
+        os.replace(os.path.join(staging_dir, "model.safetensors"), safetensors_path)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        del model
+        gc.collect()
+    return True
+
+
+def apply_precision(model, precision, device):
+    """Convert a loaded fp32 model to the requested precision"""
+    if precision == "int8":
+        if device != "cpu":
+            raise ValueError("int8 dynamic quantization is only available on CPU")
+        return torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    if precision == "bf16":
+        if device == "cpu" and not cpu_supports_bf16():
+            raise ValueError("CPU has no native bf16 support")
+        return model.to(torch.bfloat16)
+    return model
+
+
+class LoadedModel:
+    """Tokenizer, weights and device of one loaded model"""
+
+    def __init__(self, tokenizer, model, device):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.device = device
+        # Encode/decode through this; it never mutates the shared tokenizer
+        self.tokens = TokenizationLayer(tokenizer)
+
+
+class ModelRegistry:
+    def __init__(self, model_dir, precision="fp32"):
+        self.model_dir = model_dir
+        # Requested precision; after loading this is the precision actually in use
+        self.precision = precision
+        self.requested_precision = precision
+        self._lock = threading.RLock()
+        self._loaded = None
+        self._loader = None
+        self.load_error = None
+        self.load_count = 0
+        self.load_time = None
+        self.rss_after_load_mb = None
+        # Seconds spent in each startup phase of the last load
+        self.phase_times = {}
+
+    def get(self):
+        """Return the loaded model, loading it on first use"""
+        loaded = self._loaded
+        if loaded is not None:
+            return loaded
+
+        with self._lock:
+            loader = self._loader
+            if self._loaded is None and loader is None:
+                self._loaded = self._load()
+            if self._loaded is not None:
+                return self._loaded
+
+        # A background load is in progress: wait for it instead of loading twice
+        loader.join()
+        return self.get()
+
+    def start_background_load(self, warmup=True):
+        """Load (and warm up) the model in a background thread; returns immediately"""
+        with self._lock:
+            if self._loaded is not None or (self._loader is not None and self._loader.is_alive()):
+                return
+            self.load_error = None
+            self._loader = threading.Thread(
+                target=self._background_load,
+                args=(warmup,),
+                name="nllb-loader",
+                daemon=True
+            )
+            self._loader.start()
+
+    def _background_load(self, warmup):
+        try:
+            loaded = self._load()
+            if warmup:
+                self._warmup(loaded)
+            with self._lock:
+                self._loaded = loaded
+        except Exception as e:
+            self.load_error = str(e)
+            logger.error("Background model load failed: %s", e)
+        finally:
+            self._loader = None
+
+    def _warmup(self, loaded):
+        """Run one generate per language pair so the first real request is at steady-state speed"""
+        from backend.nllb_service import generate_translations
+        from config.languages import SUPPORTED_LANGUAGES
+
+        start = time.perf_counter()
+        for source_lang in SUPPORTED_LANGUAGES:
+            for target_lang in SUPPORTED_LANGUAGES:
+                if source_lang != target_lang:
+                    generate_translations(loaded, ["Hello"], source_lang, target_lang)
+        self.phase_times["warmup"] = time.perf_counter() - start
+        logger.info("Model warmed up in %.1fs", self.phase_times["warmup"])
+
+    def is_loaded(self):
+        return self._loaded is not None
+
+    def is_loading(self):
+        return self._loader is not None
+
+    def unload(self):
+        """Drop the shared model so its memory can be reclaimed"""
+        self._join_loader()
+        with self._lock:
+            self._drop()
+
+    def reload(self):
+        """Unload and load the model again (e.g. after replacing the weights)"""
+        while True:
+            self._join_loader()
+            with self._lock:
+                if self._loader is not None:
+                    # Another background load started meanwhile; let it finish first
+                    continue
+                self._drop()
+                self._loaded = self._load()
+                return self._loaded
+
+    def _join_loader(self):
+        # Never called with the lock held: the loader takes it to publish the model
+        loader = self._loader
+        if loader is not None:
+            loader.join()
+
+    def _drop(self):
+        if self._loaded is None:
+            return
+        device = self._loaded.device
+        self._loaded = None
+        gc.collect()
+        if device == "cuda":
+            torch.cuda.empty_cache()
+        logger.info("Model unloaded from %s", self.model_dir)
+
+    def stats(self):
+        """Load time and memory figures for monitoring"""
+        loaded = self._loaded
+        return {
+            "model_dir": self.model_dir,
+            "loaded": loaded is not None,
+            "device": loaded.device if loaded else None,
+            "precision": self.precision,
+            "load_count": self.load_count,
+            "load_time_s": self.load_time,
+            "loading": self.is_loading(),
+            "load_error": self.load_error,
+            "phase_times_s": dict(self.phase_times),
+            "tokenization": loaded.tokens.stats() if loaded else None,
+            "rss_after_load_mb": self.rss_after_load_mb,
+            "rss_mb": current_rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def _load(self):
+        # Check if model exists
+        if not os.path.exists(self.model_dir):
+            raise ValueError(
+                f"Model not found at {self.model_dir}. "
+                "Please run 'python download_model.py' first."
+            )
+
+        logger.info("Loading NLLB model from local directory...")
+        start = time.perf_counter()
+        phases = {}
+
+        try:
+            # Always load to CPU first to avoid meta tensor issues
+            # We'll move to GPU later if needed and possible
+            device = "cpu"
+
+            # Load tokenizer and model from local directory
+            phase_start = time.perf_counter()
+            tokenizer = AutoTokenizer.from_pretrained(
+                self.model_dir,
+                local_files_only=True
+            )
+            phases["tokenizer"] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            try:
+                if ensure_safetensors(self.model_dir):
+                    phases["convert"] = time.perf_counter() - phase_start
+            except Exception as e:
+                # Read-only model dir, full disk, ...: the .bin still loads
+                logger.warning("Could not convert to safetensors (%s), loading pytorch_model.bin", e)
+
+            # safetensors weights are memory-mapped with low_cpu_mem_usage, so
+            # peak memory stays near one model copy instead of two
+            phase_start = time.perf_counter()
+            try:
+                model = AutoModelForSeq2SeqLM.from_pretrained(
+                    self.model_dir,
+                    local_files_only=True,
+                    low_cpu_mem_usage=True
+                )
+            except (NotImplementedError, RuntimeError) as e:
+                error_msg = str(e).lower()
+                if "meta tensor" not in error_msg and "to_empty" not in error_msg:
+                    raise
+                # Load model to CPU explicitly to avoid meta tensor issues
+                logger.warning("Memory-mapped load hit a meta tensor issue, loading eagerly")
+                model = AutoModelForSeq2SeqLM.from_pretrained(
+                    self.model_dir,
+                    local_files_only=True,
+                    low_cpu_mem_usage=False
+                )
+            phases["weights"] = time.perf_counter() - phase_start
+
+            # Set to evaluation mode before any device movement
+            model.eval()
+
+            # Try to move to GPU if available (only after successful CPU load)
+            phase_start = time.perf_counter()
+            if torch.cuda.is_available():
+                try:
+                    model = model.to("cuda")
+                    device = "cuda"
+                    logger.info("Model moved to CUDA")
+                except (NotImplementedError, RuntimeError, Exception) as e:
+                    error_msg = str(e).lower()
+                    if "meta tensor" in error_msg or "to_empty" in error_msg:
+                        logger.warning("Could not move model to CUDA (meta tensor issue), keeping on CPU")
+                    else:
+                        # For other errors, log but keep on CPU
+                        logger.warning("Could not move model to CUDA: %s, keeping on CPU", e)
+                    device = "cpu"
+            phases["device"] = time.perf_counter() - phase_start
+
+            # Reduced precision is best effort: any failure keeps fp32
+            phase_start = time.perf_counter()
+            precision = self.requested_precision
+            if precision != "fp32":
+                try:
+                    model = apply_precision(model, precision, device)
+                    model.eval()
+                    logger.info("Using %s inference", precision)
+                except Exception as e:
+                    logger.warning("Could not enable %s inference: %s, using fp32", precision, e)
+                    precision = "fp32"
+            self.precision = precision
+            phases["precision"] = time.perf_counter() - phase_start
+
+        except Exception as e:
+            raise ValueError(f"Failed to load model: {e}")
+
+        self.load_count += 1
+        self.load_time = time.perf_counter() - start
+        self.rss_after_load_mb = current_rss_mb()
+        self.phase_times = phases
+        logger.info(
+            "Model loaded successfully on %s (%s) in %.1fs (RSS %.0f MB)",
+            device, self.precision, self.load_time, self.rss_after_load_mb
+        )
+        logger.info("Startup phases: %s", ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases.items()))
+        return LoadedModel(tokenizer, model, device)
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(model_dir=None, precision=None):
+    """Return the shared registry for a model directory and precision"""
+    model_dir = model_dir or settings.NLLB_MODEL_DIR
+    precision = (precision or settings.NLLB_PRECISION).lower()
+    if precision not in PRECISIONS:
+        logger.warning("Unknown precision '%s', using fp32", precision)
+        precision = "fp32"
+
+    key = (os.path.abspath(model_dir), precision)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = ModelRegistry(model_dir, precision)
+            _registries[key] = registry
+        return registry
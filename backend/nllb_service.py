@@ -3,108 +3,397 @@ Offline NLLB Translation Service
 Uses locally downloaded model instead of API
 """
 
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
-import os
+from transformers import TextIteratorStreamer
+from transformers.modeling_outputs import BaseModelOutput
+from concurrent.futures import TimeoutError as FutureTimeoutError, as_completed
+import threading
+import logging
+import time
+
+from backend import metrics
+from backend.model_registry import get_model_registry
+from backend.metrics import Histogram
+from backend.batch_scheduler import get_batch_scheduler
+from backend.worker_pool import get_worker_pool, plan_workers
+from backend.segmentation import split_sentences, join_sentences
+from config import settings
+from config.decoding import DECODING_PROFILES, resolve_profile, generation_kwargs
+
+logger = logging.getLogger(__name__)
+
+# Streaming needs greedy decoding: the streamer can't follow several beams
+STREAMING_PROFILE = "fast"
+
 
 class NLLBTranslator:
-    def __init__(self):
-        self.model_dir = "./nllb_model"
-        
-        # Check if model exists
-        if not os.path.exists(self.model_dir):
-            raise ValueError(
-                f"Model not found at {self.model_dir}. "
-                "Please run 'python download_model.py' first."
-            )
-        
-        print("[INFO] Loading NLLB model from local directory...")
-        
-        try:
-            # Always load to CPU first to avoid meta tensor issues
-            # We'll move to GPU later if needed and possible
-            self.device = "cpu"
-            
-            # Load tokenizer and model from local directory
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_dir,
-                local_files_only=True
+    def __init__(self, model_dir=None, precision=None):
+        # The registry loads the model once per process; every translator
+        # created afterwards (one per Streamlit session/rerun) reuses it
+        self.registry = get_model_registry(model_dir, precision)
+        self.model_dir = self.registry.model_dir
+        if settings.BACKGROUND_LOAD:
+            # Return immediately; the phrase database serves while weights load
+            self.registry.start_background_load(warmup=settings.WARMUP_ENABLED)
+        else:
+            self.registry.get()
+
+        # Optional multi-process inference; the weights are shared, not copied.
+        # The pool starts on first use, once the weights are loaded
+        self.pool = None
+        self._pool_workers = 0
+        if settings.WORKER_POOL_WORKERS != 0:
+            self._pool_workers, _ = plan_workers(
+                workers=max(0, settings.WORKER_POOL_WORKERS),
+                threads=settings.WORKER_POOL_THREADS
             )
-            
-            # Load model to CPU explicitly to avoid meta tensor issues
-            # Don't specify torch_dtype to let it use default, which avoids meta tensor issues
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(
-                self.model_dir,
-                local_files_only=True,
-                low_cpu_mem_usage=False
+
+        # Concurrent requests are grouped into batched generate calls
+        self.scheduler = None
+        if settings.BATCHING_ENABLED:
+            self.scheduler = get_batch_scheduler(
+                (self.model_dir, self.registry.requested_precision),
+                self.translate_batch,
+                max_batch_size=settings.BATCH_MAX_SIZE,
+                max_wait_ms=settings.BATCH_MAX_WAIT_MS,
+                # Keep every worker busy with its own batch
+                max_concurrent_batches=max(1, self._pool_workers)
             )
-            
-            # Set to evaluation mode before any device movement
-            self.model.eval()
-            
-            # Try to move to GPU if available (only after successful CPU load)
-            if torch.cuda.is_available():
-                try:
-                    self.model = self.model.to("cuda")
-                    self.device = "cuda"
-                    print(f"[INFO] Model moved to CUDA")
-                except (NotImplementedError, RuntimeError, Exception) as e:
-                    error_msg = str(e).lower()
-                    if "meta tensor" in error_msg or "to_empty" in error_msg:
-                        print(f"[WARNING] Could not move model to CUDA (meta tensor issue), keeping on CPU")
-                        self.device = "cpu"
-                    else:
-                        # For other errors, log but keep on CPU
-                        print(f"[WARNING] Could not move model to CUDA: {e}, keeping on CPU")
-                        self.device = "cpu"
-            
-            print(f"[INFO] Model loaded successfully on {self.device}")
-            
-        except Exception as e:
-            raise ValueError(f"Failed to load model: {e}")
-    
-    def translate(self, text, source_lang, target_lang):
+
+        # Streaming latency: time to first token vs. whole translation
+        self.ttft_hist = Histogram([50, 100, 250, 500, 1000, 2500, 5000])
+        self.stream_total_hist = Histogram([100, 250, 500, 1000, 2500, 5000, 10000, 30000])
+
+        # Long text: chunks per text, and each chunk's wait for its translation
+        self.long_chunks_hist = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.chunk_latency_hist = Histogram([50, 100, 250, 500, 1000, 2500, 5000, 10000])
+
+        # Multi-target: encoder passes avoided by sharing one encoding across targets
+        self.multi_requests = 0
+        self.multi_targets = 0
+        self.multi_encoder_ms_saved = 0.0
+
+    @property
+    def tokenizer(self):
+        return self.registry.get().tokenizer
+
+    @property
+    def model(self):
+        return self.registry.get().model
+
+    @property
+    def device(self):
+        return self.registry.get().device
+
+    @property
+    def precision(self):
+        return self.registry.precision
+
+    def is_ready(self):
+        """Whether the weights are loaded (and warmed up)"""
+        return self.registry.is_loaded()
+
+    def _get_pool(self):
+        if self.pool is None and self._pool_workers:
+            try:
+                self.pool = get_worker_pool(
+                    (self.model_dir, self.registry.requested_precision),
+                    self.registry.get(),
+                    workers=self._pool_workers,
+                    threads=settings.WORKER_POOL_THREADS
+                )
+            except Exception as e:
+                logger.warning("Could not start inference workers: %s, running in-process", e)
+                self._pool_workers = 0
+        return self.pool
+
+    def count_tokens(self, text):
+        """Number of subword tokens in text (without special tokens)"""
+        return self.registry.get().tokens.count(text)
+
+    def resolve_profile(self, text, profile=None):
+        """Concrete decoding profile for text ("auto" looks at its token count)"""
+        profile = profile or settings.DECODING_PROFILE
+        if profile in DECODING_PROFILES:
+            return profile
+        return resolve_profile(profile, self.count_tokens(text))
+
+    def translate(self, text, source_lang, target_lang, profile=None):
         """Translate text using local NLLB model"""
-        from config.languages import get_language_code
-        
-        src_code = get_language_code(source_lang)
-        tgt_code = get_language_code(target_lang)
-        
-        print(f"[DEBUG] Translating: '{text}' from {src_code} to {tgt_code}")
-        
         try:
-            # Set source language for tokenizer
-            self.tokenizer.src_lang = src_code
-            
-            # Tokenize input
-            inputs = self.tokenizer(
-                text, 
-                return_tensors="pt", 
-                padding=True, 
-                truncation=True,
-                max_length=512
-            ).to(self.device)
-            
-            # Generate translation with target language
-            translated_tokens = self.model.generate(
-                **inputs,
-                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(tgt_code),
-                max_length=512,
-                num_beams=5,
-                early_stopping=True
-            )
-            
-            # Decode output
-            translation = self.tokenizer.batch_decode(
-                translated_tokens, 
-                skip_special_tokens=True
-            )[0]
-            
-            print(f"[DEBUG] Translation result: '{translation}'")
-            return translation
-            
+            return self.translate_or_raise(text, source_lang, target_lang, profile)
         except KeyError as e:
             return f"Error: Language code not supported - {e}"
         except Exception as e:
-            print(f"[ERROR] Translation failed: {e}")
-            return "Translation failed. Please try again."
\ No newline at end of file
+            logger.error("Translation failed: %s", e)
+            return "Translation failed. Please try again."
+
+    def translate_or_raise(self, text, source_lang, target_lang, profile=None):
+        """Translate text, letting failures propagate to the caller"""
+        profile = self.resolve_profile(text, profile)
+        logger.debug("Translating %d chars from %s to %s (%s)", len(text), source_lang, target_lang, profile)
+
+        if self.scheduler is not None:
+            future = self.scheduler.submit(text, (source_lang, target_lang, profile))
+            translation = future.result()
+        else:
+            translation = self.translate_batch([text], source_lang, target_lang, profile)[0]
+
+        return translation
+
+    def translate_long(self, text, source_lang, target_lang, profile=None, return_stats=False):
+        """
+        Translate long text sentence by sentence
+        Chunks are translated as batches and reassembled with the original
+        whitespace and paragraph breaks. A chunk's latency runs from its
+        submission to its translation being ready; chunks decoded in one
+        generate call finish together, so they share that call's latency
+        """
+        start = time.perf_counter()
+        leading, segments = split_sentences(text, source_lang)
+        chunks = [chunk for chunk, _ in segments]
+        profiles = [self.resolve_profile(chunk, profile) for chunk in chunks]
+
+        if self.scheduler is not None:
+            # The scheduler groups the chunks into batched generate calls
+            submitted = {}
+            futures = []
+            for chunk, chunk_profile in zip(chunks, profiles):
+                future = self.scheduler.submit(chunk, (source_lang, target_lang, chunk_profile))
+                submitted[future] = time.perf_counter()
+                futures.append(future)
+            finished = {}
+            for future in as_completed(futures):
+                finished[future] = (time.perf_counter() - submitted[future]) * 1000
+            translations = [future.result() for future in futures]
+            chunk_latencies = [finished[future] for future in futures]
+        else:
+            translations = []
+            chunk_latencies = []
+            batch_size = max(1, settings.BATCH_MAX_SIZE)
+            for i in range(0, len(chunks), batch_size):
+                batch_start = time.perf_counter()
+                # One profile per batch: the strongest any chunk in it asked for
+                batch_profile = max(
+                    profiles[i:i + batch_size],
+                    key=lambda name: DECODING_PROFILES[name]["num_beams"]
+                )
+                translations.extend(
+                    self.translate_batch(chunks[i:i + batch_size], source_lang, target_lang, batch_profile)
+                )
+                elapsed = (time.perf_counter() - batch_start) * 1000
+                chunk_latencies.extend([elapsed] * len(chunks[i:i + batch_size]))
+
+        translation = join_sentences(
+            leading,
+            [(translated, separator) for translated, (_, separator) in zip(translations, segments)]
+        )
+        stats = {
+            "chunks": len(chunks),
+            "chunk_latency_ms": chunk_latencies,
+            "total_ms": (time.perf_counter() - start) * 1000,
+        }
+        self._record_long(stats)
+
+        if return_stats:
+            return translation, stats
+        return translation
+
+    def _record_long(self, stats):
+        self.long_chunks_hist.observe(stats["chunks"])
+        for latency in stats["chunk_latency_ms"]:
+            self.chunk_latency_hist.observe(latency)
+            if metrics.enabled():
+                metrics.stage_histogram("long_text_chunk").observe(latency)
+        metrics.inc("long_texts")
+        metrics.inc("long_text_chunks", stats["chunks"])
+        logger.info(
+            "Long text translated in %d chunks (%.0f ms, slowest chunk %.0f ms)",
+            stats["chunks"], stats["total_ms"], max(stats["chunk_latency_ms"], default=0)
+        )
+
+    def long_text_stats(self):
+        return {
+            "chunks": self.long_chunks_hist.snapshot(),
+            "chunk_latency_ms": self.chunk_latency_hist.snapshot(),
+        }
+
+    def translate_stream(self, text, source_lang, target_lang, profile=STREAMING_PROFILE):
+        """
+        Yield the translation piece by piece as tokens are generated
+        profile must decode greedily (num_beams 1): transformers streamers
+        don't support beam search
+        """
+        loaded = self.registry.get()
+        tokens = loaded.tokens
+        target_id = tokens.language_token_id(target_lang)
+
+        start = time.perf_counter()
+        with metrics.span("tokenize"):
+            inputs = tokens.encode_batch([text], source_lang, loaded.device)
+        input_tokens = inputs["input_ids"].shape[1]
+        metrics.inc("model_calls")
+        metrics.inc("input_tokens", input_tokens)
+
+        streamer = TextIteratorStreamer(loaded.tokenizer, skip_special_tokens=True)
+        errors = []
+
+        def run_generate():
+            try:
+                loaded.model.generate(
+                    **inputs,
+                    forced_bos_token_id=target_id,
+                    streamer=streamer,
+                    **generation_kwargs(profile, input_tokens)
+                )
+            except Exception as e:
+                errors.append(e)
+                # Unblock the consumer loop below
+                streamer.end()
+
+        worker = threading.Thread(target=run_generate, name="nllb-stream", daemon=True)
+        worker.start()
+
+        first_token_ms = None
+        for piece in streamer:
+            if not piece:
+                continue
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+                self.ttft_hist.observe(first_token_ms)
+            yield piece
+
+        worker.join()
+        if errors:
+            raise errors[0]
+
+        total_ms = (time.perf_counter() - start) * 1000
+        self.stream_total_hist.observe(total_ms)
+        if metrics.enabled():
+            metrics.stage_histogram("stream").observe(total_ms)
+        if first_token_ms is not None:
+            logger.debug("Streamed translation: first token %.0f ms, total %.0f ms", first_token_ms, total_ms)
+
+    def streaming_stats(self):
+        return {
+            "time_to_first_token_ms": self.ttft_hist.snapshot(),
+            "total_ms": self.stream_total_hist.snapshot(),
+        }
+
+    def translate_multi(self, text, source_lang, target_langs, profile=None):
+        """
+        Translate text into several languages, encoding it only once
+        Returns translations in the order of target_langs
+        """
+        target_langs = list(target_langs)
+        profile = self.resolve_profile(text, profile)
+        translations, encode_ms = generate_multi_target(
+            self.registry.get(), text, source_lang, target_langs, profile
+        )
+        # Separate calls would have tokenized and encoded once per target
+        self.multi_requests += 1
+        self.multi_targets += len(target_langs)
+        self.multi_encoder_ms_saved += encode_ms * (len(target_langs) - 1)
+        return translations
+
+    def multi_target_stats(self):
+        return {
+            "requests": self.multi_requests,
+            "targets": self.multi_targets,
+            "encoder_passes_saved": self.multi_targets - self.multi_requests,
+            "encoder_ms_saved": self.multi_encoder_ms_saved,
+        }
+
+    def translate_batch(self, texts, source_lang, target_lang, profile=None):
+        """Translate several texts of one language pair in a single generate call"""
+        pool = self._get_pool()
+        with metrics.span("model"):
+            if pool is not None:
+                future = pool.submit(texts, source_lang, target_lang, profile)
+                try:
+                    # Backstop for a worker lost before it reported taking the request
+                    return future.result(timeout=settings.WORKER_POOL_TIMEOUT_SECONDS)
+                except FutureTimeoutError:
+                    raise RuntimeError(
+                        f"Inference worker gave no result in {settings.WORKER_POOL_TIMEOUT_SECONDS:.0f}s"
+                    )
+            return generate_translations(self.registry.get(), texts, source_lang, target_lang, profile)
+
+
+def generate_translations(loaded, texts, source_lang, target_lang, profile=None):
+    """Run one batched generate call on a LoadedModel (shared with pool workers)"""
+    tokens = loaded.tokens
+    target_id = tokens.language_token_id(target_lang)
+
+    with metrics.span("tokenize"):
+        # Source language is passed per call; the shared tokenizer isn't touched
+        inputs = tokens.encode_batch(texts, source_lang, loaded.device)
+    
+    # Output length budget follows the longest input in the batch
+    input_tokens = inputs["input_ids"].shape[1]
+    profile = resolve_profile(profile or settings.DECODING_PROFILE, input_tokens)
+    
+    # Generate translation with target language
+    with metrics.span("generate"):
+        translated_tokens = loaded.model.generate(
+            **inputs,
+            forced_bos_token_id=target_id,
+            **generation_kwargs(profile, input_tokens)
+        )
+    _count_tokens(tokens, inputs, translated_tokens)
+    
+    # Decode output
+    with metrics.span("decode"):
+        return tokens.decode_batch(translated_tokens)
+
+
+def _count_tokens(tokens, inputs, translated_tokens):
+    """Count one generate call and its real (non-padding) input/output tokens"""
+    if not metrics.enabled():
+        return
+    metrics.inc("model_calls")
+    metrics.inc("input_tokens", int(inputs["attention_mask"].sum()))
+    metrics.inc("output_tokens", int((translated_tokens != tokens.pad_id).sum()))
+
+
+def generate_multi_target(loaded, text, source_lang, target_langs, profile=None):
+    """
+    Translate one text into several target languages with a single encoder pass
+    The encoder output is repeated once per target and each row's decoder
+    starts from its own target language token.
+    Returns (translations, milliseconds spent tokenizing and encoding)
+    """
+    import torch
+
+    tokens = loaded.tokens
+    model = loaded.model
+
+    start = time.perf_counter()
+    with metrics.span("tokenize"):
+        inputs = tokens.encode_batch([text], source_lang, loaded.device)
+    input_tokens = inputs["input_ids"].shape[1]
+
+    with metrics.span("encode"), torch.inference_mode():
+        encoded = model.get_encoder()(**inputs).last_hidden_state
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    targets = len(target_langs)
+    # NLLB decoding starts with </s> followed by the target language token,
+    # which is what forced_bos_token_id produces for a single target
+    decoder_input_ids = torch.tensor(
+        [
+            [model.config.decoder_start_token_id, tokens.language_token_id(target)]
+            for target in target_langs
+        ],
+        device=loaded.device
+    )
+    profile = resolve_profile(profile or settings.DECODING_PROFILE, input_tokens)
+    with metrics.span("generate"):
+        translated_tokens = model.generate(
+            encoder_outputs=BaseModelOutput(last_hidden_state=encoded.repeat(targets, 1, 1)),
+            attention_mask=inputs["attention_mask"].repeat(targets, 1),
+            decoder_input_ids=decoder_input_ids,
+            **generation_kwargs(profile, input_tokens)
+        )
+    _count_tokens(tokens, inputs, translated_tokens)
+    with metrics.span("decode"):
+        return tokens.decode_batch(translated_tokens), encode_ms
@@ -1,48 +1,292 @@
+"""
+Process-wide phrase corpus
+The corpus is held as an immutable, indexed snapshot shared by the UI and
+the engine. When the source file changes on disk a new snapshot is built
+and swapped in; readers keep using the old one until the swap, so they
+never wait for a reload. A precompiled SQLite form (scripts/compile_phrases.py)
+skips JSON parsing and text normalization for large corpora.
+"""
+
+import threading
+import logging
+import sqlite3
 import json
+import time
 import os
 
+from backend.text_normalization import normalize_text, fold_diacritics
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+EMPTY_CORPUS = {
+    "greetings": [],
+    "common": [],
+    "emergency": [],
+    "healthcare": []
+}
+
+
+class PhraseSnapshot:
+    """One immutable, indexed version of the phrase corpus"""
+
+    def __init__(self, phrases, entries=None, version=0, source="json", mtime=None, load_seconds=0.0):
+        self.phrases = phrases
+        self.version = version
+        self.source = source
+        self.mtime = mtime
+        self.load_seconds = load_seconds
+        self._build_index(entries if entries is not None else _index_entries(phrases))
+
+    def _build_index(self, entries):
+        """Build per-language maps from normalized text to phrase record"""
+        self._index = {}
+        self._folded_index = {}
+        languages = set()
+
+        for language, key, folded, phrase in entries:
+            languages.add(language)
+            # First occurrence wins, matching the old scan order
+            self._index.setdefault(language, {}).setdefault(key, phrase)
+            self._folded_index.setdefault(language, {}).setdefault(folded, phrase)
+
+        self.languages = sorted(languages)
+
+    def lookup(self, text, source_lang, target_lang):
+        key = normalize_text(text)
+        if not key:
+            return None
+
+        phrase = self._index.get(source_lang, {}).get(key)
+        if phrase is None:
+            # Diacritic-insensitive fallback (e.g. 'uri atia' for 'ũrĩ atĩa')
+            phrase = self._folded_index.get(source_lang, {}).get(fold_diacritics(key))
+        if phrase is None:
+            return None
+        return phrase.get(target_lang)
+
+
+def _index_entries(phrases):
+    for category in phrases.values():
+        for phrase in category:
+            for language, text in phrase.items():
+                if not isinstance(text, str) or not text.strip():
+                    continue
+                key = normalize_text(text)
+                yield language, key, fold_diacritics(key), phrase
+
+
+def load_json_corpus(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        # Return default structure if file doesn't exist
+        return {category: [] for category in EMPTY_CORPUS}
+
+
+def compiled_path(json_path):
+    """Where scripts/compile_phrases.py puts the compiled form of a corpus"""
+    return os.path.splitext(json_path)[0] + ".sqlite3"
+
+
+def compile_corpus(json_path, db_path=None):
+    """
+    Write the corpus and its normalized lookup keys to SQLite
+    The source file's mtime is recorded so a stale compiled form is ignored
+    """
+    db_path = db_path or compiled_path(json_path)
+    phrases = load_json_corpus(json_path)
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE phrases (
+                category TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                language TEXT NOT NULL,
+                text TEXT NOT NULL,
+                normalized TEXT NOT NULL,
+                folded TEXT NOT NULL
+            );
+            """
+        )
+        rows = []
+        for category_order, (category, records) in enumerate(phrases.items()):
+            conn.execute("INSERT INTO meta VALUES (?, ?)", (f"category:{category_order}", category))
+            for position, phrase in enumerate(records):
+                for language, text in phrase.items():
+                    if not isinstance(text, str):
+                        continue
+                    key = normalize_text(text)
+                    rows.append((category, position, language, text, key, fold_diacritics(key)))
+        conn.executemany("INSERT INTO phrases VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT INTO meta VALUES ('source_mtime', ?)", (repr(os.path.getmtime(json_path)),))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return len(rows)
+
+
+def _load_compiled(db_path, source_mtime):
+    """(phrases, entries) from the compiled corpus, or None if it is missing or stale"""
+    if not db_path or not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        meta = dict(conn.execute("SELECT name, value FROM meta"))
+        if source_mtime is not None and meta.get("source_mtime") != repr(source_mtime):
+            return None
+        categories = [
+            meta[name] for name in sorted(
+                (name for name in meta if name.startswith("category:")),
+                key=lambda name: int(name.split(":", 1)[1])
+            )
+        ]
+        phrases = {category: [] for category in categories}
+        records = {}
+        entries = []
+        for category, position, language, text, key, folded in conn.execute(
+            "SELECT category, position, language, text, normalized, folded FROM phrases ORDER BY rowid"
+        ):
+            phrase = records.get((category, position))
+            if phrase is None:
+                phrase = records[(category, position)] = {}
+                phrases[category].append(phrase)
+            phrase[language] = text
+            if text.strip():
+                entries.append((language, key, folded, phrase))
+        return phrases, entries
+    except sqlite3.DatabaseError as e:
+        logger.warning("Ignoring unreadable compiled phrase corpus %s: %s", db_path, e)
+        return None
+    finally:
+        conn.close()
+
+
 class PhraseDatabase:
-    def __init__(self):
-        self.data_file = "data/common_phrases.json"
-        self.phrases = self._load_phrases()
-    
-    def _load_phrases(self):
-        """Load phrases from JSON file"""
+    def __init__(self, data_file=None, compiled_file=None, reload_interval=None):
+        self.data_file = data_file or settings.PHRASES_FILE
+        self.compiled_file = compiled_file or compiled_path(self.data_file)
+        # Seconds between mtime checks; 0 disables hot reload
+        self.reload_interval = settings.PHRASE_RELOAD_INTERVAL_SECONDS if reload_interval is None else reload_interval
+        self._reload_lock = threading.Lock()
+        self._next_check = 0.0
+        self.reload_count = 0
+        self._snapshot = self._load(version=0)
+
+    @property
+    def snapshot(self):
+        """The current corpus; hold on to it for a consistent view across calls"""
+        self._maybe_reload()
+        return self._snapshot
+
+    @property
+    def phrases(self):
+        return self.snapshot.phrases
+
+    def _mtime(self):
+        try:
+            return os.path.getmtime(self.data_file)
+        except OSError:
+            return None
+
+    def _load(self, version):
+        start = time.perf_counter()
+        mtime = self._mtime()
+        compiled = _load_compiled(self.compiled_file, mtime)
+        if compiled is not None:
+            phrases, entries = compiled
+            source = "compiled"
+        else:
+            phrases, entries = load_json_corpus(self.data_file), None
+            source = "json"
+        snapshot = PhraseSnapshot(phrases, entries, version=version, source=source, mtime=mtime)
+        snapshot.load_seconds = time.perf_counter() - start
+        logger.info(
+            "Loaded phrase corpus v%d from %s in %.1f ms",
+            version, source, snapshot.load_seconds * 1000
+        )
+        return snapshot
+
+    def _maybe_reload(self):
+        if self.reload_interval <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        # One rebuild at a time; readers carry on with the current snapshot
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        self._next_check = now + self.reload_interval
+        if self._mtime() == self._snapshot.mtime:
+            self._reload_lock.release()
+            return
+        # Built off the request thread, so the reader that noticed the change doesn't wait for it
+        threading.Thread(target=self._reload_in_background, name="phrase-reload", daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self.reload()
+        finally:
+            self._reload_lock.release()
+
+    def reload(self):
+        """Build a new snapshot from disk and swap it in"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # Return default structure if file doesn't exist
-            return {
-                "greetings": [],
-                "common": [],
-                "emergency": [],
-                "healthcare": []
-            }
-    
+            snapshot = self._load(version=self._snapshot.version + 1)
+        except Exception as e:
+            # Keep serving the last good corpus (e.g. while the file is half-written)
+            logger.warning("Phrase corpus reload failed, keeping v%d: %s", self._snapshot.version, e)
+            return self._snapshot
+        self._snapshot = snapshot
+        self.reload_count += 1
+        return snapshot
+
     def lookup(self, text, source_lang, target_lang):
         """Look up a phrase in the database"""
-        text_lower = text.lower().strip()
-        
-        for category in self.phrases.values():
-            for phrase in category:
-                if phrase.get(source_lang, "").lower() == text_lower:
-                    return phrase.get(target_lang)
-        
-        return None
-    
+        return self.snapshot.lookup(text, source_lang, target_lang)
+
     def get_categories(self):
         """Return available categories"""
         return list(self.phrases.keys())
-    
+
     def get_phrases_by_category(self, category):
         """Return phrases for a specific category"""
         return self.phrases.get(category, [])
-    
+
     def get_supported_languages(self):
         """Return all languages that have at least one phrase"""
-        languages = set()
-        for category in self.phrases.values():
-            for phrase in category:
-                languages.update(phrase.keys())
-        return list(languages)
\ No newline at end of file
+        return list(self.snapshot.languages)
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "source": snapshot.source,
+            "phrases": sum(len(records) for records in snapshot.phrases.values()),
+            "categories": len(snapshot.phrases),
+            "load_ms": snapshot.load_seconds * 1000,
+            "reloads": self.reload_count,
+        }
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_phrase_database(data_file=None):
+    """Return the process-wide phrase database for a corpus file"""
+    data_file = data_file or settings.PHRASES_FILE
+    key = os.path.abspath(data_file)
+    with _databases_lock:
+        database = _databases.get(key)
+        if database is None:
+            database = PhraseDatabase(data_file)
+            _databases[key] = database
+        return database
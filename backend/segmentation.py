@@ -0,0 +1,110 @@
+"""
+Sentence segmentation for long inputs
+Splits text into translatable chunks while remembering the exact whitespace
+between them so the translation can be reassembled with the same layout
+"""
+
+import re
+
+
+# Abbreviations that end in a period but don't end a sentence
+ABBREVIATIONS = {
+    "english": {"mr", "mrs", "ms", "dr", "prof", "st", "sr", "jr", "vs", "etc", "e.g", "i.e", "no", "approx"},
+    "swahili": {"bw", "bi", "dkt", "prof", "mh", "n.k", "k.m", "k.v", "sh", "na"},
+    "luo": {"dr", "prof", "jo", "etc"},
+    "kikuyu": {"dr", "prof", "mr", "mrs", "etc"},
+}
+
+# Sentence-final punctuation followed by whitespace
+_BOUNDARY = re.compile(r"([.!?…]+[\"')\]]*)(\s+)")
+# Paragraph / line breaks always end a chunk
+_LINE_BREAK = re.compile(r"(\s*\n\s*)")
+
+# Chunks longer than this many words are split further so they stay
+# well inside the model's 512 token window
+MAX_CHUNK_WORDS = 150
+
+
+def _is_abbreviation(text_before, language):
+    words = text_before.split()
+    if not words:
+        return False
+    last = words[-1].rstrip(".").lower()
+    if len(last) == 1 and last.isalpha():
+        # Initials such as "J. K."
+        return True
+    abbreviations = ABBREVIATIONS.get(language, set()) | ABBREVIATIONS["english"]
+    return last in abbreviations
+
+
+def _split_line(line, language):
+    """Split one line into [(sentence, separator)]"""
+    pieces = []
+    start = 0
+    for match in _BOUNDARY.finditer(line):
+        end = match.end(1)
+        candidate = line[start:end]
+        following = line[match.end():match.end() + 1]
+        if match.group(1) == "." and _is_abbreviation(line[start:match.start(1)], language):
+            continue
+        if following and following.islower() and match.group(1) == ".":
+            # "... 5 p.m. and then" - lowercase continuation
+            continue
+        pieces.append((candidate, match.group(2)))
+        start = match.end()
+    if start < len(line):
+        pieces.append((line[start:], ""))
+    return pieces
+
+
+def _split_long(sentence, separator):
+    """Break an overly long sentence at word boundaries"""
+    words = sentence.split(" ")
+    if len(words) <= MAX_CHUNK_WORDS:
+        return [(sentence, separator)]
+    chunks = []
+    for i in range(0, len(words), MAX_CHUNK_WORDS):
+        last = i + MAX_CHUNK_WORDS >= len(words)
+        chunks.append((" ".join(words[i:i + MAX_CHUNK_WORDS]), separator if last else " "))
+    return chunks
+
+
+def split_sentences(text, language="english"):
+    """
+    Split text into chunks
+    Returns (leading_whitespace, [(chunk, separator_after_chunk)])
+    """
+    stripped = text.lstrip()
+    leading = text[:len(text) - len(stripped)]
+
+    segments = []
+    parts = _LINE_BREAK.split(stripped)
+    # parts alternates line, break, line, break, ...
+    for i in range(0, len(parts), 2):
+        line = parts[i]
+        line_break = parts[i + 1] if i + 1 < len(parts) else ""
+        pieces = _split_line(line, language) if line else []
+        if not pieces:
+            if segments:
+                chunk, separator = segments[-1]
+                segments[-1] = (chunk, separator + line + line_break)
+            else:
+                leading += line + line_break
+            continue
+        chunk, separator = pieces[-1]
+        pieces[-1] = (chunk, separator + line_break)
+        for chunk, separator in pieces:
+            segments.extend(_split_long(chunk, separator))
+    return leading, segments
+
+
+def join_sentences(leading, translated_segments):
+    """Reassemble translated chunks using the original separators"""
+    return leading + "".join(chunk + separator for chunk, separator in translated_segments)
+
+
+def needs_segmentation(text, min_chars=200):
+    """Whether text is long enough to be worth splitting"""
+    if "\n" in text.strip():
+        return True
+    return len(text) >= min_chars
@@ -0,0 +1,77 @@
+"""
+Single-flight deduplication of identical in-progress calls
+Concurrent callers with the same key share one execution: the first
+caller (the leader) runs the call, later ones wait for its result.
+"""
+
+from concurrent.futures import Future
+import threading
+
+from backend import metrics
+
+
+class _Abandoned(Exception):
+    """The leader stopped without a result (interrupted), so followers retry"""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}  # key -> Future of the in-progress call
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Return fn()'s result, sharing it with concurrent calls for the same key
+        A follower that times out (concurrent.futures.TimeoutError) only stops
+        waiting itself; the shared call carries on for everyone else. Errors
+        raised by fn reach every waiter, since the same input fails the same way.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._calls[key] = future
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                return self._lead(key, future, fn)
+
+            metrics.inc("coalesced")
+            try:
+                return future.result(timeout)
+            except _Abandoned:
+                # Interrupted leader: run (or join) a fresh call instead
+                continue
+
+    def _lead(self, key, future, fn):
+        try:
+            result = fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # e.g. KeyboardInterrupt or a closed generator: not a result to share
+            future.set_exception(_Abandoned())
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # Later callers start a new call (and see the cache the leader filled)
+            with self._lock:
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {
+            "calls": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": in_flight,
+        }
@@ -0,0 +1,92 @@
+"""
+Cached speech synthesis shared by every session
+"""
+
+import threading
+import logging
+
+from backend import metrics
+from backend.audio_cache import AudioCache
+from backend.tts_backends import get_tts_backends
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechSynthesizer:
+    def __init__(self, backends, cache):
+        self.backends = backends
+        self.cache = cache
+
+    def synthesize(self, text, language):
+        """
+        Return (audio bytes, format) for text, trying backends in order
+        Returns None if no backend could produce audio
+        """
+        if not text or not text.strip():
+            return None
+        metrics.inc("tts_requests")
+
+        # Any cached rendering beats a network round trip
+        for backend in self.backends:
+            cached = self.cache.get(text, language, self._voice(backend, language))
+            if cached is not None:
+                return cached
+
+        last_error = None
+        for backend in self.backends:
+            try:
+                with metrics.span("tts"):
+                    audio = backend.synthesize(text, language)
+            except Exception as e:
+                # e.g. gTTS without network: fall through to the offline backend
+                last_error = e
+                logger.warning("TTS backend '%s' failed: %s", backend.name, e)
+                continue
+            self.cache.put(text, language, self._voice(backend, language), audio, backend.audio_format)
+            return audio, backend.audio_format
+
+        if last_error is not None:
+            raise last_error
+        return None
+
+    def is_cached(self, text, language):
+        return any(
+            self.cache.contains(text, language, self._voice(backend, language))
+            for backend in self.backends
+        )
+
+    def stats(self):
+        return {
+            "backends": [backend.name for backend in self.backends],
+            "audio_cache": self.cache.stats(),
+        }
+
+    def _voice(self, backend, language):
+        return f"{backend.name}:{backend.voice_for(language)}"
+
+
+_synthesizer = None
+_synthesizer_lock = threading.Lock()
+
+
+def find_speech_synthesizer():
+    """The process-wide synthesizer if speech has been synthesized, without creating it"""
+    with _synthesizer_lock:
+        return _synthesizer
+
+
+def get_speech_synthesizer():
+    """Process-wide synthesizer configured from settings"""
+    global _synthesizer
+    with _synthesizer_lock:
+        if _synthesizer is None:
+            _synthesizer = SpeechSynthesizer(
+                get_tts_backends(settings.TTS_BACKENDS.split(",")),
+                AudioCache(
+                    settings.AUDIO_CACHE_DIR,
+                    max_memory_bytes=settings.AUDIO_CACHE_MEMORY_MB * 1024 * 1024,
+                    max_disk_bytes=settings.AUDIO_CACHE_DISK_MB * 1024 * 1024
+                )
+            )
+        return _synthesizer
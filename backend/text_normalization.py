@@ -0,0 +1,29 @@
+"""
+Text normalization used for phrase matching
+"""
+
+import unicodedata
+
+
+def normalize_text(text):
+    """
+    Canonical form for matching: Unicode NFC, case folded,
+    punctuation and symbols removed, whitespace collapsed
+    """
+    text = unicodedata.normalize("NFC", text).casefold()
+    kept = []
+    for char in text:
+        category = unicodedata.category(char)
+        if category[0] in ("P", "S"):
+            # Treat punctuation as a word break ("Sorry/Excuse me")
+            kept.append(" ")
+        else:
+            kept.append(char)
+    return " ".join("".join(kept).split())
+
+
+def fold_diacritics(text):
+    """Strip combining marks so e.g. Kikuyu 'ũ'/'ĩ' match plain 'u'/'i'"""
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", stripped)
@@ -0,0 +1,124 @@
+"""
+Thread-safe tokenization for NLLB
+The shared tokenizer is never reconfigured: subword IDs are computed
+without special tokens (they don't depend on the source language, so
+they are cached per text) and the language token and </s> are added per
+call. Language-token IDs are looked up once for every supported language.
+"""
+
+from collections import OrderedDict
+import threading
+
+import torch
+
+from config.languages import SUPPORTED_LANGUAGES
+from config.decoding import MAX_LENGTH
+
+
+class TokenizationLayer:
+    def __init__(self, tokenizer, languages=None, max_length=MAX_LENGTH, cache_size=2048):
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.cache_size = cache_size
+        languages = languages or SUPPORTED_LANGUAGES
+        self.language_ids = {
+            name: tokenizer.convert_tokens_to_ids(info["code"]) for name, info in languages.items()
+        }
+        self.eos_id = tokenizer.eos_token_id
+        self.pad_id = tokenizer.pad_token_id
+        # Older NLLB tokenizers put the language token last: [tokens] </s> [lang]
+        self.legacy = bool(getattr(tokenizer, "legacy_behaviour", False))
+
+        self._cache = OrderedDict()  # text -> tuple of subword IDs
+        self._cache_lock = threading.Lock()
+        # A fast tokenizer's Rust backend raises "Already borrowed" when one
+        # thread encodes while another changes its truncation/padding state
+        self._encode_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def language_token_id(self, language):
+        """ID of the NLLB language token for a SUPPORTED_LANGUAGES key (KeyError if unknown)"""
+        return self.language_ids[language]
+
+    def _subword_ids(self, texts):
+        """Subword IDs (no special tokens) for each text, from the cache where possible"""
+        results = [None] * len(texts)
+        missing = {}
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                ids = self._cache.get(text)
+                if ids is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._cache.move_to_end(text)
+                    results[i] = ids
+            self.hits += len(texts) - sum(len(indexes) for indexes in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            unique = list(missing)
+            with self._encode_lock:
+                encoded = self.tokenizer(unique, add_special_tokens=False)["input_ids"]
+            with self._cache_lock:
+                for text, ids in zip(unique, encoded):
+                    ids = tuple(ids)
+                    for i in missing[text]:
+                        results[i] = ids
+                    self._cache[text] = ids
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return results
+
+    def count(self, text):
+        """Number of subword tokens in text (without special tokens)"""
+        return len(self._subword_ids([text])[0])
+
+    def encode(self, text, source_lang):
+        """Model input IDs for one text, with the source language and </s> tokens"""
+        return self._with_specials(self._subword_ids([text])[0], self.language_token_id(source_lang))
+
+    def _with_specials(self, ids, language_id):
+        ids = list(ids[:self.max_length - 2])
+        if self.legacy:
+            return ids + [self.eos_id, language_id]
+        return [language_id] + ids + [self.eos_id]
+
+    def encode_batch(self, texts, source_lang, device="cpu"):
+        """
+        {"input_ids", "attention_mask"} tensors for a batch of one source
+        language, padded to the longest entry (as tokenizer(..., padding=True))
+        """
+        language_id = self.language_token_id(source_lang)
+        rows = [self._with_specials(ids, language_id) for ids in self._subword_ids(list(texts))]
+        width = max(len(row) for row in rows)
+        left = getattr(self.tokenizer, "padding_side", "right") == "left"
+        input_ids = []
+        attention_mask = []
+        for row in rows:
+            padding = width - len(row)
+            if left:
+                input_ids.append([self.pad_id] * padding + row)
+                attention_mask.append([0] * padding + [1] * len(row))
+            else:
+                input_ids.append(row + [self.pad_id] * padding)
+                attention_mask.append([1] * len(row) + [0] * padding)
+        return {
+            "input_ids": torch.tensor(input_ids, dtype=torch.long, device=device),
+            "attention_mask": torch.tensor(attention_mask, dtype=torch.long, device=device),
+        }
+
+    def decode_batch(self, token_ids):
+        """Text for each row of generated IDs, special tokens removed"""
+        return self.tokenizer.batch_decode(token_ids, skip_special_tokens=True)
+
+    def stats(self):
+        with self._cache_lock:
+            entries = len(self._cache)
+        lookups = self.hits + self.misses
+        return {
+            "cache_entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
@@ -0,0 +1,98 @@
+"""
+Speech-to-text shared by every session
+Tries the configured ASR backends in order and records per-utterance metrics
+"""
+
+import threading
+import logging
+import time
+
+from backend import metrics
+from backend.asr_backends import ASR_BACKENDS, WhisperASRBackend, AudioUnintelligible, ASRUnavailable, wav_duration
+from backend.metrics import Histogram
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Transcriber:
+    def __init__(self, backends):
+        self.backends = backends
+        self.latency_hist = Histogram([100, 250, 500, 1000, 2500, 5000, 10000])
+        # Real-time factor: processing time / audio duration (below 1 is faster than real time)
+        self.rtf_hist = Histogram([0.1, 0.25, 0.5, 1, 2, 4])
+
+    def transcribe(self, audio_bytes, language_code):
+        """
+        Return the transcript, or None if the speech was unintelligible
+        Raises ASRUnavailable if no backend could run
+        """
+        metrics.inc("asr_requests")
+        errors = []
+        for backend in self.backends:
+            start = time.perf_counter()
+            try:
+                with metrics.span("asr"):
+                    text = backend.transcribe(audio_bytes, language_code)
+            except AudioUnintelligible:
+                text = None
+            except ASRUnavailable as e:
+                errors.append(str(e))
+                logger.warning("ASR backend '%s' unavailable: %s", backend.name, e)
+                continue
+            self._record(backend, audio_bytes, time.perf_counter() - start)
+            return text
+
+        raise ASRUnavailable("; ".join(errors) or "No speech recognition backend is available")
+
+    def _record(self, backend, audio_bytes, seconds):
+        self.latency_hist.observe(seconds * 1000)
+        try:
+            duration = wav_duration(audio_bytes)
+        except Exception:
+            duration = 0
+        rtf = seconds / duration if duration else None
+        if rtf is not None:
+            self.rtf_hist.observe(rtf)
+            logger.info("ASR (%s): %.0f ms for %.1fs of audio (RTF %.2f)", backend.name, seconds * 1000, duration, rtf)
+
+    def stats(self):
+        return {
+            "backends": [backend.name for backend in self.backends],
+            "latency_ms": self.latency_hist.snapshot(),
+            "real_time_factor": self.rtf_hist.snapshot(),
+        }
+
+
+def _build_backend(name):
+    if name == WhisperASRBackend.name:
+        return WhisperASRBackend(settings.ASR_WHISPER_MODEL, settings.ASR_WHISPER_COMPUTE_TYPE)
+    return ASR_BACKENDS[name]()
+
+
+_transcriber = None
+_transcriber_lock = threading.Lock()
+
+
+def find_transcriber():
+    """The process-wide transcriber if speech has been transcribed, without creating it"""
+    with _transcriber_lock:
+        return _transcriber
+
+
+def get_transcriber():
+    """Process-wide transcriber configured from settings"""
+    global _transcriber
+    with _transcriber_lock:
+        if _transcriber is None:
+            backends = []
+            for name in settings.ASR_BACKENDS.split(","):
+                name = name.strip().lower()
+                if name not in ASR_BACKENDS:
+                    logger.warning("Unknown ASR backend '%s'", name)
+                    continue
+                backend = _build_backend(name)
+                if backend.is_available():
+                    backends.append(backend)
+            _transcriber = Transcriber(backends)
+        return _transcriber
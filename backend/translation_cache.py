@@ -0,0 +1,249 @@
+"""
+Two-tier translation cache
+An in-memory LRU in front of a SQLite store that survives restarts.
+Entries are keyed by namespace (model + generation config), so processes
+with different configs can share one database file without reading or
+deleting each other's translations.
+"""
+
+from collections import OrderedDict
+import unicodedata
+import threading
+import hashlib
+import logging
+import sqlite3
+import json
+import time
+import os
+
+logger = logging.getLogger(__name__)
+
+
+# Files whose change means cached translations are no longer valid
+MODEL_FINGERPRINT_FILES = (
+    "config.json",
+    "generation_config.json",
+    "tokenizer.json",
+    "sentencepiece.bpe.model",
+    "model.safetensors",
+    "pytorch_model.bin",
+)
+
+
+def normalize_cache_text(text):
+    """Normalize text so trivially different inputs share a cache entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def model_fingerprint(model_dir, generation_config=None):
+    """Hash of the model files and generation settings that produced a translation"""
+    parts = [os.path.abspath(model_dir)]
+    for name in MODEL_FINGERPRINT_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+    parts.append(json.dumps(generation_config or {}, sort_keys=True))
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+class TranslationCache:
+    def __init__(self, db_path, namespace, max_memory_entries=2048,
+                 max_disk_entries=100000, ttl_seconds=0):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (translation, created_at)
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "expired": 0,
+            "invalidated": 0,
+        }
+
+        self._conn = None
+        if db_path:
+            self._conn = self._open_db(db_path)
+
+    def get(self, text, source_lang, target_lang, variant=""):
+        """Return the cached translation or None"""
+        key = self._key(text, source_lang, target_lang, variant)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self.counters["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+                self.counters["expired"] += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT translation, created_at FROM translations WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[1], now):
+                        self._conn.execute(
+                            "UPDATE translations SET last_access = ? WHERE key = ?",
+                            (now, key)
+                        )
+                        self._conn.commit()
+                        self._remember(key, row[0], row[1])
+                        self.counters["disk_hits"] += 1
+                        return row[0]
+                    self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.counters["expired"] += 1
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, text, source_lang, target_lang, translation, variant=""):
+        """Store a translation in both tiers"""
+        key = self._key(text, source_lang, target_lang, variant)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, translation, now)
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations "
+                "(key, namespace, source_lang, target_lang, text, translation, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, self.namespace, source_lang, target_lang,
+                 normalize_cache_text(text), translation, now, now)
+            )
+            self._conn.commit()
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= 256:
+                self._trim_disk()
+
+    def prewarm(self, log_path, variant=""):
+        """
+        Load translations from a JSONL file, one record per line:
+        {"text", "source", "target", "translation"[, "variant"]}
+        variant is the decoding profile the translation was made with; records
+        without one get the variant argument. Returns the number loaded
+        """
+        loaded = 0
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    text = record["text"]
+                    source = record["source"]
+                    target = record["target"]
+                    translation = record["translation"]
+                except (ValueError, KeyError):
+                    continue
+                if text and translation:
+                    self.put(text, source, target, translation, record.get("variant", variant))
+                    loaded += 1
+        return loaded
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM translations WHERE namespace = ?", (self.namespace,))
+                self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = self._namespace_count() if self._conn is not None else 0
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else None
+        stats["namespace"] = self.namespace
+        return stats
+
+    def _key(self, text, source_lang, target_lang, variant):
+        raw = "\x1f".join([self.namespace, source_lang, target_lang, variant, normalize_cache_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key, translation, created_at):
+        self._memory[key] = (translation, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.counters["memory_evictions"] += 1
+
+    def _open_db(self, db_path):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, namespace TEXT, source_lang TEXT, target_lang TEXT, "
+            "text TEXT, translation TEXT, created_at REAL, last_access REAL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_last_access "
+            "ON translations (last_access)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_namespace "
+            "ON translations (namespace)"
+        )
+
+        # Rows from other namespaces may belong to another live process (the
+        # app and the API sharing the file), so they only go by TTL or LRU trim
+        deleted = 0
+        if self.ttl_seconds > 0:
+            deleted = conn.execute(
+                "DELETE FROM translations WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            ).rowcount
+        conn.commit()
+        if deleted:
+            self.counters["invalidated"] += deleted
+            logger.info("Translation cache dropped %d stale entries", deleted)
+
+        self._conn = conn
+        self._trim_disk()
+        return conn
+
+    def _namespace_count(self):
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM translations WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    def _disk_count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def _trim_disk(self):
+        self._writes_since_trim = 0
+        excess = self._disk_count() - self.max_disk_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN "
+            "(SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        self.counters["disk_evictions"] += excess
@@ -1,28 +1,547 @@
 import requests
+import threading
+import logging
 import os
+from backend import metrics
+from backend.admission import AdmissionController, Overloaded, NORMAL, REDUCED, APPROXIMATE, TIER_NAMES
 from backend.nllb_service import NLLBTranslator
-from backend.phrase_database import PhraseDatabase
+from backend.phrase_database import get_phrase_database
+from backend.fuzzy_matcher import FuzzyPhraseMatcher
+from backend.language_id import LanguageIdentifier, samples_from_phrases
+from backend.translation_cache import TranslationCache, model_fingerprint, normalize_cache_text
+from backend.single_flight import SingleFlight
+from backend.segmentation import needs_segmentation, split_sentences
+from backend.text_normalization import normalize_text
+from backend.speech_synthesis import find_speech_synthesizer
+from backend.transcription import find_transcriber
+from backend.voice_pipeline import find_voice_pipeline
+from config import settings
+from config.decoding import DECODING_PROFILES, AUTO_POLICY, MAX_LENGTH
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGE = "Translator is busy, please try again shortly"
+# Returned in place of a translation when the model failed
+UNAVAILABLE_MESSAGE = "Translation temporarily unavailable"
+
+def cache_namespace(model_dir, precision):
+    """Translation cache namespace for a model, its precision and the decoding config"""
+    return model_fingerprint(
+        model_dir,
+        {
+            "profiles": DECODING_PROFILES,
+            "auto_policy": AUTO_POLICY,
+            "max_length": MAX_LENGTH,
+            # The requested precision: the one in use is only known once
+            # the (background) load finishes. A failed int8/bf16 load
+            # falls back to fp32 under this namespace, with a warning
+            "precision": precision
+        }
+    )
 
 class TranslationEngine:
-    def __init__(self):
-        self.phrase_db = PhraseDatabase()
-        self.nllb = NLLBTranslator()
+    def __init__(self, nllb=None):
+        # Shared with the UI; reloads itself when the corpus file changes
+        self.phrase_db = get_phrase_database()
+        # nllb can be swapped for a stand-in with the same interface (benchmarks, CI)
+        self.nllb = nllb or NLLBTranslator()
+        self.fuzzy = None
+        self._fuzzy_version = None
+        self._fuzzy_matcher(self.phrase_db.snapshot)
+        self.language_id = None
+        self._language_id_version = None
+        # Where answers came from
+        self.counters = {
+            "phrase_hits": 0,
+            "cache_hits": 0,
+            "fuzzy_hits": 0,
+            "model_translations": 0,
+            "failures": 0,
+            "language_corrections": 0
+        }
+        self._counters_lock = threading.Lock()
+        metrics.start_file_sink()
+        # Identical requests in flight at the same time share one model call
+        self.inflight = SingleFlight() if settings.COALESCING_ENABLED else None
+        # Sheds work tier by tier while the latency SLO is at risk
+        self.admission = None
+        if settings.ADMISSION_ENABLED:
+            self.admission = AdmissionController(
+                settings.ADMISSION_SLO_MS,
+                settings.ADMISSION_MAX_IN_FLIGHT,
+                window_seconds=settings.ADMISSION_WINDOW_SECONDS,
+                recovery_seconds=settings.ADMISSION_RECOVERY_SECONDS
+            )
+        self.cache = None
+        if settings.CACHE_ENABLED:
+            self.cache = TranslationCache(
+                settings.CACHE_DB_PATH,
+                namespace=cache_namespace(self.nllb.model_dir, self.nllb.registry.requested_precision),
+                max_memory_entries=settings.CACHE_MEMORY_ENTRIES,
+                max_disk_entries=settings.CACHE_DISK_ENTRIES,
+                ttl_seconds=settings.CACHE_TTL_SECONDS
+            )
+    
+    def _count(self, name, amount=1):
+        with self._counters_lock:
+            self.counters[name] += amount
+        metrics.inc(name, amount)
     
-    def translate(self, text, source_lang, target_lang):
-        """Main translation method"""
+    def _fuzzy_matcher(self, snapshot):
+        """Fuzzy matcher for this corpus snapshot, rebuilt after a reload"""
+        if not settings.FUZZY_MATCH_ENABLED:
+            return None
+        fuzzy = self.fuzzy
+        if fuzzy is None or self._fuzzy_version != snapshot.version:
+            fuzzy = FuzzyPhraseMatcher(snapshot.phrases, threshold=settings.FUZZY_MATCH_THRESHOLD)
+            self.fuzzy, self._fuzzy_version = fuzzy, snapshot.version
+        return fuzzy
+    
+    def _language_identifier(self, snapshot):
+        """Language identifier trained on this corpus snapshot, retrained after a reload"""
+        identifier = self.language_id
+        if identifier is None or self._language_id_version != snapshot.version:
+            identifier = LanguageIdentifier(samples_from_phrases(snapshot.phrases))
+            self.language_id, self._language_id_version = identifier, snapshot.version
+        return identifier
+    
+    def detect_source(self, text, source_lang, target_lang=None):
+        """
+        Check the selected source language against the text itself
+        Returns {"source", "detected", "confidence", "corrected"}: source is
+        the detected language when the identifier is confident the text is
+        in another supported language (and not the target) and the selected
+        language explains it clearly worse, else source_lang
+        """
+        result = {"source": source_lang, "detected": None, "confidence": 0.0, "corrected": False}
+        if not settings.LANGUAGE_ID_ENABLED:
+            return result
+        
+        with metrics.span("language_id"):
+            # Too little text to tell languages apart reliably
+            if len(normalize_text(text)) < settings.LANGUAGE_ID_MIN_CHARS:
+                return result
+            identifier = self._language_identifier(self.phrase_db.snapshot)
+            detected, confidence, margin = identifier.assess(text, source_lang)
+        
+        result["detected"], result["confidence"] = detected, confidence
+        if (
+            detected not in (None, source_lang, target_lang)
+            and confidence >= settings.LANGUAGE_ID_THRESHOLD
+            # A close second (loanwords, names, short text) keeps the user's choice
+            and margin >= settings.LANGUAGE_ID_MIN_MARGIN
+        ):
+            logger.debug(
+                "Source language corrected from %s to %s (%.3f, margin %.2f)", source_lang, detected, confidence, margin
+            )
+            result["source"] = detected
+            result["corrected"] = True
+            self._count("language_corrections")
+        return result
+    
+    def _lookup(self, text, source_lang, target_lang, variant=""):
+        """Answer from the phrase database or cache without running the model"""
+        # One snapshot for the whole lookup, even if a reload lands meanwhile
+        snapshot = self.phrase_db.snapshot
+        
         # 1. Check phrase database
-        phrase_trans = self.phrase_db.lookup(text, source_lang, target_lang)
+        with metrics.span("phrase_lookup"):
+            phrase_trans = snapshot.lookup(text, source_lang, target_lang)
         if phrase_trans:
+            self._count("phrase_hits")
             return phrase_trans
         
-        # 2. Try NLLB (primary)
+        # 2. Check translation cache
+        if self.cache is not None:
+            with metrics.span("cache_lookup"):
+                cached = self.cache.get(text, source_lang, target_lang, variant)
+            if cached is not None:
+                self._count("cache_hits")
+                return cached
+        
+        # 3. Close match in the phrase database
+        fuzzy = self._fuzzy_matcher(snapshot)
+        if fuzzy is not None:
+            with metrics.span("fuzzy_match"):
+                match = fuzzy.match(text, source_lang, target_lang)
+            if match is not None:
+                self._count("fuzzy_hits")
+                return match[0]
+        
+        return None
+    
+    def _cached(self, text, source_lang, target_lang, profile):
+        """Cache lookup alone, for a profile other than the requested one"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(text, source_lang, target_lang, profile)
+        if cached is not None:
+            self._count("cache_hits")
+        return cached
+    
+    def translate(self, text, source_lang, target_lang, profile=None):
+        """
+        Main translation method
+        profile selects the decoding profile (fast, balanced, quality or auto);
+        defaults to settings.DECODING_PROFILE
+        """
+        try:
+            return self.translate_detailed(text, source_lang, target_lang, profile)["translation"]
+        except Overloaded:
+            return BUSY_MESSAGE
+    
+    def translate_detailed(self, text, source_lang, target_lang, profile=None, ticket=None):
+        """
+        translate() plus the source-language check and admission tier:
+        {"translation", "source", "detected", ..., "tier", "approximate"}
+        ticket is an admission the caller already holds (and releases);
+        raises Overloaded when admission control turns the request away
+        """
+        if ticket is not None or self.admission is None:
+            return self._translate_admitted(text, source_lang, target_lang, profile, ticket)
+        ticket = self.admission.admit()
+        try:
+            return self._translate_admitted(text, source_lang, target_lang, profile, ticket)
+        finally:
+            self.admission.release(ticket)
+    
+    def _translate_admitted(self, text, source_lang, target_lang, profile, ticket):
+        tier = ticket.tier if ticket is not None else NORMAL
+        detection = self.detect_source(text, source_lang, target_lang)
+        approximate = False
+        if tier >= APPROXIMATE:
+            translation, approximate = self._translate_approximate(text, detection["source"], target_lang, profile)
+        else:
+            reduced_profile = settings.ADMISSION_REDUCED_PROFILE if tier == REDUCED else None
+            translation = self._translate(text, detection["source"], target_lang, profile, reduced_profile)
+        return {"translation": translation, **detection, "tier": TIER_NAMES[tier], "approximate": approximate}
+    
+    def _translate_approximate(self, text, source_lang, target_lang, profile=None):
+        """
+        Answer without the model (admission control's approximate tier)
+        Returns (translation, approximate); a cached translation made with
+        another decoding profile counts as approximate. Raises Overloaded
+        when neither the phrase database nor the cache knows the text
+        """
+        profile = profile or settings.DECODING_PROFILE
+        if not needs_segmentation(text, settings.LONG_TEXT_MIN_CHARS):
+            profile = self.nllb.resolve_profile(text, profile)
+        
+        known = self._lookup(text, source_lang, target_lang, profile)
+        if known is not None:
+            return known, False
+        if self.cache is not None:
+            for variant in DECODING_PROFILES:
+                if variant == profile:
+                    continue
+                cached = self._cached(text, source_lang, target_lang, variant)
+                if cached is not None:
+                    return cached, True
+        
+        metrics.inc("admission_rejected")
+        raise Overloaded("Translator is overloaded and has no stored translation for this text")
+    
+    def _translate(self, text, source_lang, target_lang, profile=None, reduced_profile=None):
+        long_text = needs_segmentation(text, settings.LONG_TEXT_MIN_CHARS)
+        profile = profile or settings.DECODING_PROFILE
+        if not long_text:
+            profile = self.nllb.resolve_profile(text, profile)
+        
+        known = self._lookup(text, source_lang, target_lang, profile)
+        if known is not None:
+            return known
+        
+        if reduced_profile is not None and reduced_profile != profile:
+            # Under load the model decodes with the cheaper profile instead
+            profile = reduced_profile
+            cached = self._cached(text, source_lang, target_lang, profile)
+            if cached is not None:
+                return cached
+        
+        # 4. Try NLLB (primary)
+        run = lambda: self._translate_model(text, source_lang, target_lang, profile, long_text)
+        try:
+            if self.inflight is not None:
+                # Same key as the cache, so coalesced requests are the ones it would merge
+                key = (normalize_cache_text(text), source_lang, target_lang, profile)
+                translation = self.inflight.do(key, run)
+            else:
+                translation = run()
+        except Exception as e:
+            logger.warning("NLLB failed: %s", e)
+            self._count("failures")
+            return UNAVAILABLE_MESSAGE
+            # 5. Fallback to Google
+        
+        return translation
+    
+    def _translate_model(self, text, source_lang, target_lang, profile, long_text):
+        """Run the model and cache the result (once per coalesced group)"""
+        if long_text:
+            translation = self.nllb.translate_long(text, source_lang, target_lang, profile)
+        else:
+            translation = self.nllb.translate_or_raise(text, source_lang, target_lang, profile)
+        
+        self._count("model_translations")
+        if self.cache is not None and translation:
+            self.cache.put(text, source_lang, target_lang, translation, profile)
+        return translation
+    
+    def translate_batch(self, texts, source_lang, target_lang, profile=None):
+        """
+        Translate many texts of one language pair
+        Phrase and cache hits are answered directly; the remaining texts go
+        to the model together, one batched call per decoding profile.
+        The batch is admitted once; rows admission control can't answer
+        come back as BUSY_MESSAGE
+        """
+        if self.admission is None:
+            return self._translate_batch(texts, source_lang, target_lang, profile, NORMAL)
         try:
-            return self.nllb.translate(text, source_lang, target_lang)
+            ticket = self.admission.admit()
+        except Overloaded:
+            return [BUSY_MESSAGE if text and text.strip() else "" for text in texts]
+        try:
+            return self._translate_batch(texts, source_lang, target_lang, profile, ticket.tier)
+        finally:
+            self.admission.release(ticket)
+    
+    def _translate_batch(self, texts, source_lang, target_lang, profile, tier):
+        reduced_profile = settings.ADMISSION_REDUCED_PROFILE if tier == REDUCED else None
+        results = [None] * len(texts)
+        misses = {}  # (profile, text) -> [indexes]; identical rows are translated once
+        
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                results[i] = ""
+                continue
+            if tier >= APPROXIMATE:
+                results[i] = self._answer_approximate(text, source_lang, target_lang, profile)
+                continue
+            if needs_segmentation(text, settings.LONG_TEXT_MIN_CHARS):
+                # Long rows are split into sentences, which batch on their own
+                results[i] = self._translate(text, source_lang, target_lang, profile, reduced_profile)
+                continue
+            
+            text_profile = self.nllb.resolve_profile(text, profile)
+            known = self._lookup(text, source_lang, target_lang, text_profile)
+            if known is None and reduced_profile is not None and reduced_profile != text_profile:
+                text_profile = reduced_profile
+                known = self._cached(text, source_lang, target_lang, text_profile)
+            if known is not None:
+                results[i] = known
+            else:
+                misses.setdefault((text_profile, text), []).append(i)
+        
+        by_profile = {}
+        for text_profile, text in misses:
+            by_profile.setdefault(text_profile, []).append(text)
+        
+        for text_profile, batch in by_profile.items():
+            try:
+                translations = self.nllb.translate_batch(batch, source_lang, target_lang, text_profile)
+            except Exception as e:
+                logger.warning("NLLB failed: %s", e)
+                self._count("failures", len(batch))
+                translations = [UNAVAILABLE_MESSAGE] * len(batch)
+            else:
+                self._count("model_translations", len(batch))
+                if self.cache is not None:
+                    for text, translation in zip(batch, translations):
+                        if translation:
+                            self.cache.put(text, source_lang, target_lang, translation, text_profile)
+            for text, translation in zip(batch, translations):
+                for i in misses[(text_profile, text)]:
+                    results[i] = translation
+        
+        return results
+    
+    def translate_multi(self, text, source_lang, target_langs, profile=None):
+        """
+        Translate text into several languages at once
+        Returns {target_lang: translation}; the model encodes the source
+        once for every target that isn't answered by a phrase or the cache.
+        Admitted as one request; targets admission control can't answer
+        come back as BUSY_MESSAGE
+        """
+        if self.admission is None:
+            return self._translate_multi(text, source_lang, target_langs, profile, NORMAL)
+        try:
+            ticket = self.admission.admit()
+        except Overloaded:
+            return {lang: BUSY_MESSAGE for lang in target_langs if lang != source_lang}
+        try:
+            return self._translate_multi(text, source_lang, target_langs, profile, ticket.tier)
+        finally:
+            self.admission.release(ticket)
+    
+    def _translate_multi(self, text, source_lang, target_langs, profile, tier):
+        source_lang = self.detect_source(text, source_lang)["source"]
+        target_langs = [lang for lang in target_langs if lang != source_lang]
+        if tier >= APPROXIMATE:
+            return {lang: self._answer_approximate(text, source_lang, lang, profile) for lang in target_langs}
+        reduced_profile = settings.ADMISSION_REDUCED_PROFILE if tier == REDUCED else None
+        if needs_segmentation(text, settings.LONG_TEXT_MIN_CHARS):
+            # Long text is translated sentence by sentence, per target
+            return {
+                lang: self._translate(text, source_lang, lang, profile, reduced_profile)
+                for lang in target_langs
+            }
+        
+        profile = self.nllb.resolve_profile(text, profile)
+        model_profile = reduced_profile or profile
+        results = {}
+        missing = []
+        for lang in target_langs:
+            known = self._lookup(text, source_lang, lang, profile)
+            if known is None and model_profile != profile:
+                known = self._cached(text, source_lang, lang, model_profile)
+            if known is not None:
+                results[lang] = known
+            else:
+                missing.append(lang)
+        
+        if len(missing) == 1:
+            results[missing[0]] = self._translate(text, source_lang, missing[0], profile, reduced_profile)
+        elif missing:
+            try:
+                translations = self.nllb.translate_multi(text, source_lang, missing, model_profile)
+            except Exception as e:
+                logger.warning("NLLB failed: %s", e)
+                self._count("failures", len(missing))
+                translations = [UNAVAILABLE_MESSAGE] * len(missing)
+            else:
+                self._count("model_translations", len(missing))
+                if self.cache is not None:
+                    for lang, translation in zip(missing, translations):
+                        if translation:
+                            self.cache.put(text, source_lang, lang, translation, model_profile)
+            results.update(zip(missing, translations))
+        
+        # Keep the caller's language order
+        return {lang: results[lang] for lang in target_langs}
+    
+    def _answer_approximate(self, text, source_lang, target_lang, profile):
+        """_translate_approximate's translation, or BUSY_MESSAGE when there is none"""
+        try:
+            return self._translate_approximate(text, source_lang, target_lang, profile)[0]
+        except Overloaded:
+            return BUSY_MESSAGE
+    
+    def translate_stream(self, text, source_lang, target_lang, profile=None, details=None):
+        """
+        Yield the translation incrementally as the model produces it
+        Only greedy decoding can stream; with a beam profile (profile or
+        settings.DECODING_PROFILE) the translation is decoded whole and
+        yielded once. details, when given, is filled with the "tier" and
+        "approximate" flags of the answer, as translate_detailed returns them
+        """
+        details = details if details is not None else {}
+        details.update(tier=TIER_NAMES[NORMAL], approximate=False)
+        if self.admission is None:
+            yield from self._translate_stream(text, source_lang, target_lang, profile, NORMAL, details)
+            return
+        try:
+            ticket = self.admission.admit()
+        except Overloaded:
+            yield BUSY_MESSAGE
+            return
+        details["tier"] = ticket.tier_name
+        try:
+            yield from self._translate_stream(text, source_lang, target_lang, profile, ticket.tier, details)
+        finally:
+            self.admission.release(ticket)
+    
+    def _translate_stream(self, text, source_lang, target_lang, profile, tier, details):
+        source_lang = self.detect_source(text, source_lang, target_lang)["source"]
+        profile = self.nllb.resolve_profile(text, profile or settings.DECODING_PROFILE)
+        if tier >= APPROXIMATE:
+            try:
+                translation, details["approximate"] = self._translate_approximate(
+                    text, source_lang, target_lang, profile
+                )
+                yield translation
+            except Overloaded:
+                yield BUSY_MESSAGE
+            return
+        
+        reduced_profile = settings.ADMISSION_REDUCED_PROFILE if tier == REDUCED else None
+        if DECODING_PROFILES[reduced_profile or profile]["num_beams"] > 1:
+            # transformers can't stream beam search: keep the profile's quality instead
+            yield self._translate(text, source_lang, target_lang, profile, reduced_profile)
+            return
+        
+        known = self._lookup(text, source_lang, target_lang, profile)
+        if known is not None:
+            yield known
+            return
+        profile = reduced_profile or profile
+        
+        pieces = []
+        try:
+            leading, segments = split_sentences(text, source_lang)
+            if leading:
+                pieces.append(leading)
+                yield leading
+            for chunk, separator in segments:
+                for piece in self.nllb.translate_stream(chunk, source_lang, target_lang, profile):
+                    pieces.append(piece)
+                    yield piece
+                if separator:
+                    pieces.append(separator)
+                    yield separator
         except Exception as e:
-            print(f"NLLB failed: {e}")
-            return "Translation temporarily unavailable"
-            # 3. Fallback to Google
+            logger.warning("NLLB failed: %s", e)
+            yield UNAVAILABLE_MESSAGE
+            return
+        
+        translation = "".join(pieces)
+        if self.cache is not None and translation.strip():
+            self.cache.put(text, source_lang, target_lang, translation, profile)
+    
+    def is_model_ready(self):
+        """Whether the neural model has finished loading"""
+        return self.nllb.registry.is_loaded()
+    
+    def model_load_error(self):
+        """Why the neural model failed to load, or None"""
+        return self.nllb.registry.load_error
+    
+    def get_stats(self):
+        """Counters from every stage of the pipeline"""
+        with self._counters_lock:
+            stats = {"pipeline": dict(self.counters)}
+        stats["model"] = self.nllb.registry.stats()
+        if self.nllb.scheduler is not None:
+            stats["batching"] = self.nllb.scheduler.stats()
+        if getattr(self.nllb, "pool", None) is not None:
+            stats["worker_pool"] = self.nllb.pool.stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        if self.inflight is not None:
+            stats["coalescing"] = self.inflight.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        stats["phrases"] = self.phrase_db.stats()
+        if self.fuzzy is not None:
+            # Every fuzzy match is a model call saved
+            stats["fuzzy_match"] = self.fuzzy.stats()
+        stats["streaming"] = self.nllb.streaming_stats()
+        stats["multi_target"] = self.nllb.multi_target_stats()
+        stats["long_text"] = self.nllb.long_text_stats()
+        transcriber = find_transcriber()
+        if transcriber is not None:
+            stats["asr"] = transcriber.stats()
+        synthesizer = find_speech_synthesizer()
+        if synthesizer is not None:
+            stats["tts"] = synthesizer.stats()
+        pipeline = find_voice_pipeline(self)
+        if pipeline is not None:
+            stats["voice"] = pipeline.stats()
+        if metrics.enabled():
+            stats["metrics"] = metrics.snapshot()
+        return stats
     
     def get_languages(self):
         """Return supported languages"""
-        return self.phrase_db.get_supported_languages()
\ No newline at end of file
+        return self.phrase_db.get_supported_languages()
@@ -0,0 +1,95 @@
+"""
+Text-to-speech backends
+Each backend turns text into audio bytes in memory (no temp files)
+"""
+
+from io import BytesIO
+import subprocess
+import logging
+import shutil
+
+logger = logging.getLogger(__name__)
+
+
+class GTTSBackend:
+    """Google Translate TTS (needs network)"""
+
+    name = "gtts"
+    audio_format = "mp3"
+
+    # gTTS supports: en, sw (Swahili), and many others
+    LANGUAGE_CODES = {
+        "english": "en",
+        "swahili": "sw",
+        "luo": "en",      # Fallback to English (Luo not supported in gTTS)
+        "kikuyu": "en"    # Fallback to English (Kikuyu not supported in gTTS)
+    }
+
+    def is_available(self):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def voice_for(self, language):
+        return self.LANGUAGE_CODES.get(language.lower(), "en")
+
+    def synthesize(self, text, language):
+        from gtts import gTTS
+
+        buffer = BytesIO()
+        gTTS(text=text, lang=self.voice_for(language), slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class EspeakBackend:
+    """espeak-ng speech synthesis (fully offline, WAV output)"""
+
+    name = "espeak"
+    audio_format = "wav"
+
+    LANGUAGE_CODES = {
+        "english": "en",
+        "swahili": "sw",
+        "luo": "sw",      # No Luo voice; Swahili phonetics read it more naturally than English
+        "kikuyu": "sw"    # No Kikuyu voice; same fallback
+    }
+
+    def __init__(self):
+        self.executable = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def is_available(self):
+        return self.executable is not None
+
+    def voice_for(self, language):
+        return self.LANGUAGE_CODES.get(language.lower(), "en")
+
+    def synthesize(self, text, language):
+        result = subprocess.run(
+            [self.executable, "-v", self.voice_for(language), "--stdout", text],
+            capture_output=True,
+            check=True,
+            timeout=30
+        )
+        return result.stdout
+
+
+TTS_BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+def get_tts_backends(names):
+    """Instantiate the available backends from a list of names, in order of preference"""
+    backends = []
+    for name in names:
+        backend_class = TTS_BACKENDS.get(name.strip().lower())
+        if backend_class is None:
+            logger.warning("Unknown TTS backend '%s'", name)
+            continue
+        backend = backend_class()
+        if backend.is_available():
+            backends.append(backend)
+    return backends
@@ -0,0 +1,270 @@
+"""
+Pipelined voice translation
+Audio is cut into utterances with voice-activity detection as it arrives;
+each finished utterance is transcribed and translated while later audio
+is still being consumed, and results are emitted segment by segment.
+The Streamlit recorder only hands over the finished recording, so in the
+app the pipeline starts after recording stops (see iter_wav_chunks)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from io import BytesIO
+import threading
+import logging
+import weakref
+import struct
+import time
+import wave
+
+from backend.asr_backends import AudioUnintelligible, ASRUnavailable, decode_wav
+from backend.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000 * 2  # 16-bit mono
+
+
+class EnergyVAD:
+    """Frame RMS against a threshold; used when webrtcvad isn't installed"""
+
+    def __init__(self, threshold=500):
+        self.threshold = threshold
+
+    def is_speech(self, frame):
+        count = len(frame) // 2
+        if not count:
+            return False
+        samples = struct.unpack(f"<{count}h", frame[:count * 2])
+        rms = (sum(s * s for s in samples) / count) ** 0.5
+        return rms >= self.threshold
+
+
+def make_vad(aggressiveness=2):
+    try:
+        import webrtcvad
+    except ImportError:
+        return EnergyVAD()
+
+    vad = webrtcvad.Vad(aggressiveness)
+
+    class _WebRTCVAD:
+        def is_speech(self, frame):
+            return vad.is_speech(frame, SAMPLE_RATE)
+
+    return _WebRTCVAD()
+
+
+def pcm_to_wav(pcm, sample_rate=SAMPLE_RATE):
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def iter_wav_chunks(audio_bytes, chunk_ms=100):
+    """
+    Split a finished WAV recording into 16 kHz mono PCM chunks
+    This replays audio that is already complete: utterances are processed
+    in parallel, but nothing starts before the recording has ended
+    """
+    import numpy as np
+
+    samples, _ = decode_wav(audio_bytes, SAMPLE_RATE)
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+    step = SAMPLE_RATE * chunk_ms // 1000 * 2
+    for i in range(0, len(pcm), step):
+        yield pcm[i:i + step]
+
+
+class UtteranceSegmenter:
+    """Groups 16 kHz PCM into utterances separated by silence"""
+
+    def __init__(self, vad, min_silence_ms=450, min_speech_ms=250, max_utterance_ms=15000):
+        self.vad = vad
+        self.silence_frames = max(1, min_silence_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.max_frames = max(1, max_utterance_ms // FRAME_MS)
+        self._buffer = b""
+        self._frames = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+    def feed(self, pcm):
+        """Add audio; returns the utterances (PCM bytes) that ended within it"""
+        self._buffer += pcm
+        finished = []
+        while len(self._buffer) >= FRAME_BYTES:
+            frame = self._buffer[:FRAME_BYTES]
+            self._buffer = self._buffer[FRAME_BYTES:]
+            utterance = self._push(frame)
+            if utterance is not None:
+                finished.append(utterance)
+        return finished
+
+    def flush(self):
+        """End of audio: return the utterance in progress, if any"""
+        utterance = self._close() if self._speech_frames >= self.min_speech_frames else None
+        self._reset()
+        return utterance
+
+    def _push(self, frame):
+        speech = self.vad.is_speech(frame)
+        if not self._frames and not speech:
+            return None
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._trailing_silence = 0
+        else:
+            self._trailing_silence += 1
+
+        if self._trailing_silence >= self.silence_frames or len(self._frames) >= self.max_frames:
+            utterance = self._close() if self._speech_frames >= self.min_speech_frames else None
+            self._reset()
+            return utterance
+        return None
+
+    def _close(self):
+        return b"".join(self._frames)
+
+    def _reset(self):
+        self._frames = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+
+class VoicePipeline:
+    def __init__(self, transcriber, engine, synthesizer=None, vad=None, max_workers=2):
+        self.transcriber = transcriber
+        # Weak, so the registry below can drop this pipeline along with its engine
+        self._engine = weakref.ref(engine)
+        self.synthesizer = synthesizer
+        self.vad = vad or make_vad()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice-pipeline")
+        # Utterance cut -> translated text ready (transcription + translation).
+        # An internal figure, not the delay a user sees: in the app utterances
+        # are cut from a finished recording, after the user waited for it to end
+        self.segment_processing_hist = Histogram([100, 250, 500, 1000, 2000, 4000, 8000])
+        # Recording received -> first segment shown: what the user waits for
+        self.first_segment_hist = Histogram([250, 500, 1000, 2000, 4000, 8000, 16000])
+
+    @property
+    def engine(self):
+        return self._engine()
+
+    def run(self, pcm_chunks, asr_language_code, source_lang, target_lang, speak=False, received_at=None):
+        """
+        Consume 16 kHz mono PCM chunks and yield one result per utterance:
+        {"index", "transcript", "translation", "audio", "processing_ms"}
+        received_at (perf_counter) is when the audio reached the app; the
+        delay from then to the first segment is recorded
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        segmenter = UtteranceSegmenter(self.vad)
+        pending = deque()
+        index = 0
+        first = True
+
+        def submit(utterance):
+            nonlocal index
+            pending.append(self.executor.submit(
+                self._process, index, utterance, time.perf_counter(),
+                asr_language_code, source_lang, target_lang, speak
+            ))
+            index += 1
+
+        def drain(block):
+            nonlocal first
+            # Results are emitted in speech order
+            while pending and (block or pending[0].done()):
+                result = pending.popleft().result()
+                if result is not None:
+                    if first:
+                        first = False
+                        self._record_first_segment(received_at)
+                    yield result
+
+        for chunk in pcm_chunks:
+            for utterance in segmenter.feed(chunk):
+                submit(utterance)
+            yield from drain(block=False)
+
+        utterance = segmenter.flush()
+        if utterance is not None:
+            submit(utterance)
+        yield from drain(block=True)
+
+    def _record_first_segment(self, received_at):
+        first_segment_ms = (time.perf_counter() - received_at) * 1000
+        self.first_segment_hist.observe(first_segment_ms)
+        logger.info("Voice: first segment ready %.0f ms after the recording arrived", first_segment_ms)
+
+    def _process(self, index, utterance, cut_at, asr_language_code, source_lang, target_lang, speak):
+        try:
+            transcript = self.transcriber.transcribe(pcm_to_wav(utterance), asr_language_code)
+        except (AudioUnintelligible, ASRUnavailable) as e:
+            logger.warning("Voice segment %d not transcribed: %s", index, e)
+            return None
+        if not transcript:
+            return None
+
+        translation = self.engine.translate(transcript, source_lang, target_lang)
+        processing_ms = (time.perf_counter() - cut_at) * 1000
+        self.segment_processing_hist.observe(processing_ms)
+        logger.debug("Voice segment %d: transcribed and translated in %.0f ms", index, processing_ms)
+
+        audio = None
+        if speak and self.synthesizer is not None:
+            try:
+                audio = self.synthesizer.synthesize(translation, target_lang)
+            except Exception as e:
+                logger.warning("Voice segment %d not spoken: %s", index, e)
+
+        return {
+            "index": index,
+            "transcript": transcript,
+            "translation": translation,
+            "audio": audio,
+            "processing_ms": processing_ms,
+        }
+
+    def stats(self):
+        return {
+            "segment_processing_ms": self.segment_processing_hist.snapshot(),
+            "time_to_first_segment_ms": self.first_segment_hist.snapshot(),
+        }
+
+
+# Dropped with the engine, so a rebuilt engine never inherits a stale pipeline
+_pipelines = weakref.WeakKeyDictionary()
+_pipelines_lock = threading.Lock()
+
+
+def find_voice_pipeline(engine):
+    """The engine's pipeline if voice has been used, without creating one"""
+    with _pipelines_lock:
+        return _pipelines.get(engine)
+
+
+def get_voice_pipeline(engine, transcriber=None, synthesizer=None):
+    """Process-wide pipeline for an engine (its worker threads are reused across reruns)"""
+    with _pipelines_lock:
+        pipeline = _pipelines.get(engine)
+        if pipeline is None:
+            from backend.transcription import get_transcriber
+            from backend.speech_synthesis import get_speech_synthesizer
+            pipeline = VoicePipeline(
+                transcriber or get_transcriber(),
+                engine,
+                synthesizer or get_speech_synthesizer()
+            )
+            _pipelines[engine] = pipeline
+        return pipeline
@@ -2,12 +2,14 @@
 Voice Input/Output Service using Backend Recording and Speech Recognition
 """
 
+import time
+
 import streamlit as st
-from gtts import gTTS
-import tempfile
-import os
-import speech_recognition as sr
-from io import BytesIO
+from backend.speech_synthesis import get_speech_synthesizer
+from backend.transcription import get_transcriber
+from backend.asr_backends import ASRUnavailable
+from backend.voice_pipeline import get_voice_pipeline, iter_wav_chunks
+from backend.tts_backends import GTTSBackend
 
 class VoiceService:
     def __init__(self):
@@ -18,9 +20,6 @@ class VoiceService:
             st.session_state.voice_transcript = None
         if "voice_audio_processed" not in st.session_state:
             st.session_state.voice_audio_processed = None
-        if "recognizer" not in st.session_state:
-            # Initialize speech recognizer once
-            st.session_state.recognizer = sr.Recognizer()
     
     def enable(self):
         """Enable voice features"""
@@ -38,33 +37,23 @@ class VoiceService:
     
     def speak(self, text, language):
         """
-        Convert text to speech using gTTS
+        Convert text to speech (cached, with an offline fallback backend)
         Plays audio directly in the browser
         """
         try:
             if not text or not text.strip():
                 return False
-                
-            # Map our language names to gTTS language codes
-            lang_code = self._get_gtts_lang_code(language)
-            
-            # Generate speech
-            tts = gTTS(text=text, lang=lang_code, slow=False)
-            
-            # Save to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-                temp_file = fp.name
-                tts.save(temp_file)
             
-            # Read and encode audio
-            with open(temp_file, 'rb') as audio_file:
-                audio_bytes = audio_file.read()
-            
-            # Clean up temp file
-            os.unlink(temp_file)
+            # Rendered clips are cached in memory and on disk, so re-listening
+            # to a phrase doesn't hit the network again
+            result = get_speech_synthesizer().synthesize(text, language)
+            if result is None:
+                st.warning("No text-to-speech backend is available")
+                return False
+            audio_bytes, audio_format = result
             
             # Play audio in Streamlit
-            st.audio(audio_bytes, format='audio/mp3', autoplay=True)
+            st.audio(audio_bytes, format=f'audio/{audio_format}', autoplay=True)
             
             return True
             
@@ -78,8 +67,6 @@ class VoiceService:
         Streamlit's audio_input returns an UploadedFile object
         """
         try:
-            recognizer = st.session_state.recognizer
-            
             # audio_file is an UploadedFile object, need to read bytes from it
             if hasattr(audio_file, 'read'):
                 # It's an UploadedFile, read the bytes
@@ -88,38 +75,15 @@ class VoiceService:
                 # It's already bytes
                 audio_bytes = audio_file
             
-            # Create a temporary file to store the audio
-            # speech_recognition needs a file-like object or file path
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-                tmp_file.write(audio_bytes)
-                tmp_path = tmp_file.name
+            # Get language code for recognition
+            lang_code = self._get_speech_recognition_code(language)
             
+            # Backends decode from memory; the offline one takes over without internet
             try:
-                # Use the audio file with speech_recognition
-                with sr.AudioFile(tmp_path) as source:
-                    # Adjust for ambient noise (optional, can be slow)
-                    # recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    # Record the audio
-                    audio_data = recognizer.record(source)
-                
-                # Get language code for recognition
-                lang_code = self._get_speech_recognition_code(language)
-                
-                # Recognize speech using Google's API (free, requires internet)
-                try:
-                    text = recognizer.recognize_google(audio_data, language=lang_code)
-                    return text
-                except sr.UnknownValueError:
-                    # Speech was unintelligible
-                    return None
-                except sr.RequestError as e:
-                    # API unavailable - could fallback to offline recognition
-                    st.warning(f"Speech recognition API error: {e}. Please check your internet connection.")
-                    return None
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                return get_transcriber().transcribe(audio_bytes, lang_code)
+            except ASRUnavailable as e:
+                st.warning(f"Speech recognition unavailable: {e}. Please check your internet connection.")
+                return None
             
         except Exception as e:
             st.error(f"Speech recognition error: {e}")
@@ -135,6 +99,7 @@ class VoiceService:
         
         st.write("🎤 **Voice Input**")
         audio_file = st.audio_input("Click to record", key="voice_recorder")
+        st.caption("Translation starts when you stop recording, one sentence at a time")
         
         if audio_file is not None:
             # Get bytes for hashing (UploadedFile can be read multiple times)
@@ -165,6 +130,57 @@ class VoiceService:
         
         return None
     
+    def render_voice_pipeline(self, translator, source_lang, target_lang, history):
+        """
+        Record, then transcribe and translate utterance by utterance
+        st.audio_input delivers the recording only once it is stopped, so
+        processing starts then; each segment is shown (and added to the chat)
+        as soon as it is translated instead of after the whole recording
+        Returns True if any segment was added
+        """
+        if not self.is_enabled():
+            return False
+        
+        st.write("🎤 **Voice Input**")
+        audio_file = st.audio_input("Click to record", key="voice_recorder")
+        st.caption("Translation starts when you stop recording, one sentence at a time")
+        if audio_file is None:
+            return False
+        
+        audio_file.seek(0)
+        audio_bytes = audio_file.read()
+        received_at = time.perf_counter()
+        audio_hash = hash(audio_bytes)
+        if st.session_state.voice_audio_processed == audio_hash:
+            return False
+        st.session_state.voice_audio_processed = audio_hash
+        
+        pipeline = get_voice_pipeline(translator)
+        added = False
+        with st.spinner("🎤 Transcribing your recording..."):
+            for segment in pipeline.run(
+                iter_wav_chunks(audio_bytes),
+                self._get_speech_recognition_code(source_lang),
+                source_lang,
+                target_lang,
+                received_at=received_at
+            ):
+                history.append("user", segment["transcript"])
+                history.append(
+                    "assistant",
+                    f"Translation to {target_lang}:",
+                    translation=segment["translation"],
+                    target=target_lang
+                )
+                with st.chat_message("assistant"):
+                    st.write(f"🎤 {segment['transcript']}")
+                    st.caption(f"→ {segment['translation']}")
+                added = True
+        
+        if not added:
+            st.warning("⚠️ Could not understand audio. Please try again.")
+        return added
+    
     def get_transcript(self):
         """Get and clear the stored transcript"""
         if st.session_state.voice_transcript:
@@ -178,13 +194,7 @@ class VoiceService:
         Map language names to gTTS language codes
         gTTS supports: en, sw (Swahili), and many others
         """
-        mapping = {
-            "english": "en",
-            "swahili": "sw",
-            "luo": "en",      # Fallback to English (Luo not supported in gTTS)
-            "kikuyu": "en"    # Fallback to English (Kikuyu not supported in gTTS)
-        }
-        return mapping.get(language.lower(), "en")
+        return GTTSBackend().voice_for(language)
     
     def _get_speech_recognition_code(self, language):
         """
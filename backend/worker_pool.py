@@ -0,0 +1,281 @@
+"""
+Multi-process inference worker pool
+Each worker process runs generate with its own pinned torch thread count.
+Model weights live in shared memory, so N workers don't cost N copies.
+A worker that dies fails the request it was running and is respawned;
+the metrics recorded in a worker travel back with each result.
+"""
+
+from concurrent.futures import Future
+import torch.multiprocessing as mp
+import itertools
+import threading
+import logging
+import queue
+import time
+import os
+
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+# How often the result collector checks that every worker is alive
+WATCH_INTERVAL_SECONDS = 1.0
+
+# Recorded by generate_translations in the worker, replayed in the parent
+WORKER_COUNTERS = ("model_calls", "input_tokens", "output_tokens")
+WORKER_STAGES = ("tokenize", "generate", "decode")
+
+
+def plan_workers(cores=None, workers=0, threads=0):
+    """
+    Choose (workers, threads per worker) for this host
+    workers/threads of 0 mean "derive from the core count"
+    """
+    cores = cores or os.cpu_count() or 1
+    if threads <= 0:
+        # Beyond ~4 intra-op threads generate scales poorly; more processes win
+        threads = max(1, min(4, cores // max(1, workers))) if workers > 0 else min(4, cores)
+    if workers <= 0:
+        workers = max(1, cores // threads)
+    return workers, threads
+
+
+def _metrics_mark():
+    return (
+        {name: metrics.get_counter(name).value for name in WORKER_COUNTERS},
+        {stage: metrics.stage_histogram(stage).totals()[1:] for stage in WORKER_STAGES},
+    )
+
+
+def _metrics_since(mark):
+    """Counter increments and stage latencies (one generate call each) since mark"""
+    counters, stages = mark
+    now_counters, now_stages = _metrics_mark()
+    return {
+        "counters": {
+            name: now_counters[name] - counters[name]
+            for name in WORKER_COUNTERS if now_counters[name] != counters[name]
+        },
+        "stages_ms": {
+            stage: now_stages[stage][1] - stages[stage][1]
+            for stage in WORKER_STAGES if now_stages[stage][0] != stages[stage][0]
+        },
+    }
+
+
+def _merge_metrics(recorded):
+    """Add metrics recorded in a worker process to this process's metrics"""
+    if not recorded or not metrics.enabled():
+        return
+    for name, amount in recorded["counters"].items():
+        metrics.inc(name, amount)
+    for stage, ms in recorded["stages_ms"].items():
+        metrics.stage_histogram(stage).observe(ms)
+
+
+def _worker_main(worker_id, model, tokenizer, device, threads, requests, results):
+    import torch
+    from backend.model_registry import LoadedModel
+    from backend.nllb_service import generate_translations
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+    loaded = LoadedModel(tokenizer, model, device)
+    results.put(("ready", worker_id, None, None))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        request_id, texts, source_lang, target_lang, profile = request
+        # Lets the parent fail this request if the worker dies running it
+        results.put(("taken", worker_id, request_id, None))
+
+        start = time.perf_counter()
+        mark = _metrics_mark()
+        try:
+            with torch.inference_mode():
+                output = generate_translations(loaded, texts, source_lang, target_lang, profile)
+            ok = True
+        except Exception as e:
+            output = f"{type(e).__name__}: {e}"
+            ok = False
+        busy = time.perf_counter() - start
+        results.put(("done", worker_id, request_id, (ok, output, busy, _metrics_since(mark))))
+
+
+class _WorkerStats:
+    def __init__(self):
+        self.requests = 0
+        self.texts = 0
+        self.busy_seconds = 0.0
+        self.ready = False
+        self.restarts = 0
+        # Request the worker is running, if any
+        self.running = None
+
+
+class WorkerPool:
+    def __init__(self, loaded, workers, threads):
+        self.workers = workers
+        self.threads = threads
+
+        # Move weights into shared memory once; spawned workers map the same pages
+        loaded.model.share_memory()
+
+        self._ctx = mp.get_context("spawn")
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._loaded = loaded
+        self._pending = {}
+        self._pending_texts = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = [_WorkerStats() for _ in range(workers)]
+        self._closing = False
+        self.started_at = time.perf_counter()
+
+        self._processes = [self._spawn(worker_id) for worker_id in range(workers)]
+
+        self._collector = threading.Thread(target=self._collect, name="nllb-pool-results", daemon=True)
+        self._collector.start()
+        logger.info("Started %d inference workers with %d threads each", workers, threads)
+
+    def _spawn(self, worker_id):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self._loaded.model, self._loaded.tokenizer, self._loaded.device,
+                  self.threads, self._requests, self._results),
+            name=f"nllb-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def submit(self, texts, source_lang, target_lang, profile=None):
+        """Send a batch to the first free worker; returns a Future with the translations"""
+        future = Future()
+        texts = list(texts)
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self._pending_texts[request_id] = len(texts)
+        self._requests.put((request_id, texts, source_lang, target_lang, profile))
+        return future
+
+    def _collect(self):
+        last_check = time.perf_counter()
+        while True:
+            try:
+                kind, worker_id, request_id, payload = self._results.get(timeout=WATCH_INTERVAL_SECONDS)
+            except queue.Empty:
+                kind = None
+            except (EOFError, OSError):
+                return
+            if kind == "stop":
+                return
+            if kind is not None:
+                self._handle(kind, worker_id, request_id, payload)
+
+            # Checked between messages too, so a busy pool still notices a dead worker
+            if time.perf_counter() - last_check >= WATCH_INTERVAL_SECONDS:
+                self._check_workers()
+                last_check = time.perf_counter()
+
+    def _handle(self, kind, worker_id, request_id, payload):
+        stats = self._stats[worker_id]
+        if kind == "ready":
+            stats.ready = True
+            return
+        if kind == "taken":
+            stats.running = request_id
+            return
+
+        ok, output, busy, recorded = payload
+        _merge_metrics(recorded)
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+            texts = self._pending_texts.pop(request_id, 0)
+            stats.running = None
+            stats.requests += 1
+            stats.texts += texts
+            stats.busy_seconds += busy
+        if future is None:
+            return
+        if ok:
+            future.set_result(output)
+        else:
+            future.set_exception(RuntimeError(f"Worker {worker_id} failed: {output}"))
+
+    def _check_workers(self):
+        """Fail the request of any worker that died and start a replacement"""
+        for worker_id, process in enumerate(self._processes):
+            if process.is_alive() or self._closing:
+                continue
+            stats = self._stats[worker_id]
+            with self._lock:
+                request_id, stats.running = stats.running, None
+                future = self._pending.pop(request_id, None) if request_id is not None else None
+                self._pending_texts.pop(request_id, None)
+                stats.ready = False
+                stats.restarts += 1
+            logger.error("Inference worker %d died (exit code %s), restarting it", worker_id, process.exitcode)
+            metrics.inc("worker_restarts")
+            if future is not None:
+                future.set_exception(
+                    RuntimeError(f"Worker {worker_id} died (exit code {process.exitcode})")
+                )
+            self._processes[worker_id] = self._spawn(worker_id)
+
+    def stats(self):
+        """Per-worker request counts and utilization (busy time / wall time)"""
+        elapsed = time.perf_counter() - self.started_at
+        with self._lock:
+            workers = [
+                {
+                    "worker": worker_id,
+                    "alive": self._processes[worker_id].is_alive(),
+                    "ready": stats.ready,
+                    "requests": stats.requests,
+                    "texts": stats.texts,
+                    "busy_s": stats.busy_seconds,
+                    "restarts": stats.restarts,
+                    "utilization": stats.busy_seconds / elapsed if elapsed else 0.0,
+                }
+                for worker_id, stats in enumerate(self._stats)
+            ]
+            pending = len(self._pending)
+        return {
+            "workers": self.workers,
+            "threads_per_worker": self.threads,
+            "pending": pending,
+            "per_worker": workers,
+        }
+
+    def close(self):
+        self._closing = True
+        for _ in self._processes:
+            self._requests.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+        self._results.put(("stop", None, None, None))
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(name, loaded, workers=0, threads=0):
+    """Return the process-wide pool registered under name, starting it on first use"""
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            workers, threads = plan_workers(workers=workers, threads=threads)
+            pool = WorkerPool(loaded, workers, threads)
+            _pools[name] = pool
+        return pool
@@ -0,0 +1,57 @@
+# Decoding profiles
+# max_new_tokens is derived from the input length:
+#   min(max_length, input_tokens * length_ratio + length_margin)
+DECODING_PROFILES = {
+    "fast": {
+        "name": "Fast",
+        "num_beams": 1,
+        "length_ratio": 1.5,
+        "length_margin": 10
+    },
+    "balanced": {
+        "name": "Balanced",
+        "num_beams": 2,
+        "length_ratio": 2.0,
+        "length_margin": 16
+    },
+    "quality": {
+        "name": "Quality",
+        "num_beams": 5,
+        "length_ratio": 2.5,
+        "length_margin": 32
+    }
+}
+
+# Upper bound on generated tokens for any profile
+MAX_LENGTH = 512
+
+# "auto" picks a profile from the input length (in tokens):
+# greedy for short chat messages, beams for longer sentences
+AUTO_PROFILE = "auto"
+AUTO_POLICY = [
+    (8, "fast"),
+    (32, "balanced"),
+    (None, "quality")
+]
+
+def resolve_profile(profile, input_tokens):
+    """Turn a profile name (or "auto") into a concrete profile name"""
+    if profile == AUTO_PROFILE:
+        for max_tokens, name in AUTO_POLICY:
+            if max_tokens is None or input_tokens <= max_tokens:
+                return name
+    if profile not in DECODING_PROFILES:
+        raise KeyError(f"Unknown decoding profile '{profile}'")
+    return profile
+
+def generation_kwargs(profile, input_tokens):
+    """generate() keyword arguments for a concrete profile"""
+    config = DECODING_PROFILES[profile]
+    max_new_tokens = int(input_tokens * config["length_ratio"] + config["length_margin"])
+    kwargs = {
+        "num_beams": config["num_beams"],
+        "max_new_tokens": max(1, min(MAX_LENGTH, max_new_tokens))
+    }
+    if config["num_beams"] > 1:
+        kwargs["early_stopping"] = True
+    return kwargs
@@ -0,0 +1,142 @@
+"""
+Runtime settings
+Every value can be overridden with an environment variable (or a .env file)
+"""
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_str(name, default):
+    return os.getenv(name, default)
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Model
+NLLB_MODEL_DIR = _env_str("NLLB_MODEL_DIR", "./nllb_model")
+# Inference precision: fp32, int8 (dynamic quantization, CPU) or bf16
+NLLB_PRECISION = _env_str("NLLB_PRECISION", "fp32")
+
+# Micro-batching of concurrent model calls
+BATCHING_ENABLED = _env_bool("NLLB_BATCHING_ENABLED", True)
+BATCH_MAX_SIZE = _env_int("NLLB_BATCH_MAX_SIZE", 8)
+BATCH_MAX_WAIT_MS = _env_float("NLLB_BATCH_MAX_WAIT_MS", 5.0)
+
+# Load the model in a background thread (the phrase database serves meanwhile)
+# and run one warmup generate per language pair before taking traffic
+BACKGROUND_LOAD = _env_bool("NLLB_BACKGROUND_LOAD", True)
+WARMUP_ENABLED = _env_bool("NLLB_WARMUP", True)
+
+# Multi-process inference: 0 disables the pool, -1 derives the worker count
+# from the CPU cores; threads per worker of 0 also derives from the cores
+WORKER_POOL_WORKERS = _env_int("NLLB_WORKERS", 0)
+WORKER_POOL_THREADS = _env_int("NLLB_THREADS_PER_WORKER", 0)
+# Longest a request waits for a worker's result before it fails
+WORKER_POOL_TIMEOUT_SECONDS = _env_float("NLLB_WORKER_TIMEOUT_SECONDS", 120.0)
+
+# Translation cache (in-memory LRU + SQLite on disk)
+CACHE_ENABLED = _env_bool("TRANSLATION_CACHE_ENABLED", True)
+CACHE_DB_PATH = _env_str("TRANSLATION_CACHE_DB", "data/translation_cache.sqlite3")
+CACHE_MEMORY_ENTRIES = _env_int("TRANSLATION_CACHE_MEMORY_ENTRIES", 2048)
+CACHE_DISK_ENTRIES = _env_int("TRANSLATION_CACHE_DISK_ENTRIES", 100000)
+CACHE_TTL_SECONDS = _env_int("TRANSLATION_CACHE_TTL_SECONDS", 30 * 24 * 3600)
+
+# Approximate phrase matching before the model is called
+FUZZY_MATCH_ENABLED = _env_bool("FUZZY_MATCH_ENABLED", True)
+FUZZY_MATCH_THRESHOLD = _env_float("FUZZY_MATCH_THRESHOLD", 0.8)
+
+# Phrase corpus; data/common_phrases.sqlite3 (scripts/compile_phrases.py) is
+# used instead when it is up to date. Edits are picked up every few seconds
+PHRASES_FILE = _env_str("PHRASES_FILE", "data/common_phrases.json")
+PHRASE_RELOAD_INTERVAL_SECONDS = _env_float("PHRASE_RELOAD_INTERVAL_SECONDS", 2.0)
+
+# Concurrent identical requests share one in-progress model call
+COALESCING_ENABLED = _env_bool("COALESCING_ENABLED", True)
+
+# Source-language identification: translate from the detected language
+# instead of the selected one when confident, the selected language scores
+# clearly worse (log-likelihood per n-gram) and the text is long enough.
+# Off until python -m scripts.language_id_eval passes on your own traffic
+LANGUAGE_ID_ENABLED = _env_bool("LANGUAGE_ID_ENABLED", False)
+LANGUAGE_ID_THRESHOLD = _env_float("LANGUAGE_ID_THRESHOLD", 0.9)
+LANGUAGE_ID_MIN_MARGIN = _env_float("LANGUAGE_ID_MIN_MARGIN", 0.55)
+LANGUAGE_ID_MIN_CHARS = _env_int("LANGUAGE_ID_MIN_CHARS", 12)
+
+# Inputs at least this long (or spanning several lines) are split into sentences
+LONG_TEXT_MIN_CHARS = _env_int("LONG_TEXT_MIN_CHARS", 200)
+
+# Stream translations into the chat as tokens are generated. Only greedy
+# profiles can stream; beam profiles (the "quality" default) still arrive whole
+STREAMING_ENABLED = _env_bool("STREAMING_ENABLED", False)
+
+# Default decoding profile (see config/decoding.py): fast, balanced, quality or auto
+DECODING_PROFILE = _env_str("DECODING_PROFILE", "quality")
+
+# Headless HTTP API (api_server.py)
+API_HOST = _env_str("API_HOST", "127.0.0.1")
+API_PORT = _env_int("API_PORT", 8000)
+API_WORKERS = _env_int("API_WORKERS", 4)
+API_MAX_QUEUE = _env_int("API_MAX_QUEUE", 32)
+API_TIMEOUT_SECONDS = _env_float("API_TIMEOUT_SECONDS", 30.0)
+
+# Admission control (backend/admission.py): degrade to greedy decoding, then
+# phrase/cache-only answers, then rejection while the latency SLO is at risk
+ADMISSION_ENABLED = _env_bool("ADMISSION_ENABLED", True)
+ADMISSION_SLO_MS = _env_float("ADMISSION_SLO_MS", 5000.0)
+ADMISSION_MAX_IN_FLIGHT = _env_int("ADMISSION_MAX_IN_FLIGHT", 16)
+ADMISSION_WINDOW_SECONDS = _env_float("ADMISSION_WINDOW_SECONDS", 10.0)
+ADMISSION_RECOVERY_SECONDS = _env_float("ADMISSION_RECOVERY_SECONDS", 5.0)
+ADMISSION_REDUCED_PROFILE = _env_str("ADMISSION_REDUCED_PROFILE", "fast")
+
+# Text-to-speech: backends in order of preference (gtts needs network, espeak is offline)
+TTS_BACKENDS = _env_str("TTS_BACKENDS", "gtts,espeak")
+AUDIO_CACHE_DIR = _env_str("AUDIO_CACHE_DIR", "data/audio_cache")
+AUDIO_CACHE_MEMORY_MB = _env_int("AUDIO_CACHE_MEMORY_MB", 32)
+AUDIO_CACHE_DISK_MB = _env_int("AUDIO_CACHE_DISK_MB", 512)
+
+# Speech recognition: backends in order of preference (google needs network, whisper is offline)
+ASR_BACKENDS = _env_str("ASR_BACKENDS", "google,whisper")
+# Whisper model size ("tiny", "base", "small", ...) or a local model directory
+ASR_WHISPER_MODEL = _env_str("ASR_WHISPER_MODEL", "small")
+ASR_WHISPER_COMPUTE_TYPE = _env_str("ASR_WHISPER_COMPUTE_TYPE", "int8")
+
+# Voice input: transcribe and translate utterance by utterance (VAD-segmented)
+VOICE_PIPELINE_ENABLED = _env_bool("VOICE_PIPELINE_ENABLED", True)
+
+# Chat history: messages kept in memory, older ones are compressed into
+# chunks on disk (or in memory when the archive directory is empty)
+CHAT_HISTORY_RETAINED = _env_int("CHAT_HISTORY_RETAINED", 200)
+CHAT_ARCHIVE_DIR = _env_str("CHAT_ARCHIVE_DIR", "data/chat_archive")
+# Messages rendered per page of the chat
+CHAT_PAGE_SIZE = _env_int("CHAT_PAGE_SIZE", 20)
+
+# Logging level for the backend: DEBUG, INFO, WARNING or ERROR
+LOG_LEVEL = _env_str("LOG_LEVEL", "INFO")
+
+# Counters and per-stage latency (GET /metrics on the API); off makes them no-ops
+METRICS_ENABLED = _env_bool("METRICS_ENABLED", True)
+# Also rewrite this file with the Prometheus text format every interval (empty: off)
+METRICS_FILE = _env_str("METRICS_FILE", "")
+METRICS_FILE_INTERVAL_SECONDS = _env_float("METRICS_FILE_INTERVAL_SECONDS", 15.0)
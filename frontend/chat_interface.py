@@ -1,6 +1,30 @@
 import streamlit as st
+from backend.admission import Overloaded
+from backend.chat_history import ChatHistory
+from backend.translation_engine import BUSY_MESSAGE
+from config import settings
+from config.languages import SUPPORTED_LANGUAGES, get_language_name
 
-def render_custom_chat_input(voice_service, source_lang):
+# Heading suffix when a stored translation stood in for the model under load
+APPROXIMATE_NOTE = "(approximate, the translator is busy)"
+
+
+def get_chat_history():
+    """This session's chat history (bounded; older turns are archived)"""
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = ChatHistory(
+            max_retained=settings.CHAT_HISTORY_RETAINED,
+            chunk_size=settings.CHAT_PAGE_SIZE,
+            archive_dir=settings.CHAT_ARCHIVE_DIR or None
+        )
+        st.session_state.chat_page = 0
+    return st.session_state.chat_history
+
+def clear_chat_history():
+    get_chat_history().clear()
+    st.session_state.chat_page = 0
+
+def render_custom_chat_input(voice_service, source_lang, translator=None, target_lang=None):
     """Render chat input with voice support"""
     
     # Check for voice transcript first
@@ -11,8 +35,13 @@ def render_custom_chat_input(voice_service, source_lang):
         st.session_state.voice_transcript = None
         return user_input
 
+    # Pipelined voice: segments are translated and added to the chat as they are recognized
+    if voice_service.is_enabled() and settings.VOICE_PIPELINE_ENABLED and translator is not None:
+        if voice_service.render_voice_pipeline(translator, source_lang, target_lang, get_chat_history()):
+            st.rerun()
+    
     # Voice recorder using backend recording (st.audio_input)
-    if voice_service.is_enabled():
+    elif voice_service.is_enabled():
         voice_transcript = voice_service.render_voice_recorder(source_lang)
         # If transcript was returned, it's already stored in session state
         # Just trigger rerun to process it
@@ -28,63 +57,125 @@ def render_custom_chat_input(voice_service, source_lang):
 def render_chat(translator, source_lang, target_lang, voice_service):
     """Display chat messages and handle input with voice support"""
     
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    history = get_chat_history()
+    page_size = max(1, settings.CHAT_PAGE_SIZE)
+    pages = history.page_count(page_size)
+    page = min(st.session_state.get("chat_page", 0), pages - 1)
+    
+    # Only one page is rendered per rerun, however long the conversation
+    if page < pages - 1 and st.button("⬆️ Older messages", key="chat_older"):
+        st.session_state.chat_page = page + 1
+        st.rerun()
     
     # Display chat messages
-    for idx, message in enumerate(st.session_state.messages):
-        with st.chat_message(message["role"]):
-            st.write(message["content"])
-            if message.get("translation"):
-                st.caption(f"→ {message['translation']}")
+    for message in history.page(page, page_size):
+        with st.chat_message(message.role):
+            st.write(message.content)
+            if message.translations:
+                # "Translate to all": one line (and Listen button) per language
+                for lang, translation in message.translations.items():
+                    st.caption(f"→ **{get_language_name(lang)}:** {translation}")
+                    if voice_service.is_enabled() and st.button(
+                        f"🔊 Listen ({get_language_name(lang)})",
+                        key=f"speak_{message.id}_{lang}",
+                        help="Click to hear pronunciation"
+                    ):
+                        voice_service.speak(translation, lang)
+            elif message.translation:
+                st.caption(f"→ {message.translation}")
 
                 # Add speaker button for voice output (on-demand, not auto-play)
-                if voice_service.is_enabled() and message["role"] == "assistant":
+                if voice_service.is_enabled() and message.role == "assistant":
                     if st.button(
                         "🔊 Listen",
-                        key=f"speak_{idx}",
+                        key=f"speak_{message.id}",
                         help="Click to hear pronunciation"
                     ):
                         voice_service.speak(
-                            message['translation'],
-                            target_lang
+                            message.translation,
+                            message.target or target_lang
                         )
     
+    if page > 0 and st.button("⬇️ Newer messages", key="chat_newer"):
+        st.session_state.chat_page = page - 1
+        st.rerun()
+    
     # Chat input area
     st.write("")  # Spacing
 
     # Use custom input with mic icon inside
-    user_input = render_custom_chat_input(voice_service, source_lang)
+    user_input = render_custom_chat_input(voice_service, source_lang, translator, target_lang)
     
     # Process text input (from either text or voice)
     if user_input:
-        # Add message ID for unique keys
-        msg_id = len(st.session_state.messages)
+        # New messages land on the newest page
+        st.session_state.chat_page = 0
         
         # Add user message
-        st.session_state.messages.append({
-            "role": "user", 
-            "content": user_input,
-            "id": msg_id
-        })
+        history.append("user", user_input)
+        
+        heading = f"Translation to {target_lang}:"
+        
+        if st.session_state.get("translate_to_all"):
+            # Every other language from one encoder pass (the source language is checked there)
+            with st.spinner("Translating..."):
+                translations = translator.translate_multi(
+                    user_input,
+                    source_lang,
+                    list(SUPPORTED_LANGUAGES)
+                )
+            history.append("assistant", "Translations:", translations=translations)
+            st.rerun()
         
-        # Show loading spinner
-        with st.spinner("Translating..."):
-            # Get translation
-            translation = translator.translate(
-                user_input, 
-                source_lang, 
-                target_lang
-            )
+        if settings.STREAMING_ENABLED:
+            # Catch a "Translate from" left on the wrong language; the heading
+            # is shown before the translation, so check it up front
+            detection = translator.detect_source(user_input, source_lang, target_lang)
+            if detection["corrected"]:
+                source_lang = detection["source"]
+                heading = f"Translation to {target_lang} (detected {get_language_name(source_lang)}):"
+            # Render tokens as they arrive; write_stream returns the full text
+            with st.chat_message("user"):
+                st.write(user_input)
+            details = {}
+            with st.chat_message("assistant"):
+                st.write(heading)
+                translation = st.write_stream(
+                    translator.translate_stream(
+                        user_input,
+                        source_lang,
+                        target_lang,
+                        details=details
+                    )
+                )
+            if details.get("approximate"):
+                heading = f"{heading[:-1]} {APPROXIMATE_NOTE}:"
+        else:
+            # Show loading spinner
+            with st.spinner("Translating..."):
+                # Get translation
+                try:
+                    result = translator.translate_detailed(
+                        user_input, 
+                        source_lang, 
+                        target_lang
+                    )
+                    translation = result["translation"]
+                    # The engine caught a "Translate from" left on the wrong language
+                    if result["corrected"]:
+                        heading = f"Translation to {target_lang} (detected {get_language_name(result['source'])}):"
+                    if result["approximate"]:
+                        heading = f"{heading[:-1]} {APPROXIMATE_NOTE}:"
+                except Overloaded:
+                    translation = BUSY_MESSAGE
         
         # Add assistant message
-        st.session_state.messages.append({
-            "role": "assistant",
-            "content": f"Translation to {target_lang}:",
-            "translation": translation,
-            "id": msg_id + 1
-        })
+        history.append(
+            "assistant",
+            heading,
+            translation=translation,
+            target=target_lang
+        )
         
         # Rerun to update UI (removed auto-speak - user can click speaker button if they want to hear pronunciation)
         st.rerun()
\ No newline at end of file
@@ -23,4 +23,10 @@ def render_language_selector():
             key="target_lang"
         )
     
+    st.checkbox(
+        "Translate to all languages",
+        key="translate_to_all",
+        help="Show the message in every other language at once"
+    )
+    
     return source_lang, target_lang
\ No newline at end of file
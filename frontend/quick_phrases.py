@@ -1,19 +1,20 @@
 import streamlit as st
-from backend.phrase_database import PhraseDatabase
+from backend.phrase_database import get_phrase_database
+from frontend.chat_interface import get_chat_history
 
 def render_quick_phrases(translator, source_lang, target_lang):
     """Display quick phrase buttons"""
     st.subheader("Quick Phrases")
     
-    # Load phrase database
-    phrase_db = PhraseDatabase()
-    categories = phrase_db.get_categories()
+    # Process-wide corpus, shared with the engine (not re-read on every rerun)
+    snapshot = get_phrase_database().snapshot
+    categories = list(snapshot.phrases.keys())
     
     # Select category
     category = st.selectbox("Category:", categories)
     
     # Get phrases for selected category
-    phrases = phrase_db.get_phrases_by_category(category)
+    phrases = snapshot.phrases.get(category, [])
     
     # Display phrase buttons
     for phrase in phrases:
@@ -24,18 +25,14 @@ def render_quick_phrases(translator, source_lang, target_lang):
                 translation = phrase.get(target_lang, "Translation not available")
                 
                 # Add to chat
-                if "messages" not in st.session_state:
-                    st.session_state.messages = []
-                
-                st.session_state.messages.append({
-                    "role": "user",
-                    "content": phrase_text
-                })
-                
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": f"In {target_lang}:",
-                    "translation": translation
-                })
+                history = get_chat_history()
+                history.append("user", phrase_text)
+                history.append(
+                    "assistant",
+                    f"In {target_lang}:",
+                    translation=translation,
+                    target=target_lang
+                )
+                st.session_state.chat_page = 0
                 
                 st.rerun()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import streamlit as st
-from frontend.chat_interface import render_chat
+from frontend.chat_interface import render_chat, clear_chat_history
 from frontend.language_selector import render_language_selector
 from frontend.quick_phrases import render_quick_phrases
 
@@ -8,6 +8,12 @@ def render_main_ui(translator, voice_service):
     st.title("🇰🇪 Kenyan Local Dialect Translator")
     st.caption("Chat-based translation between English, Swahili, Luo & Kikuyu")
     
+    load_error = translator.model_load_error()
+    if load_error:
+        st.error(f"⚠️ The translation model failed to load: {load_error}. Quick phrases still work.")
+    elif not translator.is_model_ready():
+        st.info("⏳ Loading the translation model... Quick phrases work right away.")
+    
     # Sidebar for language selection
     with st.sidebar:
         st.header("Settings")
@@ -33,7 +39,7 @@ def render_main_ui(translator, voice_service):
         
         st.divider()
         if st.button("🗑️ Clear Chat"):
-            st.session_state.messages = []
+            clear_chat_history()
     
     # Main chat area
     render_chat(translator, source_lang, target_lang, voice_service)
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Translation pipeline benchmark
+
+Times PhraseDatabase.lookup, the model (NLLBTranslator.translate_batch)
+and the end-to-end TranslationEngine.translate over the fixed corpus in
+data/benchmark_corpus.json, cold (fresh model load, empty cache) and warm.
+Reports throughput, p50/p95/p99 latency, peak RSS and model load time,
+and writes JSON so two runs can be diffed. Multi-target translation
+(one encoder pass for every target) is timed against separate calls.
+
+Usage:
+    python -m scripts.benchmark --output bench.json
+    python -m scripts.benchmark --mock --output bench.json          # no model weights needed (CI)
+    python -m scripts.benchmark --model-dir ./tiny_nllb --pairs english:swahili
+    python -m scripts.benchmark --compare old.json --output new.json
+"""
+
+import argparse
+import platform
+import json
+import time
+
+from backend.metrics import peak_rss_mb, current_rss_mb
+from config import settings
+from scripts.corpora import parse_pairs
+
+STAGES = ("phrase_lookup", "model", "end_to_end")
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies_ms, input_tokens, output_tokens):
+    seconds = sum(latencies_ms) / 1000
+    return {
+        "sentences": len(latencies_ms),
+        "seconds": seconds,
+        "sentences_per_s": len(latencies_ms) / seconds if seconds else None,
+        "input_tokens_per_s": input_tokens / seconds if seconds else None,
+        "output_tokens_per_s": output_tokens / seconds if seconds else None,
+        "mean_ms": seconds * 1000 / len(latencies_ms) if latencies_ms else None,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+    }
+
+
+def run_stage(stage, engine, sentences, source_lang, target_lang, profile):
+    translator = engine.nllb
+    if stage == "phrase_lookup":
+        call = lambda text: engine.phrase_db.lookup(text, source_lang, target_lang)
+    elif stage == "model":
+        call = lambda text: translator.translate_batch([text], source_lang, target_lang, profile)[0]
+    else:
+        call = lambda text: engine.translate(text, source_lang, target_lang, profile)
+
+    latencies = []
+    input_tokens = output_tokens = 0
+    for text in sentences:
+        start = time.perf_counter()
+        result = call(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if stage != "phrase_lookup":
+            input_tokens += translator.count_tokens(text)
+            output_tokens += translator.count_tokens(result or "")
+    return summarize(latencies, input_tokens, output_tokens)
+
+
+def run_multi_target(translator, corpus, profile):
+    """Time translating each sentence into all other languages: shared encoder vs. one call per target"""
+    results = {}
+    for source_lang, sentences in corpus.items():
+        targets = [lang for lang in corpus if lang != source_lang]
+        if not sentences or not targets:
+            continue
+        shared = separate = 0.0
+        for text in sentences:
+            start = time.perf_counter()
+            translator.translate_multi(text, source_lang, targets, profile)
+            shared += time.perf_counter() - start
+            start = time.perf_counter()
+            for target_lang in targets:
+                translator.translate_batch([text], source_lang, target_lang, profile)
+            separate += time.perf_counter() - start
+        results[source_lang] = {
+            "sentences": len(sentences),
+            "targets": len(targets),
+            "shared_ms": shared * 1000,
+            "separate_ms": separate * 1000,
+            "saving": 1 - shared / separate if separate else None,
+        }
+    return results
+
+
+def build_engine(args):
+    # Keep the benchmark away from the on-disk cache unless asked for
+    if not args.disk_cache:
+        settings.CACHE_DB_PATH = None
+    settings.CACHE_ENABLED = not args.no_cache
+    # Load synchronously so the cold-start measurement below is accurate
+    settings.BACKGROUND_LOAD = False
+
+    from backend.translation_engine import TranslationEngine
+    if args.mock:
+        from scripts.mock_translator import MockTranslator
+        return TranslationEngine(nllb=MockTranslator())
+
+    from backend.nllb_service import NLLBTranslator
+    return TranslationEngine(nllb=NLLBTranslator(args.model_dir, args.precision))
+
+
+def compare(previous, current):
+    """Print warm p95 and throughput changes against an earlier run"""
+    print(f"\n{'stage':<15}{'pair':<22}{'p95 ms':>26}{'sent/s':>30}")
+    for stage, pairs in current["results"].items():
+        for pair, runs in pairs.items():
+            old = previous.get("results", {}).get(stage, {}).get(pair, {}).get("warm")
+            new = runs["warm"]
+            if not old:
+                continue
+
+            def delta(key):
+                if not old.get(key) or new.get(key) is None:
+                    return "n/a"
+                return f"{old[key]:.1f}->{new[key]:.1f} ({(new[key] - old[key]) / old[key] * 100:+.0f}%)"
+
+            print(f"{stage:<15}{pair:<22}{delta('p95_ms'):>26}{delta('sentences_per_s'):>30}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="data/benchmark_corpus.json")
+    parser.add_argument("--pairs", nargs="*", help="source:target pairs (default: all)")
+    parser.add_argument("--profile", default=None, help="decoding profile (default: settings.DECODING_PROFILE)")
+    parser.add_argument("--model-dir", default=None, help="model directory, e.g. a small local stand-in model")
+    parser.add_argument("--precision", default=None)
+    parser.add_argument("--mock", action="store_true", help="use a simulated model instead of real weights")
+    parser.add_argument("--warm-runs", type=int, default=2)
+    parser.add_argument("--no-cache", action="store_true", help="disable the translation cache")
+    parser.add_argument("--disk-cache", action="store_true", help="use the on-disk cache instead of memory only")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="earlier JSON result to diff against")
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    rss_before = current_rss_mb()
+    engine = build_engine(args)
+    registry = engine.nllb.registry
+
+    # Cold start: time a fresh load of the weights
+    registry.unload()
+    load_start = time.perf_counter()
+    registry.get()
+    load_seconds = time.perf_counter() - load_start
+
+    profile = args.profile or settings.DECODING_PROFILE
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "mock": args.mock,
+            "model_dir": engine.nllb.model_dir,
+            "precision": engine.nllb.precision,
+            "profile": profile,
+            "cache": not args.no_cache,
+            "warm_runs": args.warm_runs,
+        },
+        "model_load_s": load_seconds,
+        "results": {stage: {} for stage in STAGES},
+    }
+
+    print(f"[INFO] Model loaded in {load_seconds:.2f}s")
+    print(f"{'stage':<15}{'pair':<22}{'run':<6}{'sent/s':>9}{'tok/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    for source_lang, target_lang in parse_pairs(args.pairs):
+        sentences = corpus.get(source_lang, [])
+        if not sentences:
+            continue
+        pair = f"{source_lang}->{target_lang}"
+        if engine.cache is not None:
+            engine.cache.clear()
+
+        for stage in STAGES:
+            runs = {"cold": run_stage(stage, engine, sentences, source_lang, target_lang, profile)}
+            warm = [run_stage(stage, engine, sentences, source_lang, target_lang, profile)
+                    for _ in range(max(1, args.warm_runs))]
+            runs["warm"] = warm[-1]
+            report["results"][stage][pair] = runs
+
+            for name, result in runs.items():
+                print(
+                    f"{stage:<15}{pair:<22}{name:<6}"
+                    f"{result['sentences_per_s'] or 0:>9.1f}{result['output_tokens_per_s'] or 0:>9.1f}"
+                    f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                )
+
+    report["multi_target"] = run_multi_target(engine.nllb, corpus, profile)
+    for source_lang, result in report["multi_target"].items():
+        print(
+            f"[INFO] {source_lang} -> {result['targets']} targets: shared encoder {result['shared_ms']:.0f} ms "
+            f"vs separate calls {result['separate_ms']:.0f} ms ({(result['saving'] or 0) * 100:.0f}% saved)"
+        )
+
+    report["memory"] = {
+        "rss_before_mb": rss_before,
+        "rss_after_mb": current_rss_mb(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    report["engine"] = engine.get_stats()
+    print(f"[INFO] Peak RSS {report['memory']['peak_rss_mb']:.0f} MB")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"[INFO] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
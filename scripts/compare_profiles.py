@@ -0,0 +1,90 @@
+"""
+Decoding profile comparison
+
+Translates the phrase corpus with every decoding profile and reports
+latency and quality per language pair, so defaults can be chosen per
+deployment. Quality is scored against the curated phrase translations
+and, as "agreement", against the quality profile's output.
+
+Usage:
+    python -m scripts.compare_profiles
+    python -m scripts.compare_profiles --pairs english:swahili --profiles fast quality --output profiles.json
+"""
+
+import argparse
+import json
+import time
+
+from backend.nllb_service import NLLBTranslator
+from backend.metrics import Histogram
+from config import settings
+from config.decoding import DECODING_PROFILES
+from scripts.corpora import load_phrase_pairs, parse_pairs
+from scripts.quality_metrics import corpus_bleu, corpus_chrf
+
+
+def run_profile(translator, sources, source_lang, target_lang, profile):
+    latency = Histogram([10, 25, 50, 100, 250, 500, 1000, 2500])
+    outputs = []
+    for source in sources:
+        start = time.perf_counter()
+        outputs.append(translator.translate_batch([source], source_lang, target_lang, profile)[0])
+        latency.observe((time.perf_counter() - start) * 1000)
+    return outputs, latency.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--pairs", nargs="*", help="source:target pairs (default: all)")
+    parser.add_argument("--profiles", nargs="*", default=list(DECODING_PROFILES.keys()))
+    parser.add_argument("--limit", type=int, default=0, help="sentences per pair (0 = all)")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    # Load in the foreground, so the precision reported is the one in use
+    settings.BACKGROUND_LOAD = False
+    translator = NLLBTranslator(args.model_dir)
+    report = {"precision": translator.precision, "pairs": {}}
+    print(f"{'pair':<22}{'profile':<10}{'p50 ms':>9}{'p95 ms':>9}{'BLEU':>7}{'chrF':>7}{'agree':>7}")
+
+    for source_lang, target_lang in parse_pairs(args.pairs):
+        corpus = load_phrase_pairs(source_lang, target_lang, args.limit)
+        if not corpus:
+            continue
+        sources = [source for source, _ in corpus]
+        references = [reference for _, reference in corpus]
+
+        # Warm up once so the first profile isn't penalised
+        translator.translate_batch(sources[:1], source_lang, target_lang, "fast")
+
+        outputs = {}
+        pair = f"{source_lang}->{target_lang}"
+        report["pairs"][pair] = {}
+        for profile in args.profiles:
+            outputs[profile], latency = run_profile(translator, sources, source_lang, target_lang, profile)
+            report["pairs"][pair][profile] = {
+                "sentences": len(sources),
+                "latency_ms": latency,
+                "bleu": corpus_bleu(outputs[profile], references),
+                "chrf": corpus_chrf(outputs[profile], references),
+            }
+
+        baseline = outputs.get("quality")
+        for profile in args.profiles:
+            result = report["pairs"][pair][profile]
+            result["agreement_chrf"] = corpus_chrf(outputs[profile], baseline) if baseline else None
+            print(
+                f"{pair:<22}{profile:<10}{result['latency_ms']['p50']:>9.0f}{result['latency_ms']['p95']:>9.0f}"
+                f"{result['bleu']:>7.1f}{result['chrf']:>7.1f}"
+                f"{result['agreement_chrf'] if result['agreement_chrf'] is not None else float('nan'):>7.1f}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
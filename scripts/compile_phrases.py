@@ -0,0 +1,43 @@
+"""
+Compile the phrase corpus
+
+Writes data/common_phrases.json to data/common_phrases.sqlite3 together
+with its normalized lookup keys. The app loads the compiled form instead
+of parsing and normalizing the JSON while it is up to date (it records
+the JSON file's mtime), so large corpora start and reload faster.
+Re-run after editing the JSON; until then the JSON is used directly.
+
+Usage:
+    python -m scripts.compile_phrases
+    python -m scripts.compile_phrases --input data/my_phrases.json
+"""
+
+import argparse
+import time
+
+from backend.phrase_database import PhraseDatabase, compile_corpus, compiled_path
+from config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=settings.PHRASES_FILE)
+    parser.add_argument("--output", default=None, help="compiled file (default: next to the input, .sqlite3)")
+    args = parser.parse_args()
+
+    output = args.output or compiled_path(args.input)
+    start = time.perf_counter()
+    rows = compile_corpus(args.input, output)
+    print(f"[INFO] Compiled {rows} phrase entries to {output} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Compare load times of both forms
+    json_load = PhraseDatabase(args.input, compiled_file=output + ".missing", reload_interval=0).stats()
+    compiled_load = PhraseDatabase(args.input, compiled_file=output, reload_interval=0).stats()
+    print(
+        f"[INFO] Load time: JSON {json_load['load_ms']:.1f} ms, "
+        f"compiled {compiled_load['load_ms']:.1f} ms ({compiled_load['source']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Evaluation corpora shared by the scripts
+"""
+
+import itertools
+
+from backend.phrase_database import get_phrase_database
+from config.languages import SUPPORTED_LANGUAGES
+
+
+def all_language_pairs():
+    """Every ordered (source, target) pair of supported languages"""
+    return list(itertools.permutations(SUPPORTED_LANGUAGES.keys(), 2))
+
+
+def parse_pairs(values):
+    """Parse "source:target" strings; no values means every pair"""
+    if not values:
+        return all_language_pairs()
+    pairs = []
+    for value in values:
+        source_lang, target_lang = value.split(":")
+        pairs.append((source_lang, target_lang))
+    return pairs
+
+
+def load_phrase_pairs(source_lang, target_lang, limit=0):
+    """(source text, curated reference) pairs from the phrase corpus"""
+    phrase_db = get_phrase_database()
+    pairs = []
+    for category in phrase_db.get_categories():
+        for phrase in phrase_db.get_phrases_by_category(category):
+            if phrase.get(source_lang) and phrase.get(target_lang):
+                pairs.append((phrase[source_lang], phrase[target_lang]))
+    return pairs[:limit] if limit else pairs
@@ -0,0 +1,44 @@
+"""
+Download a Whisper model for offline speech recognition
+
+faster-whisper otherwise downloads the model named by ASR_WHISPER_MODEL
+("small", ~480 MB) from the Hugging Face Hub the first time speech is
+transcribed, which fails without network. Run this once at build/deploy
+time and point ASR_WHISPER_MODEL at the directory it prints.
+
+Usage:
+    python -m scripts.fetch_whisper_model
+    python -m scripts.fetch_whisper_model --model base --output models/whisper-base
+"""
+
+import argparse
+import os
+
+from config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help=f"model size or Hub id (default: {settings.ASR_WHISPER_MODEL})")
+    parser.add_argument("--output", default=None, help="directory to save it in (default: models/whisper-<model>)")
+    args = parser.parse_args()
+
+    model = args.model or settings.ASR_WHISPER_MODEL
+    if os.path.isdir(model):
+        print(f"[INFO] {model} is already a local model directory")
+        return
+    output = args.output or os.path.join("models", f"whisper-{model.replace('/', '-')}")
+
+    try:
+        from faster_whisper import download_model
+    except ImportError:
+        print("[ERROR] faster-whisper is not installed (pip install faster-whisper)")
+        return
+
+    print(f"[INFO] Downloading Whisper model '{model}' to {output}...")
+    path = download_model(model, output_dir=output)
+    print(f"[INFO] Done. Use it offline with: ASR_WHISPER_MODEL={path}")
+
+
+if __name__ == "__main__":
+    main()
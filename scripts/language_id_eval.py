@@ -0,0 +1,226 @@
+"""
+Language identification accuracy
+
+Evaluates the character n-gram identifier (backend/language_id.py) that
+the engine uses to confirm or correct the selected source language:
+
+  - held-out: trained on the phrase corpus, tested on the labelled
+    sentences in data/benchmark_corpus.json (texts that also appear in
+    the phrase corpus are skipped)
+  - mixed: the same, on data/language_id_eval.json, everyday clinic,
+    market and travel messages with loanwords, names, lowercase and
+    code-switching
+  - leave-one-out: each phrase record is tested by a model trained on
+    all the others
+
+Reports accuracy, per-language recall, how often a confident detection
+would be wrong, and the mean detection time. Then, with every language
+selected in turn, it applies the engine's correction rule (confidence,
+margin over the selection, length) and counts corrections that fix a
+wrong selection, that replace it with another wrong language, and that
+override a correct selection. The evaluation passes (exit status 0) only
+if no correct selection is ever overridden; keep LANGUAGE_ID_ENABLED off
+until it passes, ideally with a sample of your own traffic as --mixed.
+
+Leave-one-out is the calibration set: --calibrate derives the parameters
+from it alone and evaluates with them. The temperature minimises its log
+loss, the threshold is 1 - --max-error (the confidence is calibrated), and
+the margin is rounded up from the largest by which a wrong language beat
+the right one. The held-out and mixed sets are never fitted on, so their
+results are test results.
+
+Usage:
+    python -m scripts.language_id_eval
+    python -m scripts.language_id_eval --calibrate
+    python -m scripts.language_id_eval --threshold 0.95 --min-margin 0.3 --min-chars 8
+    python -m scripts.language_id_eval --mixed my_messages.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+
+from backend.language_id import CALIBRATION_TEMPERATURE, LanguageIdentifier, assess_scores, samples_from_phrases
+from backend.phrase_database import get_phrase_database
+from backend.text_normalization import normalize_text
+from config import settings
+
+
+def evaluate(cases, threshold, min_chars, temperature=CALIBRATION_TEMPERATURE):
+    """cases: [(identifier, text, language)]"""
+    results = {"total": 0, "correct": 0, "confident": 0, "confident_wrong": 0, "per_language": {}, "detect_us": 0.0}
+    for identifier, text, language in cases:
+        start = time.perf_counter()
+        detected, confidence, _ = identifier.assess(text, temperature=temperature)
+        results["detect_us"] += (time.perf_counter() - start) * 1e6
+
+        per_language = results["per_language"].setdefault(language, {"total": 0, "correct": 0})
+        per_language["total"] += 1
+        results["total"] += 1
+        if detected == language:
+            per_language["correct"] += 1
+            results["correct"] += 1
+        if confidence >= threshold and len(normalize_text(text)) >= min_chars:
+            results["confident"] += 1
+            results["confident_wrong"] += detected != language
+
+    total = results["total"] or 1
+    results["accuracy"] = results["correct"] / total
+    results["detect_us"] /= total
+    return results
+
+
+def evaluate_corrections(cases, threshold, min_chars, min_margin, temperature=CALIBRATION_TEMPERATURE):
+    """Outcome of the engine's correction rule for every case with every language selected"""
+    results = {"fixed": 0, "misdirected": 0, "missed": 0, "overridden": 0, "examples": []}
+    for identifier, text, language in cases:
+        long_enough = len(normalize_text(text)) >= min_chars
+        for selected in identifier.languages:
+            detected, confidence, margin = identifier.assess(text, selected, temperature)
+            fires = (
+                long_enough and detected != selected
+                and confidence >= threshold and margin >= min_margin
+            )
+            if selected == language:
+                if fires:
+                    # The harmful case: the user's correct choice is replaced
+                    results["overridden"] += 1
+                    results["examples"].append(
+                        {"text": text, "language": language, "detected": detected,
+                         "confidence": confidence, "margin": margin}
+                    )
+            elif not fires:
+                results["missed"] += 1
+            elif detected == language:
+                results["fixed"] += 1
+            else:
+                results["misdirected"] += 1
+    return results
+
+
+def calibrate(cases, max_error):
+    """
+    (temperature, threshold, min_margin) for the correction rule, from cases:
+    the temperature that minimises log loss, the threshold at which a
+    calibrated detection is wrong at most max_error of the time, and a margin
+    above the largest by which a wrong language ever beat the right one
+    """
+    # Scores don't depend on the parameters: compute them once
+    scored = [(identifier.per_gram_scores(text), language) for identifier, text, language in cases]
+    scored = [(per_gram, language) for per_gram, language in scored if per_gram]
+
+    def log_loss(temperature):
+        loss = 0.0
+        for per_gram, language in scored:
+            top = max(per_gram.values())
+            total = sum(math.exp(temperature * (score - top)) for score in per_gram.values())
+            loss += math.log(total) - temperature * (per_gram[language] - top)
+        return loss / len(scored)
+
+    temperature = min((2.5 * i for i in range(1, 17)), key=log_loss)
+    worst_margin = max(
+        (max(per_gram.values()) - per_gram[language] for per_gram, language in scored),
+        default=0.0
+    )
+    # Rounded up to the next 0.05
+    min_margin = math.floor(worst_margin * 20 + 1) / 20
+    return temperature, round(1.0 - max_error, 2), round(min_margin, 2)
+
+
+def report(name, results):
+    print(
+        f"{name:<15}{results['total']:>6} texts  accuracy {results['accuracy'] * 100:5.1f}%  "
+        f"confident {results['confident']:>4} ({results['confident_wrong']} wrong)  "
+        f"{results['detect_us']:.0f} us/detect"
+    )
+    for language, counts in sorted(results["per_language"].items()):
+        print(f"    {language:<11}{counts['correct']:>4}/{counts['total']:<4}")
+    corrections = results["corrections"]
+    print(
+        f"    wrong selection: fixed {corrections['fixed']}, misdirected {corrections['misdirected']}, "
+        f"left {corrections['missed']}; right selection overridden {corrections['overridden']}"
+    )
+    for example in corrections["examples"]:
+        print(
+            f"    [!] {example['language']} -> {example['detected']} "
+            f"({example['confidence']:.3f}, margin {example['margin']:.2f}): {example['text']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="data/benchmark_corpus.json", help="labelled test set {language: [texts]}")
+    parser.add_argument("--mixed", default="data/language_id_eval.json", help="realistic labelled messages {language: [texts]}")
+    parser.add_argument("--threshold", type=float, default=settings.LANGUAGE_ID_THRESHOLD)
+    parser.add_argument("--min-margin", type=float, default=settings.LANGUAGE_ID_MIN_MARGIN)
+    parser.add_argument("--min-chars", type=int, default=settings.LANGUAGE_ID_MIN_CHARS)
+    parser.add_argument("--calibrate", action="store_true", help="fit temperature, threshold and margin on leave-one-out")
+    parser.add_argument("--max-error", type=float, default=0.1, help="with --calibrate: accepted error rate of a confident detection")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    phrases = get_phrase_database().snapshot.phrases
+    identifier = LanguageIdentifier(samples_from_phrases(phrases))
+    known = {
+        normalize_text(text)
+        for records in phrases.values() for phrase in records for text in phrase.values()
+        if isinstance(text, str)
+    }
+
+    def held_out(path):
+        with open(path, "r", encoding="utf-8") as f:
+            labelled = json.load(f)
+        return [
+            (identifier, text, language)
+            for language, texts in labelled.items() for text in texts
+            if normalize_text(text) not in known
+        ]
+
+    leave_one_out = []
+    for records in phrases.values():
+        for phrase in records:
+            loo_identifier = LanguageIdentifier(samples_from_phrases(phrases, exclude=phrase))
+            for language, text in phrase.items():
+                if isinstance(text, str) and text.strip():
+                    leave_one_out.append((loo_identifier, text, language))
+
+    temperature = CALIBRATION_TEMPERATURE
+    if args.calibrate:
+        temperature, args.threshold, args.min_margin = calibrate(leave_one_out, args.max_error)
+        print(
+            f"[INFO] Fitted on leave-one-out: temperature {temperature}, "
+            f"threshold {args.threshold}, min margin {args.min_margin}"
+        )
+
+    results = {
+        "temperature": temperature, "threshold": args.threshold,
+        "min_margin": args.min_margin, "min_chars": args.min_chars
+    }
+    # Calibration set first; the other two are test data
+    sets = (("leave-one-out", leave_one_out), ("held-out", held_out(args.corpus)), ("mixed", held_out(args.mixed)))
+    for name, cases in sets:
+        result = evaluate(cases, args.threshold, args.min_chars, temperature)
+        result["corrections"] = evaluate_corrections(
+            cases, args.threshold, args.min_chars, args.min_margin, temperature
+        )
+        results[name.replace("-", "_")] = result
+        report(name, result)
+
+    overridden = sum(results[name.replace("-", "_")]["corrections"]["overridden"] for name, _ in sets)
+    results["passed"] = overridden == 0
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[INFO] Results written to {args.output}")
+
+    if overridden:
+        print(f"[FAIL] {overridden} correct selections would be overridden; keep LANGUAGE_ID_ENABLED off")
+        sys.exit(1)
+    print("[PASS] No correct selection would be overridden")
+
+
+if __name__ == "__main__":
+    main()
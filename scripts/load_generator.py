@@ -0,0 +1,245 @@
+"""
+Load generator for admission control
+
+Drives TranslationEngine (in process, with the simulated or the real
+model) or a running api_server through phases of increasing and falling
+concurrency, and prints one line per second: concurrency, completed
+requests, p95 latency, how requests were served (normal, reduced beams,
+lookup-only, approximate, rejected) and the admission tier. A share of
+the texts repeats a warmed-up set, so the approximate tier has cached
+answers to give; the rest are new to the model.
+
+The default phases (calm, overload, calm) should show the tier stepping
+up under load and back down to normal once it drops.
+
+Usage:
+    python -m scripts.load_generator --mock
+    python -m scripts.load_generator --mock --phases 2:5,24:20,2:20 --slo-ms 300
+    python -m scripts.load_generator --url http://127.0.0.1:8000
+"""
+
+import threading
+import argparse
+import logging
+import random
+import json
+import time
+
+import requests
+
+from backend.admission import Overloaded
+from config import settings
+
+# How each request was served; "lookup" is an exact phrase/cache answer in the approximate tier
+OUTCOMES = ("normal", "reduced", "lookup", "approximate", "rejected", "errors")
+
+
+def parse_phases(value):
+    """"4:10,32:20" -> [(4 workers, 10 seconds), (32, 20)]"""
+    phases = []
+    for part in value.split(","):
+        workers, seconds = part.split(":")
+        phases.append((int(workers), float(seconds)))
+    return phases
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class EngineClient:
+    """Calls an in-process TranslationEngine"""
+
+    def __init__(self, args):
+        # Settings are read when the engine is built
+        settings.CACHE_DB_PATH = None
+        settings.BACKGROUND_LOAD = False
+        settings.ADMISSION_ENABLED = True
+        if args.slo_ms:
+            settings.ADMISSION_SLO_MS = args.slo_ms
+        if args.max_in_flight:
+            settings.ADMISSION_MAX_IN_FLIGHT = args.max_in_flight
+
+        from backend.translation_engine import TranslationEngine
+        if args.mock:
+            from scripts.mock_translator import MockTranslator
+            # One simulated device, so concurrent requests queue as they would on the model
+            self.engine = TranslationEngine(nllb=MockTranslator(load_seconds=0, slots=1))
+        else:
+            from backend.nllb_service import NLLBTranslator
+            self.engine = TranslationEngine(nllb=NLLBTranslator())
+
+    def translate(self, text, source_lang, target_lang):
+        """(tier, approximate), or raises Overloaded"""
+        result = self.engine.translate_detailed(text, source_lang, target_lang)
+        return result["tier"], result["approximate"]
+
+    def admission(self):
+        return self.engine.admission.stats()
+
+
+class HttpClient:
+    """Calls a running api_server"""
+
+    def __init__(self, args):
+        self.url = args.url.rstrip("/")
+        self.session = requests.Session()
+
+    def translate(self, text, source_lang, target_lang):
+        response = self.session.post(
+            f"{self.url}/translate",
+            json={"text": text, "source": source_lang, "target": target_lang},
+            timeout=60
+        )
+        if response.status_code in (429, 503):
+            raise Overloaded(response.text)
+        response.raise_for_status()
+        result = response.json()
+        return result["tier"], result["approximate"]
+
+    def admission(self):
+        try:
+            return self.session.get(f"{self.url}/stats", timeout=5).json().get("admission", {})
+        except (requests.RequestException, ValueError):
+            return {}
+
+
+class LoadRun:
+    def __init__(self, client, texts, warm_texts, repeat_ratio, source_lang, target_lang, seed):
+        self.client = client
+        self.texts = texts
+        self.warm_texts = warm_texts
+        self.repeat_ratio = repeat_ratio
+        self.source_lang = source_lang
+        self.target_lang = target_lang
+        self.rng = random.Random(seed)
+        self.active = 0
+        self.stopped = False
+        self._serial = 0
+        self._lock = threading.Lock()
+        self._latencies = []
+        self._outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.totals = dict.fromkeys(OUTCOMES, 0)
+
+    def _next_text(self):
+        with self._lock:
+            if self.rng.random() < self.repeat_ratio:
+                return self.rng.choice(self.warm_texts)
+            # A numbered variant, so the model can't be skipped
+            self._serial += 1
+            return f"{self.rng.choice(self.texts)} {self._serial}"
+
+    def worker(self, index):
+        while not self.stopped:
+            if index >= self.active:
+                time.sleep(0.05)
+                continue
+            start = time.perf_counter()
+            try:
+                tier, approximate = self.client.translate(self._next_text(), self.source_lang, self.target_lang)
+                if approximate:
+                    outcome = "approximate"
+                else:
+                    outcome = "lookup" if tier == "approximate" else tier
+            except Overloaded:
+                outcome = "rejected"
+            except Exception:
+                outcome = "errors"
+            latency = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._outcomes[outcome] += 1
+                self.totals[outcome] += 1
+                if outcome not in ("rejected", "errors"):
+                    self._latencies.append(latency)
+
+    def take_interval(self):
+        """Outcomes and latencies since the last call"""
+        with self._lock:
+            outcomes, self._outcomes = self._outcomes, dict.fromkeys(OUTCOMES, 0)
+            latencies, self._latencies = self._latencies, []
+        return outcomes, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mock", action="store_true", help="use a simulated model instead of real weights")
+    parser.add_argument("--url", help="load a running api_server instead of an in-process engine")
+    parser.add_argument("--phases", default="2:10,24:20,2:20", help="workers:seconds for each phase")
+    parser.add_argument("--slo-ms", type=float, help="latency SLO (in-process; default 300 with --mock, else settings)")
+    parser.add_argument("--max-in-flight", type=int, help="in-flight limit (in-process; default settings)")
+    parser.add_argument("--repeat-ratio", type=float, default=0.5, help="share of requests for warmed-up texts")
+    parser.add_argument("--corpus", default="data/benchmark_corpus.json")
+    parser.add_argument("--pair", default="english:swahili", help="source:target")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the per-second timeline as JSON to this path")
+    args = parser.parse_args()
+    # Tier transitions are logged between the timeline lines
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), format="[%(levelname)s] %(name)s: %(message)s")
+
+    if args.mock and not args.slo_ms:
+        # The simulated model answers in tens of milliseconds
+        args.slo_ms = 300
+    source_lang, target_lang = args.pair.split(":")
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        texts = json.load(f)[source_lang]
+
+    client = HttpClient(args) if args.url else EngineClient(args)
+    warm_texts = texts[:max(1, len(texts) // 2)]
+    print(f"[INFO] Warming {len(warm_texts)} texts...")
+    for text in warm_texts:
+        try:
+            client.translate(text, source_lang, target_lang)
+        except Overloaded:
+            pass
+
+    phases = parse_phases(args.phases)
+    run = LoadRun(client, texts, warm_texts, args.repeat_ratio, source_lang, target_lang, args.seed)
+    threads = [
+        threading.Thread(target=run.worker, args=(i,), daemon=True)
+        for i in range(max(workers for workers, _ in phases))
+    ]
+    for thread in threads:
+        thread.start()
+
+    print(f"{'t':>4} {'workers':>7} {'done':>5} {'p95 ms':>8}  " + " ".join(f"{name:>11}" for name in OUTCOMES) + "  tier")
+    timeline = []
+    elapsed = 0
+    for workers, seconds in phases:
+        run.active = workers
+        phase_end = elapsed + seconds
+        while elapsed < phase_end:
+            time.sleep(1)
+            elapsed += 1
+            outcomes, latencies = run.take_interval()
+            tier = client.admission().get("tier", "?")
+            p95 = percentile(latencies, 95)
+            timeline.append({"t": elapsed, "workers": workers, "p95_ms": p95, "tier": tier, **outcomes})
+            print(
+                f"{elapsed:>4} {workers:>7} {sum(outcomes.values()):>5} "
+                f"{p95 if p95 is not None else float('nan'):>8.0f}  "
+                + " ".join(f"{outcomes[name]:>11}" for name in OUTCOMES) + f"  {tier}"
+            )
+    run.stopped = True
+    for thread in threads:
+        thread.join()
+
+    admission = client.admission()
+    print(f"[INFO] Totals: {run.totals}")
+    print(
+        f"[INFO] Escalations {admission.get('escalations')}, recoveries {admission.get('recoveries')}, "
+        f"final tier {admission.get('tier')}"
+    )
+    if admission.get("tier") not in (None, "normal"):
+        print("[WARN] Still degraded at the end; lengthen the last phase or lower ADMISSION_RECOVERY_SECONDS")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"phases": phases, "timeline": timeline, "totals": run.totals, "admission": admission}, f, indent=2)
+        print(f"[INFO] Timeline written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
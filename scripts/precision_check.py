@@ -0,0 +1,87 @@
+"""
+Reduced-precision quality check
+
+Runs the same sentences through the fp32 model and a reduced-precision
+model and reports BLEU/chrF drift (fp32 output as reference) and speedup
+per language pair.
+
+Usage:
+    python -m scripts.precision_check --precision int8
+    python -m scripts.precision_check --precision bf16 --pairs english:swahili english:luo
+"""
+
+import argparse
+import json
+import time
+
+from backend.nllb_service import NLLBTranslator
+from config import settings
+from scripts.corpora import load_phrase_pairs, parse_pairs
+from scripts.quality_metrics import corpus_bleu, corpus_chrf
+
+
+def timed_translations(translator, sentences, source_lang, target_lang):
+    start = time.perf_counter()
+    outputs = [translator.translate_batch([s], source_lang, target_lang)[0] for s in sentences]
+    return outputs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--precision", choices=["int8", "bf16"], default="int8")
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--pairs", nargs="*", help="source:target pairs (default: all)")
+    parser.add_argument("--limit", type=int, default=0, help="sentences per pair (0 = all)")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args()
+
+    # Load in the foreground, so the precision read below is the one in use
+    settings.BACKGROUND_LOAD = False
+    baseline = NLLBTranslator(args.model_dir, precision="fp32")
+    reduced = NLLBTranslator(args.model_dir, precision=args.precision)
+    if reduced.precision != args.precision:
+        print(f"[WARNING] {args.precision} could not be enabled; comparing fp32 with itself")
+
+    report = {"precision": reduced.precision, "pairs": {}}
+    print(f"{'pair':<22}{'n':>4}{'BLEU':>8}{'chrF':>8}{'fp32 s':>10}{reduced.precision + ' s':>10}{'speedup':>9}")
+
+    for source_lang, target_lang in parse_pairs(args.pairs):
+        sentences = [source for source, _ in load_phrase_pairs(source_lang, target_lang, args.limit)]
+        if not sentences:
+            continue
+
+        # Warm both models on this pair so one-off setup doesn't skew timings
+        baseline.translate_batch(sentences[:1], source_lang, target_lang)
+        reduced.translate_batch(sentences[:1], source_lang, target_lang)
+
+        references, fp32_time = timed_translations(baseline, sentences, source_lang, target_lang)
+        hypotheses, reduced_time = timed_translations(reduced, sentences, source_lang, target_lang)
+
+        result = {
+            "sentences": len(sentences),
+            "bleu": corpus_bleu(hypotheses, references),
+            "chrf": corpus_chrf(hypotheses, references),
+            "fp32_seconds": fp32_time,
+            "reduced_seconds": reduced_time,
+            "speedup": fp32_time / reduced_time if reduced_time else None,
+        }
+        pair = f"{source_lang}->{target_lang}"
+        report["pairs"][pair] = result
+        print(
+            f"{pair:<22}{result['sentences']:>4}{result['bleu']:>8.1f}{result['chrf']:>8.1f}"
+            f"{fp32_time:>10.2f}{reduced_time:>10.2f}{result['speedup'] or 0:>8.2f}x"
+        )
+
+    report["memory"] = {
+        "fp32": baseline.registry.stats(),
+        reduced.precision: reduced.registry.stats(),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Pre-render quick-phrase audio
+
+Synthesizes every phrase in data/common_phrases.json in every language
+into the on-disk audio cache, so "🔊 Listen" on those phrases plays
+instantly (and offline). Run at build/deploy time.
+
+Usage:
+    python -m scripts.prerender_phrases
+    python -m scripts.prerender_phrases --backends espeak
+"""
+
+import argparse
+import time
+
+from backend.phrase_database import get_phrase_database
+from backend.speech_synthesis import get_speech_synthesizer
+from config import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default=None, help=f"comma-separated TTS backends (default: {settings.TTS_BACKENDS})")
+    parser.add_argument("--force", action="store_true", help="re-render clips that are already cached")
+    args = parser.parse_args()
+
+    if args.backends:
+        settings.TTS_BACKENDS = args.backends
+    synthesizer = get_speech_synthesizer()
+    if not synthesizer.backends:
+        print("[ERROR] No TTS backend is available")
+        return
+
+    phrase_db = get_phrase_database()
+    rendered = skipped = failed = 0
+    start = time.perf_counter()
+
+    for category in phrase_db.get_categories():
+        for phrase in phrase_db.get_phrases_by_category(category):
+            for language, text in phrase.items():
+                if not text:
+                    continue
+                if not args.force and synthesizer.is_cached(text, language):
+                    skipped += 1
+                    continue
+                try:
+                    if synthesizer.synthesize(text, language) is not None:
+                        rendered += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"[WARNING] Could not render '{text}' ({language}): {e}")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"[INFO] Rendered {rendered} clips, {skipped} already cached, {failed} failed "
+        f"in {elapsed:.1f}s -> {settings.AUDIO_CACHE_DIR}"
+    )
+
+
+if __name__ == "__main__":
+    main()
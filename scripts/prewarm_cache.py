@@ -0,0 +1,69 @@
+"""
+Prewarm the translation cache
+
+Loads known translations (e.g. reviewed translations of frequent
+messages, or an export from another deployment) into the SQLite
+translation cache, so the app answers them without the model from the
+first request. The input is JSONL, one record per line:
+
+    {"text": "Where is the clinic?", "source": "english", "target": "swahili",
+     "translation": "Kliniki iko wapi?", "variant": "quality"}
+
+variant is the decoding profile the translation stands for (fast,
+balanced or quality); records without one use --profile. Entries are
+stored under the namespace of the model and precision given, the same
+one the engine reads with those settings. Lines that are not valid
+records are skipped.
+
+Usage:
+    python -m scripts.prewarm_cache translations.jsonl
+    python -m scripts.prewarm_cache translations.jsonl --profile fast --precision int8
+"""
+
+import argparse
+import sys
+import time
+
+from backend.model_registry import get_model_registry
+from backend.translation_cache import TranslationCache
+from backend.translation_engine import cache_namespace
+from config import settings
+from config.decoding import DECODING_PROFILES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of translations")
+    parser.add_argument("--profile", default=settings.DECODING_PROFILE, help="variant of records without one (default: settings.DECODING_PROFILE)")
+    parser.add_argument("--model-dir", default=None, help=f"model the translations are cached for (default: {settings.NLLB_MODEL_DIR})")
+    parser.add_argument("--precision", default=None, help=f"precision the translations are cached for (default: {settings.NLLB_PRECISION})")
+    args = parser.parse_args()
+
+    if not settings.CACHE_ENABLED or not settings.CACHE_DB_PATH:
+        print("[ERROR] The translation cache is disabled or has no database file")
+        sys.exit(1)
+    if args.profile not in DECODING_PROFILES:
+        # auto picks a profile per text when translating; records need a concrete one
+        print(f"[ERROR] --profile must be one of {', '.join(DECODING_PROFILES)}, not '{args.profile}'")
+        sys.exit(1)
+
+    # Only resolves the model directory and precision; nothing is loaded
+    registry = get_model_registry(args.model_dir, args.precision)
+    cache = TranslationCache(
+        settings.CACHE_DB_PATH,
+        namespace=cache_namespace(registry.model_dir, registry.requested_precision),
+        max_memory_entries=settings.CACHE_MEMORY_ENTRIES,
+        max_disk_entries=settings.CACHE_DISK_ENTRIES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS
+    )
+
+    start = time.perf_counter()
+    loaded = cache.prewarm(args.input, args.profile)
+    print(
+        f"[INFO] Loaded {loaded} translations in {time.perf_counter() - start:.1f}s "
+        f"-> {settings.CACHE_DB_PATH} ({registry.requested_precision})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Corpus-level BLEU and chrF
+Small self-contained implementations for comparing two systems' outputs
+"""
+
+from collections import Counter
+import math
+
+
+def _word_ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def _char_ngrams(text, n):
+    text = text.replace(" ", "")
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def corpus_bleu(hypotheses, references, max_order=4):
+    """BLEU (0-100) of hypotheses against one reference each, with add-one smoothing"""
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hyp_len = ref_len = 0
+
+    for hyp, ref in zip(hypotheses, references):
+        hyp_tokens = hyp.split()
+        ref_tokens = ref.split()
+        hyp_len += len(hyp_tokens)
+        ref_len += len(ref_tokens)
+        for n in range(1, max_order + 1):
+            hyp_ngrams = _word_ngrams(hyp_tokens, n)
+            ref_ngrams = _word_ngrams(ref_tokens, n)
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(0, len(hyp_tokens) - n + 1)
+
+    if hyp_len == 0:
+        return 0.0
+
+    log_precision = 0.0
+    for n in range(max_order):
+        if n == 0:
+            if matches[0] == 0:
+                return 0.0
+            log_precision += math.log(matches[0] / totals[0])
+        else:
+            log_precision += math.log((matches[n] + 1) / (totals[n] + 1))
+
+    brevity = 1.0 if hyp_len > ref_len else math.exp(1 - ref_len / hyp_len)
+    return 100 * brevity * math.exp(log_precision / max_order)
+
+
+def corpus_chrf(hypotheses, references, max_order=6, beta=2):
+    """chrF (0-100) averaged over character n-gram orders 1..max_order"""
+    matches = [0] * max_order
+    hyp_totals = [0] * max_order
+    ref_totals = [0] * max_order
+
+    for hyp, ref in zip(hypotheses, references):
+        for n in range(1, max_order + 1):
+            hyp_ngrams = _char_ngrams(hyp, n)
+            ref_ngrams = _char_ngrams(ref, n)
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            hyp_totals[n - 1] += sum(hyp_ngrams.values())
+            ref_totals[n - 1] += sum(ref_ngrams.values())
+
+    precisions = [m / t for m, t in zip(matches, hyp_totals) if t]
+    recalls = [m / t for m, t in zip(matches, ref_totals) if t]
+    if not precisions or not recalls:
+        return 0.0
+    precision = sum(precisions) / len(precisions)
+    recall = sum(recalls) / len(recalls)
+    if precision + recall == 0:
+        return 0.0
+    beta_sq = beta ** 2
+    return 100 * (1 + beta_sq) * precision * recall / (beta_sq * precision + recall)
@@ -0,0 +1,154 @@
+"""
+Tokenization concurrency stress test
+
+Hammers one shared TokenizationLayer from many threads with a random mix
+of texts and source languages (single encodes, batches and decodes) and
+checks every result against a reference computed single-threaded with a
+separate tokenizer per language (the tokenizer's own src_lang handling).
+Exits non-zero on any mismatch or error.
+
+--racy runs the same load through the old approach (setting src_lang on
+one shared tokenizer before each call) to show the mismatches it causes.
+
+Needs only the tokenizer files from the model directory, not the weights.
+
+Usage:
+    python -m scripts.tokenization_stress
+    python -m scripts.tokenization_stress --threads 16 --iterations 2000
+    python -m scripts.tokenization_stress --racy
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import random
+import json
+import sys
+import time
+
+from transformers import AutoTokenizer
+
+from backend.phrase_database import get_phrase_database
+from backend.tokenization import TokenizationLayer
+from config.languages import SUPPORTED_LANGUAGES
+from config.decoding import MAX_LENGTH
+from config import settings
+
+
+def load_texts(corpus_path):
+    texts = set()
+    for records in get_phrase_database().snapshot.phrases.values():
+        for phrase in records:
+            texts.update(text for text in phrase.values() if isinstance(text, str) and text.strip())
+    with open(corpus_path, "r", encoding="utf-8") as f:
+        for sentences in json.load(f).values():
+            texts.update(sentences)
+    return sorted(texts)
+
+
+def reference_encodings(model_dir, texts):
+    """{(text, language): input IDs} from one tokenizer per language, set up front"""
+    expected = {}
+    for language, info in SUPPORTED_LANGUAGES.items():
+        tokenizer = AutoTokenizer.from_pretrained(model_dir, local_files_only=True, src_lang=info["code"])
+        for text in texts:
+            expected[(text, language)] = tokenizer(text, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+    return expected
+
+
+def run_layer(layer, jobs, expected):
+    """One worker's share of the load; returns a list of mismatch descriptions"""
+    errors = []
+    for kind, language, batch in jobs:
+        if kind == "encode":
+            got = [layer.encode(batch[0], language)]
+        else:
+            inputs = layer.encode_batch(batch, language)
+            got = [
+                [token for token, keep in zip(ids, mask) if keep]
+                for ids, mask in zip(inputs["input_ids"].tolist(), inputs["attention_mask"].tolist())
+            ]
+            if kind == "roundtrip":
+                decoded = layer.decode_batch(inputs["input_ids"])
+                reference = layer.tokenizer.batch_decode(
+                    [expected[(text, language)] for text in batch], skip_special_tokens=True
+                )
+                if decoded != reference:
+                    errors.append(f"decode mismatch for {language}: {decoded!r} != {reference!r}")
+        for text, ids in zip(batch, got):
+            if list(ids) != expected[(text, language)]:
+                errors.append(f"encode mismatch for {language}: {text!r}")
+    return errors
+
+
+def run_racy(tokenizer, jobs, expected):
+    errors = []
+    for _, language, batch in jobs:
+        for text in batch:
+            tokenizer.src_lang = SUPPORTED_LANGUAGES[language]["code"]
+            ids = tokenizer(text, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+            if ids != expected[(text, language)]:
+                errors.append(f"encode mismatch for {language}: {text!r}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=settings.NLLB_MODEL_DIR)
+    parser.add_argument("--corpus", default="data/benchmark_corpus.json")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=500, help="jobs per thread")
+    parser.add_argument("--cache-size", type=int, default=64, help="small, so evictions happen under load")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--racy", action="store_true", help="use the old shared src_lang mutation instead")
+    args = parser.parse_args()
+
+    texts = load_texts(args.corpus)
+    expected = reference_encodings(args.model_dir, texts)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_dir, local_files_only=True)
+    layer = TokenizationLayer(tokenizer, cache_size=args.cache_size)
+
+    rng = random.Random(args.seed)
+    languages = list(SUPPORTED_LANGUAGES)
+    workloads = [
+        [
+            (
+                rng.choice(("encode", "batch", "roundtrip")),
+                rng.choice(languages),
+                rng.sample(texts, rng.randint(1, 8)),
+            )
+            for _ in range(args.iterations)
+        ]
+        for _ in range(args.threads)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        if args.racy:
+            futures = [executor.submit(run_racy, tokenizer, jobs, expected) for jobs in workloads]
+        else:
+            futures = [executor.submit(run_layer, layer, jobs, expected) for jobs in workloads]
+        errors = []
+        for future in futures:
+            try:
+                errors.extend(future.result())
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    elapsed = time.perf_counter() - start
+
+    jobs = args.threads * args.iterations
+    print(
+        f"[INFO] {jobs} jobs on {args.threads} threads over {len(texts)} texts x {len(languages)} languages "
+        f"in {elapsed:.2f}s ({'racy shared src_lang' if args.racy else 'TokenizationLayer'})"
+    )
+    if not args.racy:
+        print(f"[INFO] Encode cache: {layer.stats()}")
+    for error in errors[:10]:
+        print(f"[ERROR] {error}")
+    if errors:
+        print(f"[ERROR] {len(errors)} mismatches")
+        sys.exit(1)
+    print("[INFO] All outputs match the single-threaded reference")
+
+
+if __name__ == "__main__":
+    main()
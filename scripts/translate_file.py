@@ -0,0 +1,274 @@
+"""
+Bulk file translation
+
+Translates a TXT (one text per line), CSV or JSONL file through
+TranslationEngine.translate_batch: phrase-database and cache hits skip
+the model, the rest is translated in batches, and output is written as
+each batch finishes.
+
+With --output, progress is checkpointed to <output>.checkpoint after
+every batch; running the same command again after an interruption
+resumes where it stopped instead of re-translating. The checkpoint is
+removed once the job completes.
+
+A row the model fails to translate stops the job (exit status 1) with
+the checkpoint just before it, so running again retries from that row.
+With --skip-failed such rows are left empty instead, the job goes on,
+and the failed row numbers are listed at the end (exit status 1).
+
+Usage:
+    python -m scripts.translate_file faq.txt --source english --target swahili --output faq.sw.txt
+    python -m scripts.translate_file sms.csv --column body --source english --target luo --output sms.luo.csv
+    cat lines.jsonl | python -m scripts.translate_file - --format jsonl --source swahili --target english
+"""
+
+import argparse
+import json
+import csv
+import sys
+import os
+import time
+
+from config import settings
+
+FORMATS = ("txt", "csv", "jsonl")
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in FORMATS:
+        return extension
+    if extension == "ndjson":
+        return "jsonl"
+    return "txt"
+
+
+def read_rows(stream, fmt, column):
+    """Yield (record, text) for every input row"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None or column not in reader.fieldnames:
+            raise ValueError(f"CSV input has no '{column}' column")
+        for record in reader:
+            yield record, record[column] or ""
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or column not in record:
+                raise ValueError(f"JSONL line {line_number} has no '{column}' field")
+            yield record, str(record[column] or "")
+    else:
+        for line in stream:
+            text = line.rstrip("\r\n")
+            yield text, text
+
+
+class RowWriter:
+    """Write translated rows in the input format"""
+
+    def __init__(self, stream, fmt, output_column, write_header):
+        self.stream = stream
+        self.fmt = fmt
+        self.output_column = output_column
+        self.write_header = write_header
+        self._csv = None
+
+    def write(self, record, translation):
+        if self.fmt == "csv":
+            if self._csv is None:
+                fieldnames = list(record)
+                if self.output_column not in fieldnames:
+                    fieldnames.append(self.output_column)
+                self._csv = csv.DictWriter(self.stream, fieldnames=fieldnames)
+                if self.write_header:
+                    self._csv.writeheader()
+            self._csv.writerow({**record, self.output_column: translation})
+        elif self.fmt == "jsonl":
+            self.stream.write(json.dumps({**record, self.output_column: translation}, ensure_ascii=False) + "\n")
+        else:
+            self.stream.write(translation + "\n")
+
+
+def load_checkpoint(path, job):
+    """Rows already done and output size for job, or None to start over"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("job") != job:
+        raise ValueError(
+            f"{path} belongs to a different job ({checkpoint.get('job')}); "
+            "use --overwrite to start over"
+        )
+    return checkpoint
+
+
+def save_checkpoint(path, job, rows_done, output_bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"job": job, "rows_done": rows_done, "output_bytes": output_bytes}, f)
+    os.replace(tmp_path, path)
+
+
+def build_engine(args):
+    from backend.translation_engine import TranslationEngine
+    # A batch job waits for the model anyway, and is the engine's only
+    # client: there is no interactive latency for admission control to protect
+    settings.BACKGROUND_LOAD = False
+    settings.ADMISSION_ENABLED = False
+    if args.mock:
+        from scripts.mock_translator import MockTranslator
+        return TranslationEngine(nllb=MockTranslator())
+
+    from backend.nllb_service import NLLBTranslator
+    return TranslationEngine(nllb=NLLBTranslator(args.model_dir, args.precision))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("--source", required=True, help="source language, e.g. english")
+    parser.add_argument("--target", required=True, help="target language, e.g. swahili")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="input format (default: from the file extension)")
+    parser.add_argument("--column", default="text", help="CSV column / JSONL field to translate")
+    parser.add_argument("--output-column", default="translation", help="CSV column / JSONL field for the translation")
+    parser.add_argument("--output", help="output file (default: stdout, without checkpointing)")
+    parser.add_argument("--profile", default=None, help="decoding profile (default: settings.DECODING_PROFILE)")
+    parser.add_argument("--batch-size", type=int, default=32, help="rows per batch and per checkpoint")
+    parser.add_argument("--overwrite", action="store_true", help="ignore an existing checkpoint and start over")
+    parser.add_argument(
+        "--skip-failed", action="store_true",
+        help="leave rows the model fails on empty and go on (default: stop at the first one)"
+    )
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--precision", default=None)
+    parser.add_argument("--mock", action="store_true", help="use a simulated model instead of real weights")
+    args = parser.parse_args()
+
+    # stdin has no extension to go by; the output file may
+    fmt = detect_format(args.output or "" if args.input == "-" else args.input, args.format)
+    job = {
+        "input": os.path.abspath(args.input) if args.input != "-" else "-",
+        "format": fmt,
+        "column": args.column,
+        "source": args.source,
+        "target": args.target,
+        "profile": args.profile or settings.DECODING_PROFILE,
+    }
+
+    # Resume from the checkpoint of an interrupted run of the same job
+    checkpoint = None
+    checkpoint_path = None
+    if args.output:
+        checkpoint_path = args.output + ".checkpoint"
+        if args.overwrite and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        checkpoint = load_checkpoint(checkpoint_path, job)
+        if checkpoint and args.input == "-":
+            print("[WARNING] Resuming from stdin: the same input must be piped in again", file=sys.stderr)
+    rows_done = checkpoint["rows_done"] if checkpoint else 0
+
+    if args.output:
+        output = open(args.output, "a+" if checkpoint else "w", encoding="utf-8", newline="")
+        if checkpoint:
+            # Drop rows written after the last checkpoint; they are translated again
+            output.truncate(checkpoint["output_bytes"])
+            output.seek(0, os.SEEK_END)
+    else:
+        output = sys.stdout
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+
+    engine = build_engine(args)
+    from backend.translation_engine import UNAVAILABLE_MESSAGE, BUSY_MESSAGE
+    writer = RowWriter(output, fmt, args.output_column, write_header=rows_done == 0)
+    batch_size = max(1, args.batch_size)
+    translated = skipped = 0
+    failed_rows = []  # 1-based row numbers left empty with --skip-failed
+    start = time.perf_counter()
+
+    def flush(batch):
+        """Write a batch; returns the rows done, fewer than the batch if one failed"""
+        translations = engine.translate_batch(
+            [text for _, text in batch], args.source, args.target, args.profile
+        )
+        done = 0
+        for (record, _), translation in zip(batch, translations):
+            if translation in (UNAVAILABLE_MESSAGE, BUSY_MESSAGE):
+                if not args.skip_failed:
+                    break
+                failed_rows.append(skipped + translated + done + 1)
+                translation = ""
+            writer.write(record, translation)
+            done += 1
+        output.flush()
+        if checkpoint_path:
+            # A failed row is not done: the next run starts from it
+            save_checkpoint(checkpoint_path, job, skipped + translated + done, output.tell())
+        return done
+
+    try:
+        batch = []
+        for record, text in read_rows(source, fmt, args.column):
+            if skipped < rows_done:
+                skipped += 1
+                continue
+            batch.append((record, text))
+            if len(batch) >= batch_size:
+                done = flush(batch)
+                translated += done
+                if done < len(batch):
+                    break
+                batch = []
+        else:
+            if batch:
+                done = flush(batch)
+                translated += done
+    except KeyboardInterrupt:
+        print(f"\n[INFO] Interrupted after {skipped + translated} rows; run again to resume", file=sys.stderr)
+        sys.exit(130)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if batch and done < len(batch):
+        row = skipped + translated + 1
+        print(
+            f"[ERROR] Row {row} could not be translated (see the log); "
+            + ("run again to retry from it" if checkpoint_path else "nothing after it was written")
+            + ", or pass --skip-failed to leave failed rows empty",
+            file=sys.stderr
+        )
+        sys.exit(1)
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.perf_counter() - start
+    counters = engine.get_stats()["pipeline"]
+    print(
+        f"[INFO] Translated {translated} rows in {elapsed:.1f}s "
+        f"({translated / elapsed if elapsed else 0:.1f} rows/s)"
+        + (f", resumed after {skipped} rows" if skipped else ""),
+        file=sys.stderr
+    )
+    print(
+        f"[INFO] Phrase hits {counters['phrase_hits']}, cache hits {counters['cache_hits']}, "
+        f"fuzzy hits {counters['fuzzy_hits']}, model {counters['model_translations']}, "
+        f"failed {counters['failures']}",
+        file=sys.stderr
+    )
+    if failed_rows:
+        shown = ", ".join(str(row) for row in failed_rows[:50])
+        more = f" and {len(failed_rows) - 50} more" if len(failed_rows) > 50 else ""
+        print(f"[ERROR] {len(failed_rows)} rows failed and were left empty: {shown}{more}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Fixtures shared by the tests"""
+
+import pytest
+
+from config import settings
+
+
+@pytest.fixture
+def make_engine(monkeypatch):
+    """
+    Build a TranslationEngine on the simulated model, without the cache
+    database or a background load; keyword arguments override settings
+    """
+    def make(**overrides):
+        monkeypatch.setattr(settings, "CACHE_DB_PATH", None)
+        monkeypatch.setattr(settings, "BACKGROUND_LOAD", False)
+        for name, value in overrides.items():
+            monkeypatch.setattr(settings, name, value)
+
+        from backend.translation_engine import TranslationEngine
+        from scripts.mock_translator import MockTranslator
+        return TranslationEngine(nllb=MockTranslator(load_seconds=0))
+
+    return make
@@ -0,0 +1,70 @@
+"""Admission tiers in the engine's batch and multi-target paths (simulated model)"""
+
+import pytest
+
+from backend.admission import AdmissionController, REDUCED, APPROXIMATE, REJECT
+from config import settings
+
+
+@pytest.fixture
+def engine(make_engine):
+    engine = make_engine(LANGUAGE_ID_ENABLED=False)
+    # Never recovers during a test, so a tier set below sticks
+    engine.admission = AdmissionController(slo_ms=5000, max_in_flight=16, recovery_seconds=3600)
+    return engine
+
+
+def record_model_calls(engine, monkeypatch, method):
+    calls = []
+    original = getattr(engine.nllb, method)
+
+    def recording(*args):
+        calls.append(args)
+        return original(*args)
+
+    monkeypatch.setattr(engine.nllb, method, recording)
+    return calls
+
+
+def test_batch_in_reduced_tier_decodes_with_reduced_profile(engine, monkeypatch):
+    calls = record_model_calls(engine, monkeypatch, "translate_batch")
+    engine.admission.tier = REDUCED
+
+    results = engine.translate_batch(["Where is the nearest clinic", "Hello"], "english", "swahili", "quality")
+
+    assert results[1] == "Hujambo"
+    assert [call[-1] for call in calls] == [settings.ADMISSION_REDUCED_PROFILE]
+    assert engine.admission.stats()["in_flight"] == 0
+
+
+def test_batch_in_approximate_tier_skips_the_model(engine, monkeypatch):
+    from backend.translation_engine import BUSY_MESSAGE
+
+    calls = record_model_calls(engine, monkeypatch, "translate_batch")
+    engine.admission.tier = APPROXIMATE
+
+    results = engine.translate_batch(["Where is the nearest clinic", "Hello", " "], "english", "swahili")
+
+    assert results == [BUSY_MESSAGE, "Hujambo", ""]
+    assert not calls
+
+
+def test_multi_in_reduced_tier_decodes_with_reduced_profile(engine, monkeypatch):
+    calls = record_model_calls(engine, monkeypatch, "translate_multi")
+    engine.admission.tier = REDUCED
+
+    results = engine.translate_multi("Where is the nearest clinic", "english", ["swahili", "luo", "kikuyu"], "quality")
+
+    assert list(results) == ["swahili", "luo", "kikuyu"]
+    assert [call[-1] for call in calls] == [settings.ADMISSION_REDUCED_PROFILE]
+
+
+def test_multi_in_reject_tier_is_busy(engine):
+    from backend.translation_engine import BUSY_MESSAGE
+
+    engine.admission.tier = REJECT
+
+    results = engine.translate_multi("Hello", "english", ["english", "swahili", "luo"])
+
+    assert results == {"swahili": BUSY_MESSAGE, "luo": BUSY_MESSAGE}
+    assert engine.admission.stats()["in_flight"] == 0
@@ -0,0 +1,67 @@
+"""Admission control as seen through the HTTP API (simulated model)"""
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from config import settings
+
+
+@pytest.fixture
+def client(monkeypatch, make_engine):
+    import api_server
+
+    engine = make_engine(LANGUAGE_ID_ENABLED=False, ADMISSION_ENABLED=True, ADMISSION_MAX_IN_FLIGHT=16)
+    # Not entered as a context manager, so the lifespan never loads the real model
+    monkeypatch.setattr(api_server.service, "engine", engine)
+    return TestClient(api_server.app)
+
+
+def test_large_batch_on_idle_server_stays_normal(client):
+    import api_server
+
+    count = settings.ADMISSION_MAX_IN_FLIGHT + 14
+    assert count <= api_server.service.capacity
+    items = [
+        {"text": f"Where is the nearest clinic number {i}", "source": "english", "target": "swahili"}
+        for i in range(count)
+    ]
+    response = client.post("/translate/batch", json={"items": items})
+
+    assert response.status_code == 200
+    translations = response.json()["translations"]
+    assert len(translations) == count
+    assert {item["tier"] for item in translations} == {"normal"}
+    assert not any(item["approximate"] for item in translations)
+    admission = api_server.service.engine.admission.stats()
+    assert admission["tier"] == "normal"
+    assert admission["in_flight"] == 0
+
+
+def test_batch_larger_than_capacity_is_refused(client):
+    import api_server
+
+    items = [{"text": "Hello", "source": "english", "target": "swahili"}] * (api_server.service.capacity + 1)
+    assert client.post("/translate/batch", json={"items": items}).status_code == 413
+
+
+def test_blank_text_is_refused(client):
+    response = client.post("/translate", json={"text": "   ", "source": "english", "target": "swahili"})
+    assert response.status_code == 400
+
+
+def test_shutdown_gives_the_admission_ticket_back(client, monkeypatch):
+    import api_server
+
+    def closed(*args, **kwargs):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(api_server.service.executor, "submit", closed)
+    response = client.post("/translate", json={"text": "Hello", "source": "english", "target": "swahili"})
+
+    assert response.status_code == 503
+    assert api_server.service.in_flight == 0
+    assert api_server.service.engine.admission.stats()["in_flight"] == 0
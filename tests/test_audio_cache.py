@@ -0,0 +1,28 @@
+"""The on-disk audio cache stays within its size limit"""
+
+import os
+
+from backend.audio_cache import AudioCache
+
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), max_memory_bytes=1, max_disk_bytes=3000)
+    for i in range(3):
+        cache.put(f"clip {i}", "swahili", "espeak:sw", b"x" * 1000, "wav")
+        # Distinct mtimes, oldest first
+        for root, _, names in os.walk(tmp_path):
+            for name in names:
+                path = os.path.join(root, name)
+                os.utime(path, (os.path.getmtime(path) - 10, os.path.getmtime(path) - 10))
+    cache._memory.clear()
+    # Played again, so clip 0 is no longer the least recently used
+    assert cache.get("clip 0", "swahili", "espeak:sw") is not None
+
+    cache.put("clip 3", "swahili", "espeak:sw", b"x" * 1000, "wav")
+
+    stats = cache.stats()
+    assert stats["disk_bytes"] <= 3000
+    assert stats["disk_evictions"] >= 1
+    assert cache.contains("clip 0", "swahili", "espeak:sw")
+    assert cache.contains("clip 3", "swahili", "espeak:sw")
+    assert not cache.contains("clip 1", "swahili", "espeak:sw")
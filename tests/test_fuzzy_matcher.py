@@ -0,0 +1,43 @@
+import pytest
+
+from backend.fuzzy_matcher import FuzzyPhraseMatcher
+
+PHRASES = {
+    "greetings": [
+        {"english": "How are you?", "swahili": "Habari yako?"},
+        {"english": "What is your name?", "swahili": "Jina lako ni nani?"},
+        {"english": "Thank you", "swahili": "Asante"},
+    ],
+    "health": [
+        {"english": "I need medicine", "swahili": "Ninahitaji dawa"},
+    ],
+}
+
+
+@pytest.fixture
+def matcher():
+    return FuzzyPhraseMatcher(PHRASES, threshold=0.8)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("how r u", "Habari yako?"),
+    ("How are you", "Habari yako?"),
+    ("what is yuor name", "Jina lako ni nani?"),
+    ("thank you!!", "Asante"),
+    ("I need medicnie", "Ninahitaji dawa"),
+])
+def test_spelling_slips_match(matcher, text, expected):
+    result = matcher.match(text, "english", "swahili")
+    assert result is not None and result[0] == expected
+
+
+@pytest.mark.parametrize("text", [
+    "who are you",
+    "how were you",
+    "what is her name",
+    "what is our name",
+    "what is my name",
+    "I need medicine now",
+])
+def test_changed_words_do_not_match(matcher, text):
+    assert matcher.match(text, "english", "swahili") is None
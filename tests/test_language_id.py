@@ -0,0 +1,26 @@
+"""Source-language correction must not override a correct selection"""
+
+import pytest
+
+
+@pytest.fixture
+def engine(make_engine):
+    return make_engine(LANGUAGE_ID_ENABLED=True)
+
+
+@pytest.mark.parametrize("text", [
+    "I need medicine for malaria",
+    "My NHIF card is not working at the reception",
+    "does this matatu go to Kisumu",
+])
+def test_english_with_loanwords_is_not_corrected(engine, text):
+    detection = engine.detect_source(text, "english", "swahili")
+    assert not detection["corrected"]
+    assert detection["source"] == "english"
+
+
+def test_clearly_wrong_selection_is_corrected(engine):
+    text = "Habari za asubuhi, ninahitaji kumwona daktari kwa sababu mtoto wangu ana homa"
+    detection = engine.detect_source(text, "english", "luo")
+    assert detection["corrected"]
+    assert detection["source"] == "swahili"
@@ -0,0 +1,61 @@
+"""ModelRegistry loading, with the model load replaced by a fake"""
+
+import threading
+
+from backend.model_registry import ModelRegistry
+
+
+class FakeModel:
+    device = "cpu"
+
+    def __init__(self, number):
+        self.number = number
+
+
+class FakeRegistry(ModelRegistry):
+    """Loads a placeholder; the first load blocks until release is set"""
+
+    def __init__(self):
+        super().__init__("fake-model")
+        self.release = threading.Event()
+        self.loading = threading.Event()
+        self.loads = 0
+
+    def _load(self):
+        self.loads += 1
+        if self.loads == 1:
+            self.loading.set()
+            assert self.release.wait(5)
+        return FakeModel(self.loads)
+
+
+def test_reload_during_background_load():
+    registry = FakeRegistry()
+    registry.start_background_load(warmup=False)
+    assert registry.loading.wait(5)
+
+    result = []
+    reloader = threading.Thread(target=lambda: result.append(registry.reload()), daemon=True)
+    reloader.start()
+    reloader.join(0.1)
+    registry.release.set()
+    reloader.join(5)
+
+    assert not reloader.is_alive(), "reload deadlocked with the background load"
+    assert [loaded.number for loaded in result] == [2]
+    assert registry.get() is result[0]
+    assert not registry.is_loading()
+
+
+def test_unload_during_background_load():
+    registry = FakeRegistry()
+    registry.start_background_load(warmup=False)
+    assert registry.loading.wait(5)
+
+    unloader = threading.Thread(target=registry.unload, daemon=True)
+    unloader.start()
+    registry.release.set()
+    unloader.join(5)
+
+    assert not unloader.is_alive()
+    assert not registry.is_loaded()
@@ -0,0 +1,55 @@
+"""Hot reload of the phrase corpus"""
+
+import threading
+import json
+import os
+
+from backend.phrase_database import PhraseDatabase
+
+
+def write_corpus(path, swahili, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"greetings": [{"english": "Hello", "swahili": swahili}]}, f)
+    os.utime(path, (mtime, mtime))
+
+
+class SlowReloadDatabase(PhraseDatabase):
+    """Reloads (not the first load) block until release is set"""
+
+    def __init__(self, *args, **kwargs):
+        self.release = threading.Event()
+        self.reloading = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    def _load(self, version):
+        if version:
+            self.reloading.set()
+            assert self.release.wait(5)
+        return super()._load(version)
+
+
+def test_reload_runs_off_the_request_thread(tmp_path):
+    path = str(tmp_path / "phrases.json")
+    write_corpus(path, "Hujambo", 1_000_000)
+    database = SlowReloadDatabase(path, compiled_file=str(tmp_path / "none.db"), reload_interval=0.001)
+    database._next_check = 0.0
+
+    write_corpus(path, "Habari", 2_000_000)
+    # The reader that notices the change gets the current corpus at once
+    results = []
+    reader = threading.Thread(
+        target=lambda: results.append(database.lookup("Hello", "english", "swahili")), daemon=True
+    )
+    reader.start()
+    reader.join(1)
+    assert not reader.is_alive(), "the reader waited for the reload"
+    assert results == ["Hujambo"]
+    assert database.reloading.wait(5)
+    assert database.lookup("Hello", "english", "swahili") == "Hujambo"
+
+    database.release.set()
+    for _ in range(500):
+        if database.reload_count:
+            break
+        threading.Event().wait(0.01)
+    assert database.lookup("Hello", "english", "swahili") == "Habari"